@@ -34,14 +34,23 @@ FOR ALL USING (
 );
 
 -- Indexes for performance
-CREATE INDEX idx_user_library_user_created ON user_library(user_id, created_at DESC);
-CREATE INDEX idx_user_library_session_created ON user_library(session_id, created_at DESC);
+-- Keyset pagination walks (created_at, id) descending within a user/session
+CREATE INDEX idx_user_library_user_created ON user_library(user_id, created_at DESC, id DESC);
+CREATE INDEX idx_user_library_session_created ON user_library(session_id, created_at DESC, id DESC);
 CREATE INDEX idx_user_library_content_type ON user_library(content_type);
 CREATE INDEX idx_user_library_video_id ON user_library(video_id);
 
--- Full-text search index on title and summary
-CREATE INDEX idx_user_library_search ON user_library 
-USING GIN (to_tsvector('english', title || ' ' || COALESCE(summary, '')));
+-- Full-text search over title, summary, tags and content_data
+-- (search_user_library RPC: see backend/library_search.py)
+ALTER TABLE user_library ADD COLUMN search_vector tsvector
+GENERATED ALWAYS AS (
+  setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+  setweight(to_tsvector('english', coalesce(summary, '')), 'B') ||
+  setweight(jsonb_to_tsvector('english', coalesce(tags, '[]'::jsonb), '["string"]'), 'B') ||
+  setweight(jsonb_to_tsvector('english', coalesce(content_data, '{}'::jsonb), '["string"]'), 'C')
+) STORED;
+CREATE INDEX idx_user_library_search_vector ON user_library USING GIN (search_vector);
+CREATE INDEX idx_user_library_tags ON user_library USING GIN (tags jsonb_path_ops);
 
 -- Function to update updated_at timestamp
 CREATE OR REPLACE FUNCTION update_user_library_updated_at()
@@ -0,0 +1,171 @@
+"""
+Batched, off-request-path writes for telemetry and bookkeeping rows.
+
+Request handlers enqueue rows into a bounded in-memory ring buffer; a
+background task started from the app lifespan flushes them with one bulk
+insert per table every ANALYTICS_FLUSH_INTERVAL_MS, or sooner once
+ANALYTICS_BATCH_SIZE rows are waiting. When the buffer is full the oldest
+rows are dropped (and counted) instead of blocking callers. Remaining rows
+are flushed on shutdown. After each flush the written rows are handed to
+flush hooks (dashboard rollups) so aggregates stay in step with the rows.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import threading
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from backend.smart_watch_rollups import apply_rollups
+from backend.supabase_client import (
+    INSIGHTS_TABLE,
+    LIBRARY_TABLE,
+    SMART_WATCH_TABLE,
+    build_analytics_event,
+    build_library_item,
+    build_smart_watch_record,
+    bulk_insert,
+)
+
+logger = logging.getLogger("notionclips.analytics_pipeline")
+
+ANALYTICS_BATCH_SIZE = int(os.getenv("ANALYTICS_BATCH_SIZE", "50"))
+ANALYTICS_FLUSH_INTERVAL_MS = int(os.getenv("ANALYTICS_FLUSH_INTERVAL_MS", "2000"))
+ANALYTICS_BUFFER_SIZE = int(os.getenv("ANALYTICS_BUFFER_SIZE", "5000"))
+
+
+class BatchedWriter:
+    """Ring buffer of (table, row) pairs drained by a periodic bulk-insert loop."""
+
+    def __init__(
+        self,
+        batch_size: int = ANALYTICS_BATCH_SIZE,
+        flush_interval_ms: int = ANALYTICS_FLUSH_INTERVAL_MS,
+        max_buffered: int = ANALYTICS_BUFFER_SIZE,
+    ):
+        self.batch_size = max(1, batch_size)
+        self.flush_interval_s = max(0.01, flush_interval_ms / 1000)
+        self._buffer: Deque[Tuple[str, Dict[str, Any]]] = deque(maxlen=max(1, max_buffered))
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.flush_hooks: List[Callable[[List[Tuple[str, Dict[str, Any]]]], None]] = []
+        self.dropped = 0
+        self.written = 0
+        self.failed = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._buffer)
+
+    def enqueue(self, table: str, row: Dict[str, Any]) -> None:
+        """Buffer one row. Never blocks on I/O; drops the oldest row when full."""
+        with self._lock:
+            if len(self._buffer) == self._buffer.maxlen:
+                self.dropped += 1
+            self._buffer.append((table, row))
+            should_wake = len(self._buffer) >= self.batch_size
+        if not self.running:
+            # No flush loop (CLI, scripts): write through so rows are not stranded.
+            self._write(self._drain())
+            return
+        if should_wake and self._loop and self._wake:
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    def _drain(self) -> List[Tuple[str, Dict[str, Any]]]:
+        with self._lock:
+            rows = list(self._buffer)
+            self._buffer.clear()
+        return rows
+
+    def _write(self, rows: List[Tuple[str, Dict[str, Any]]]) -> None:
+        by_table: Dict[str, List[Dict[str, Any]]] = {}
+        for table, row in rows:
+            by_table.setdefault(table, []).append(row)
+        written: List[Tuple[str, Dict[str, Any]]] = []
+        for table, table_rows in by_table.items():
+            for start in range(0, len(table_rows), self.batch_size):
+                batch = table_rows[start:start + self.batch_size]
+                try:
+                    bulk_insert(table, batch)
+                    self.written += len(batch)
+                    written.extend((table, row) for row in batch)
+                except Exception as exc:
+                    self.failed += len(batch)
+                    logger.warning("Batched insert into %s failed (%d rows): %s", table, len(batch), exc)
+        if not written:
+            return
+        for hook in self.flush_hooks:
+            try:
+                hook(written)
+            except Exception as exc:
+                logger.warning("Analytics flush hook %s failed: %s", getattr(hook, "__name__", hook), exc)
+
+    async def flush(self) -> None:
+        rows = self._drain()
+        if rows:
+            await asyncio.to_thread(self._write, rows)
+
+    async def _run(self) -> None:
+        assert self._wake is not None
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval_s)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        await self.flush()
+        if self.dropped:
+            logger.warning("Analytics pipeline dropped %d rows under backpressure", self.dropped)
+
+
+analytics_writer = BatchedWriter()
+analytics_writer.flush_hooks.append(apply_rollups)
+
+
+def enqueue_analytics_event(
+    session_id: str,
+    event_name: str,
+    user_id: Optional[str] = None,
+    payload: Optional[Dict[str, Any]] = None,
+) -> None:
+    """Queue a product analytics event (same row shape as track_analytics_event)."""
+    analytics_writer.enqueue(
+        INSIGHTS_TABLE,
+        build_analytics_event(session_id, event_name, user_id=user_id, payload=payload),
+    )
+
+
+def enqueue_smart_watch_analysis(**fields: Any) -> None:
+    """Queue a Smart Watch analysis row (see build_smart_watch_record for fields)."""
+    analytics_writer.enqueue(SMART_WATCH_TABLE, build_smart_watch_record(**fields))
+
+
+def enqueue_library_item(**fields: Any) -> None:
+    """Queue a fire-and-forget library row (see build_library_item for fields)."""
+    analytics_writer.enqueue(LIBRARY_TABLE, build_library_item(**fields))
@@ -0,0 +1,213 @@
+"""
+Cache-first article loading for /extract/article and study-session sources.
+
+Article text is keyed by sha256(url) and looked up in process memory, then
+in the article_cache table; the network is only touched on a miss or when
+the stored copy is older than ARTICLE_FRESH_SECONDS. Stale copies are
+revalidated with If-None-Match / If-Modified-Since, so an unchanged page
+costs a 304 instead of a download, and a failed revalidation serves the
+stale copy. Downloads share one pooled httpx client, newspaper3k parses in
+a thread pool, and concurrent loads of the same URL share one fetch, so the
+event loop never blocks on an article.
+
+SQL to run in Supabase SQL editor:
+
+CREATE TABLE IF NOT EXISTS article_cache (
+  url_hash text PRIMARY KEY,
+  url text NOT NULL,
+  title text,
+  article_text text,
+  article_blob text,
+  etag text,
+  last_modified text,
+  fetched_at timestamptz DEFAULT now()
+);
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+
+from backend.content_ingestion import parse_article_html
+from backend.memory_cache import TTLCache
+from backend.supabase_client import get_cached_article, save_cached_article
+
+logger = logging.getLogger("notionclips.article_pipeline")
+
+ARTICLE_FRESH_SECONDS = int(os.getenv("ARTICLE_FRESH_SECONDS", str(6 * 3600)))
+ARTICLE_FETCH_TIMEOUT = float(os.getenv("ARTICLE_FETCH_TIMEOUT", "15"))
+ARTICLE_MAX_BYTES = int(os.getenv("ARTICLE_MAX_BYTES", str(5 * 1024 * 1024)))
+ARTICLE_PARSE_WORKERS = int(os.getenv("ARTICLE_PARSE_WORKERS", "4"))
+
+_REQUEST_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+    ),
+    "Accept": "text/html,application/xhtml+xml;q=0.9,*/*;q=0.8",
+}
+
+# url_hash -> {"url", "title", "text", "etag", "last_modified", "fetched_at" (epoch seconds)}
+ARTICLES: TTLCache[Dict[str, Any]] = TTLCache(max_entries=256)
+
+_parse_pool = ThreadPoolExecutor(max_workers=max(1, ARTICLE_PARSE_WORKERS), thread_name_prefix="article-parse")
+_in_flight: Dict[str, asyncio.Task] = {}
+_http_client: Optional[httpx.AsyncClient] = None
+_http_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def url_hash(url: str) -> str:
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+
+def _article_client() -> httpx.AsyncClient:
+    """Shared keep-alive client for article downloads (one per event loop)."""
+    global _http_client, _http_client_loop  # pylint: disable=global-statement
+    loop = asyncio.get_running_loop()
+    if _http_client is None or _http_client.is_closed or _http_client_loop is not loop:
+        _http_client = httpx.AsyncClient(
+            timeout=ARTICLE_FETCH_TIMEOUT,
+            follow_redirects=True,
+            headers=_REQUEST_HEADERS,
+            limits=httpx.Limits(max_connections=32, max_keepalive_connections=16),
+        )
+        _http_client_loop = loop
+    return _http_client
+
+
+async def close_http_client() -> None:
+    global _http_client  # pylint: disable=global-statement
+    client, _http_client = _http_client, None
+    if client is not None and not client.is_closed:
+        await client.aclose()
+
+
+def _is_fresh(entry: Dict[str, Any]) -> bool:
+    return time.time() - float(entry.get("fetched_at") or 0) < ARTICLE_FRESH_SECONDS
+
+
+def _result(entry: Dict[str, Any], source: str) -> Dict[str, Any]:
+    return {"url": entry["url"], "title": entry["title"], "text": entry["text"], "source": source}
+
+
+def _read_stored(key: str) -> Optional[Dict[str, Any]]:
+    try:
+        row = get_cached_article(key)
+    except Exception as exc:
+        logger.warning("Article cache read failed key=%s: %s", key[:10], exc)
+        return None
+    if not row or not row.get("article_text"):
+        return None
+    try:
+        fetched_at = datetime.fromisoformat(str(row.get("fetched_at"))).timestamp()
+    except (TypeError, ValueError):
+        fetched_at = 0.0
+    return {
+        "url": row.get("url") or "",
+        "title": row.get("title") or "Untitled Article",
+        "text": row["article_text"],
+        "etag": row.get("etag"),
+        "last_modified": row.get("last_modified"),
+        "fetched_at": fetched_at,
+    }
+
+
+def _write_stored(key: str, entry: Dict[str, Any]) -> None:
+    try:
+        save_cached_article(
+            url_hash=key,
+            url=entry["url"],
+            title=entry["title"],
+            article_text=entry["text"],
+            etag=entry.get("etag"),
+            last_modified=entry.get("last_modified"),
+            fetched_at=datetime.fromtimestamp(entry["fetched_at"], timezone.utc).isoformat(),
+        )
+    except Exception as exc:
+        logger.warning("Article cache write failed key=%s: %s", key[:10], exc)
+
+
+async def _download(url: str, stale: Optional[Dict[str, Any]]) -> Optional[Tuple[str, httpx.Headers]]:
+    """GET the page (conditionally when we hold a copy) as (html, headers); None means 304 Not Modified."""
+    headers: Dict[str, str] = {}
+    if stale and stale.get("etag"):
+        headers["If-None-Match"] = stale["etag"]
+    if stale and stale.get("last_modified"):
+        headers["If-Modified-Since"] = stale["last_modified"]
+
+    async with _article_client().stream("GET", url, headers=headers) as resp:
+        if resp.status_code == 304 and stale:
+            return None
+        resp.raise_for_status()
+        body = bytearray()
+        async for chunk in resp.aiter_bytes():
+            body.extend(chunk)
+            if len(body) > ARTICLE_MAX_BYTES:
+                raise ValueError(f"Article is larger than {ARTICLE_MAX_BYTES} bytes: {url}")
+        return bytes(body).decode(resp.encoding or "utf-8", errors="replace"), resp.headers
+
+
+async def _refresh(url: str, key: str, stale: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    try:
+        downloaded = await _download(url, stale)
+    except (httpx.HTTPError, ValueError) as exc:
+        if stale:
+            logger.warning("Article revalidation failed, serving stale copy key=%s: %s", key[:10], exc)
+            return _result(stale, "stale")
+        raise ValueError(f"Could not download {url}: {exc}") from exc
+
+    if downloaded is None:
+        entry = {**stale, "fetched_at": time.time()}
+        source = "revalidated"
+    else:
+        html, headers = downloaded
+        loop = asyncio.get_running_loop()
+        title, text = await loop.run_in_executor(_parse_pool, parse_article_html, url, html)
+        entry = {
+            "url": url,
+            "title": title,
+            "text": text,
+            "etag": headers.get("etag"),
+            "last_modified": headers.get("last-modified"),
+            "fetched_at": time.time(),
+        }
+        source = "fetched"
+    ARTICLES.set(key, entry)
+    await asyncio.to_thread(_write_stored, key, entry)
+    return _result(entry, source)
+
+
+async def load_article(url: str, allow_stale: bool = False) -> Dict[str, Any]:
+    """
+    Return {"url", "title", "text", "source"} for an article URL, where source
+    is memory, cache, revalidated, fetched or stale. ``allow_stale`` serves
+    any stored copy without revalidating (e.g. when insights are cached too).
+    Raises ValueError when the page cannot be downloaded or has no readable text.
+    """
+    key = url_hash(url)
+    entry = ARTICLES.get(key)
+    source = "memory"
+    if entry is None:
+        entry = await asyncio.to_thread(_read_stored, key)
+        source = "cache"
+        if entry:
+            ARTICLES.set(key, entry)
+    if entry and (allow_stale or _is_fresh(entry)):
+        return _result(entry, source)
+
+    loop = asyncio.get_running_loop()
+    task = _in_flight.get(key)
+    if task is None or task.get_loop() is not loop:
+        task = loop.create_task(_refresh(url, key, entry))
+        _in_flight[key] = task
+        task.add_done_callback(lambda done, key=key: _in_flight.pop(key, None) if _in_flight.get(key) is done else None)
+    return await asyncio.shield(task)
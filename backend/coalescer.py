@@ -0,0 +1,85 @@
+"""
+Request coalescing for batched upstream calls.
+
+Concurrent callers submit single items under a group key (e.g. a search
+query); items for the same group that arrive within a short window are
+sent to the upstream in one batch of at most ``max_batch`` items, and an
+item already in flight is shared instead of being requested twice.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Generic, List, Optional, Set, Tuple, TypeVar
+
+logger = logging.getLogger("notionclips.coalescer")
+
+T = TypeVar("T")
+
+BatchFn = Callable[[str, List[Dict[str, Any]]], Awaitable[Dict[str, T]]]
+
+
+class BatchCoalescer(Generic[T]):
+    """Collects (group, key, item) submissions and resolves them from batched calls.
+
+    ``batch_fn(group, items)`` must return a mapping of item key to result;
+    keys missing from the mapping raise KeyError for their callers.
+    """
+
+    def __init__(self, batch_fn: BatchFn, max_batch: int = 8, window_ms: int = 25):
+        self.batch_fn = batch_fn
+        self.max_batch = max(1, max_batch)
+        self.window_s = max(0.0, window_ms / 1000)
+        self._pending: Dict[str, Dict[str, Tuple[Dict[str, Any], asyncio.Future]]] = {}
+        self._in_flight: Dict[Tuple[str, str], asyncio.Future] = {}
+        self._timers: Dict[str, asyncio.TimerHandle] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self.batches = 0
+        self.coalesced = 0
+
+    async def submit(self, group: str, key: str, item: Dict[str, Any]) -> T:
+        loop = asyncio.get_running_loop()
+        existing = self._in_flight.get((group, key))
+        if existing is not None and existing.get_loop() is loop:
+            self.coalesced += 1
+            return await asyncio.shield(existing)
+
+        future: asyncio.Future = loop.create_future()
+        self._in_flight[(group, key)] = future
+        bucket = self._pending.setdefault(group, {})
+        bucket[key] = (item, future)
+        if len(bucket) >= self.max_batch:
+            self._dispatch(group)
+        elif group not in self._timers:
+            self._timers[group] = loop.call_later(self.window_s, self._dispatch, group)
+        return await asyncio.shield(future)
+
+    def _dispatch(self, group: str) -> None:
+        timer = self._timers.pop(group, None)
+        if timer:
+            timer.cancel()
+        bucket = self._pending.pop(group, None)
+        if not bucket:
+            return
+        task = asyncio.ensure_future(self._run(group, bucket))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, group: str, bucket: Dict[str, Tuple[Dict[str, Any], asyncio.Future]]) -> None:
+        self.batches += 1
+        error: Optional[Exception] = None
+        try:
+            results = await self.batch_fn(group, [item for item, _ in bucket.values()])
+        except Exception as exc:
+            logger.warning("Coalesced batch failed group=%s size=%d: %s", group[:40], len(bucket), exc)
+            results, error = {}, exc
+        for key, (_, future) in bucket.items():
+            if self._in_flight.get((group, key)) is future:
+                del self._in_flight[(group, key)]
+            if future.done():
+                continue
+            if key in results:
+                future.set_result(results[key])
+            else:
+                future.set_exception(error or KeyError(key))
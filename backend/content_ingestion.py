@@ -1,30 +1,156 @@
 from __future__ import annotations
 
-from typing import Tuple
+import mmap
+import multiprocessing
+import os
+import threading
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import contextmanager
+from itertools import islice
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple, Union
 
 import fitz
 from newspaper import Article
 
 
-def extract_text_from_pdf(file_bytes: bytes) -> Tuple[str, str]:
+PdfSource = Union[bytes, str, "os.PathLike[str]"]
+
+PDF_PAGE_WORKERS = int(os.getenv("PDF_PAGE_WORKERS", str(min(4, os.cpu_count() or 1))))
+PDF_PAGES_PER_TASK = 16
+PDF_PARALLEL_MIN_PAGES = 48
+# Pages beyond this are not extracted; keeps textbooks from fanning out into dozens of LLM calls.
+MAX_PDF_PAGES = int(os.getenv("MAX_PDF_PAGES", "300"))
+
+_page_pool: Optional[ProcessPoolExecutor] = None
+_page_pool_lock = threading.Lock()
+
+
+@contextmanager
+def open_pdf(source: PdfSource) -> Iterator["fitz.Document"]:
     """
-    Returns (title, full_text) from a PDF byte stream.
-    - title: first non-empty line or "Untitled Document"
-    - full_text: concatenated page text (max 50k chars)
+    Open a PDF from bytes, or from a file path through a read-only memory
+    map so the document is never copied into a Python bytes object.
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        with fitz.open(stream=source, filetype="pdf") as doc:
+            yield doc
+        return
+    with open(source, "rb") as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        view = memoryview(mapped)
+        try:
+            with fitz.open(stream=view, filetype="pdf") as doc:
+                yield doc
+        finally:
+            view.release()
+
+
+def _toc_headings(doc: "fitz.Document") -> Dict[int, List[str]]:
+    """Map 1-based page numbers to the TOC headings that start on them."""
+    headings: Dict[int, List[str]] = {}
+    for _level, title, page in doc.get_toc(simple=True):
+        title = str(title or "").strip()
+        if page >= 1 and title:
+            headings.setdefault(page, []).append(title)
+    return headings
+
+
+def _extract_page_range(path: str, start: int, stop: int) -> List[str]:
+    """Process-pool task: text of pages [start, stop) of the PDF at ``path``."""
+    with open_pdf(path) as doc:
+        return [doc[i].get_text() for i in range(start, stop)]
+
+
+def _page_executor() -> ProcessPoolExecutor:
+    global _page_pool  # pylint: disable=global-statement
+    with _page_pool_lock:
+        if _page_pool is None:
+            # spawn: callers run in worker threads, and forking a threaded process is unsafe.
+            _page_pool = ProcessPoolExecutor(
+                max_workers=PDF_PAGE_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _page_pool
+
+
+def iter_pdf_pages(source: PdfSource) -> Iterator[Dict[str, Any]]:
+    """
+    Yield {"page", "text", "headings"} for every page, in page order.
+
+    Documents from a file path with at least PDF_PARALLEL_MIN_PAGES pages are
+    extracted in a process pool, PDF_PAGES_PER_TASK pages per task, with at
+    most two tasks per worker in flight so memory stays bounded however long
+    the document is. Smaller documents and in-memory bytes are read serially.
     """
-    with fitz.open(stream=file_bytes, filetype="pdf") as doc:
-        pages = []
-        for page in doc:
-            pages.append(page.get_text())
-        full_text = "\n".join(pages).strip()
+    with open_pdf(source) as doc:
+        page_count = doc.page_count
+        headings = _toc_headings(doc)
+        in_memory = isinstance(source, (bytes, bytearray, memoryview))
+        if in_memory or page_count < PDF_PARALLEL_MIN_PAGES or PDF_PAGE_WORKERS <= 1:
+            for index in range(page_count):
+                yield {"page": index + 1, "text": doc[index].get_text(), "headings": headings.get(index + 1, [])}
+            return
 
-    lines = [line.strip() for line in full_text.split("\n") if line.strip()]
-    title = lines[0][:100] if lines else "Untitled Document"
+    path = os.fspath(source)
+    ranges = iter([
+        (start, min(start + PDF_PAGES_PER_TASK, page_count))
+        for start in range(0, page_count, PDF_PAGES_PER_TASK)
+    ])
+    pool = _page_executor()
+    pending: Deque[Tuple[int, Future]] = deque()
+    try:
+        for start, stop in islice(ranges, PDF_PAGE_WORKERS * 2):
+            pending.append((start, pool.submit(_extract_page_range, path, start, stop)))
+        while pending:
+            start, future = pending.popleft()
+            texts = future.result()
+            for start_next, stop_next in islice(ranges, 1):
+                pending.append((start_next, pool.submit(_extract_page_range, path, start_next, stop_next)))
+            for offset, text in enumerate(texts):
+                page = start + offset + 1
+                yield {"page": page, "text": text, "headings": headings.get(page, [])}
+    finally:
+        for _, future in pending:
+            future.cancel()
 
-    if len(full_text) > 50000:
-        full_text = full_text[:50000] + "\n\n[Content truncated — document too long]"
 
-    return title, full_text
+def shutdown_pdf_workers() -> None:
+    global _page_pool  # pylint: disable=global-statement
+    with _page_pool_lock:
+        pool, _page_pool = _page_pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def format_page(record: Dict[str, Any]) -> str:
+    """Page text under a "[Page N] heading" marker, so prompts can cite pages."""
+    marker = f"[Page {record['page']}]"
+    if record.get("headings"):
+        marker += " " + " / ".join(record["headings"])
+    return f"{marker}\n{str(record.get('text') or '').strip()}"
+
+
+def extract_text_from_pdf(source: PdfSource) -> Tuple[str, str]:
+    """
+    Returns (title, full_text) from PDF bytes or a PDF file path.
+    - title: first TOC heading, else first non-empty line, else "Untitled Document"
+    - full_text: each page under a [Page N] marker (see format_page), up to
+      MAX_PDF_PAGES pages; later pages are not parsed and a note is appended
+    """
+    title = ""
+    parts: List[str] = []
+    for record in iter_pdf_pages(source):
+        if record["page"] > MAX_PDF_PAGES:
+            parts.append(f"[Content truncated after page {MAX_PDF_PAGES}]")
+            break
+        if not title:
+            if record["headings"]:
+                title = record["headings"][0]
+            else:
+                title = next((line.strip() for line in record["text"].split("\n") if line.strip()), "")
+        if record["text"].strip():
+            parts.append(format_page(record))
+    return (title[:100] or "Untitled Document"), "\n\n".join(parts)
 
 
 def extract_text_from_url(url: str) -> Tuple[str, str]:
@@ -35,7 +161,20 @@ def extract_text_from_url(url: str) -> Tuple[str, str]:
     article = Article(url)
     article.download()
     article.parse()
+    return _article_text(article, url)
+
+
+def parse_article_html(url: str, html: str) -> Tuple[str, str]:
+    """
+    Same as extract_text_from_url, for HTML that was already downloaded.
+    """
+    article = Article(url)
+    article.download(input_html=html)
+    article.parse()
+    return _article_text(article, url)
+
 
+def _article_text(article: Article, url: str) -> Tuple[str, str]:
     text = (article.text or "").strip()
     if not text or len(text) < 100:
         raise ValueError(f"Could not extract readable content from {url}")
@@ -45,4 +184,3 @@ def extract_text_from_url(url: str) -> Tuple[str, str]:
         text = text[:30000] + "\n\n[Content truncated]"
 
     return title, text
-
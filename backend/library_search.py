@@ -0,0 +1,319 @@
+"""
+Full-text and faceted search over the unified library.
+
+Supabase ranks with a stored tsvector over title (A), summary and tags (B)
+and every string inside content_data (C), via the ``search_user_library``
+RPC below; it returns ranked list rows with ts_headline highlights plus
+facet counts in one round trip. The local SQLite stand-in uses
+``LibrarySearchIndex`` instead: an in-process inverted index with the same
+field weights, AND query semantics, highlights and facets, built once from
+local_store and kept current on save/delete.
+
+SQL to run in Supabase SQL editor:
+
+ALTER TABLE user_library ADD COLUMN IF NOT EXISTS search_vector tsvector
+GENERATED ALWAYS AS (
+  setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+  setweight(to_tsvector('english', coalesce(summary, '')), 'B') ||
+  setweight(jsonb_to_tsvector('english', coalesce(tags, '[]'::jsonb), '["string"]'), 'B') ||
+  setweight(jsonb_to_tsvector('english', coalesce(content_data, '{}'::jsonb), '["string"]'), 'C')
+) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_user_library_search_vector ON user_library USING GIN (search_vector);
+CREATE INDEX IF NOT EXISTS idx_user_library_tags ON user_library USING GIN (tags jsonb_path_ops);
+-- Superseded by search_vector
+DROP INDEX IF EXISTS idx_user_library_search;
+
+CREATE OR REPLACE FUNCTION search_user_library(
+  p_session_id text,
+  p_user_id uuid,
+  p_query text,
+  p_content_type text DEFAULT NULL,
+  p_tags jsonb DEFAULT NULL,
+  p_limit int DEFAULT 50
+) RETURNS jsonb
+LANGUAGE sql STABLE AS $$
+  WITH q AS (
+    SELECT websearch_to_tsquery('english', p_query) AS query
+  ),
+  matched AS (
+    SELECT l.id, l.user_id, l.session_id, l.content_type, l.title, l.source_url, l.video_id,
+           l.summary, l.notion_page_id, l.tags, l.created_at, l.updated_at,
+           ts_rank_cd(l.search_vector, q.query, 32) AS rank
+    FROM user_library l, q
+    WHERE l.search_vector @@ q.query
+      AND ((p_user_id IS NOT NULL AND l.user_id = p_user_id)
+           OR (p_user_id IS NULL AND l.session_id = p_session_id))
+      AND (p_tags IS NULL OR l.tags @> p_tags)
+  ),
+  filtered AS (
+    SELECT * FROM matched WHERE p_content_type IS NULL OR content_type = p_content_type
+  ),
+  top AS (
+    SELECT * FROM filtered
+    ORDER BY rank DESC, created_at DESC, id DESC
+    LIMIT LEAST(GREATEST(p_limit, 1), 100)
+  )
+  SELECT jsonb_build_object(
+    -- ts_headline is expensive, so it only runs on the returned page
+    'items', COALESCE((
+      SELECT jsonb_agg(
+               to_jsonb(t) || jsonb_build_object('highlight', ts_headline(
+                 'english',
+                 concat_ws(' ', t.title, t.summary, (
+                   SELECT string_agg(s #>> '{}', ' ')
+                   FROM user_library l2,
+                        jsonb_path_query(l2.content_data, 'strict $.** ? (@.type() == "string")') AS s
+                   WHERE l2.id = t.id
+                 )),
+                 q.query,
+                 'StartSel=<mark>, StopSel=</mark>, MaxWords=24, MinWords=10, MaxFragments=2'
+               ))
+               ORDER BY t.rank DESC, t.created_at DESC, t.id DESC)
+      FROM top t, q
+    ), '[]'::jsonb),
+    'total', (SELECT count(*) FROM filtered),
+    'facets', jsonb_build_object(
+      -- content_type counts ignore the content_type filter so other types stay selectable
+      'content_type', COALESCE((
+        SELECT jsonb_object_agg(content_type, n)
+        FROM (SELECT content_type, count(*) AS n FROM matched GROUP BY content_type) c
+      ), '{}'::jsonb),
+      'tags', COALESCE((
+        SELECT jsonb_object_agg(tag, n)
+        FROM (
+          SELECT tag, count(*) AS n
+          FROM filtered, jsonb_array_elements_text(filtered.tags) AS tag
+          GROUP BY tag ORDER BY n DESC, tag LIMIT 20
+        ) g
+      ), '{}'::jsonb)
+    )
+  );
+$$;
+"""
+
+from __future__ import annotations
+
+import heapq
+import math
+import re
+import threading
+from collections import Counter
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from backend.retrieval import BM25_B, BM25_K1, stem, tokenize
+
+FIELD_WEIGHTS = {"title": 3.0, "summary": 2.0, "tags": 2.0, "content": 1.0}
+MAX_TAG_FACETS = 20
+HIGHLIGHT_WORDS = 24
+HIGHLIGHT_START = "<mark>"
+HIGHLIGHT_STOP = "</mark>"
+
+_WORD_RE = re.compile(r"\S+")
+
+
+def iter_strings(value: Any) -> Iterator[str]:
+    """Every string inside a JSON value, depth-first (like jsonb_to_tsvector '["string"]')."""
+    stack = [value]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, str):
+            if node:
+                yield node
+        elif isinstance(node, dict):
+            stack.extend(reversed(list(node.values())))
+        elif isinstance(node, (list, tuple)):
+            stack.extend(reversed(node))
+
+
+def flatten_content(value: Any) -> str:
+    return " ".join(iter_strings(value))
+
+
+def query_terms(query: str) -> List[str]:
+    seen: Dict[str, None] = {}
+    for tok in tokenize(query):
+        seen.setdefault(stem(tok), None)
+    return list(seen)
+
+
+def highlight(text: str, terms: Iterable[str], max_words: int = HIGHLIGHT_WORDS) -> str:
+    """Best window of ``max_words`` words around the query terms, with matches marked."""
+    wanted = set(terms)
+    words = _WORD_RE.findall(text or "")
+    if not words:
+        return ""
+    hits = [
+        any(stem(tok) in wanted for tok in tokenize(word))
+        for word in words
+    ]
+    start = 0
+    best = window = sum(hits[:max_words])
+    for i in range(1, max(1, len(words) - max_words + 1)):
+        window += hits[i + max_words - 1] - hits[i - 1]
+        if window > best:
+            best, start = window, i
+    fragment = [
+        f"{HIGHLIGHT_START}{word}{HIGHLIGHT_STOP}" if hit else word
+        for word, hit in zip(words[start:start + max_words], hits[start:start + max_words])
+    ]
+    return " ".join(fragment)
+
+
+def _matches_scope(doc: Dict[str, Any], session_id: str, user_id: Optional[str]) -> bool:
+    if user_id:
+        return str(doc.get("user_id") or "") == str(user_id)
+    return doc.get("session_id") == session_id
+
+
+class LibrarySearchIndex:
+    """Field-weighted inverted index over library items with BM25 ranking.
+
+    Items are indexed with their content_data flattened to text; only the
+    list columns are kept for results. ``search`` requires every query term
+    to match (like websearch_to_tsquery), ranks by BM25 over field-weighted
+    term frequencies, and returns facet counts for the matched set.
+    """
+
+    def __init__(self, items: Iterable[Dict[str, Any]] = ()):
+        self._lock = threading.Lock()
+        self._docs: Dict[str, Dict[str, Any]] = {}
+        self._texts: Dict[str, str] = {}
+        self._postings: Dict[str, Dict[str, float]] = {}
+        self._doc_terms: Dict[str, List[str]] = {}
+        self._doc_len: Dict[str, float] = {}
+        self._total_len = 0.0
+        for item in items:
+            self.add(item)
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def add(self, item: Dict[str, Any]) -> None:
+        item_id = str(item.get("id") or "")
+        if not item_id:
+            return
+        fields = {
+            "title": str(item.get("title") or ""),
+            "summary": str(item.get("summary") or ""),
+            "tags": " ".join(str(tag) for tag in item.get("tags") or []),
+            "content": flatten_content(item.get("content_data") or {}),
+        }
+        weights: Counter = Counter()
+        for field, text in fields.items():
+            for tok in tokenize(text):
+                weights[stem(tok)] += FIELD_WEIGHTS[field]
+        doc = {k: v for k, v in item.items() if k != "content_data"}
+        with self._lock:
+            self._remove_locked(item_id)
+            self._docs[item_id] = doc
+            self._texts[item_id] = " ".join(text for text in fields.values() if text)
+            for term, weight in weights.items():
+                self._postings.setdefault(term, {})[item_id] = weight
+            self._doc_terms[item_id] = list(weights)
+            self._doc_len[item_id] = float(sum(weights.values()))
+            self._total_len += self._doc_len[item_id]
+
+    def remove(self, item_id: str) -> None:
+        with self._lock:
+            self._remove_locked(str(item_id))
+
+    def _remove_locked(self, item_id: str) -> None:
+        if item_id not in self._docs:
+            return
+        for term in self._doc_terms.pop(item_id, []):
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(item_id, None)
+                if not postings:
+                    del self._postings[term]
+        self._total_len -= self._doc_len.pop(item_id, 0.0)
+        self._docs.pop(item_id, None)
+        self._texts.pop(item_id, None)
+
+    def search(
+        self,
+        query: str,
+        session_id: str,
+        user_id: Optional[str] = None,
+        content_type: Optional[str] = None,
+        tags: Optional[List[str]] = None,
+        limit: int = 50,
+    ) -> Dict[str, Any]:
+        """Same result shape as the search_user_library RPC: items, total, facets."""
+        terms = query_terms(query)
+        required_tags = set(tags or [])
+        empty = {"items": [], "total": 0, "facets": {"content_type": {}, "tags": {}}}
+        if not terms:
+            return empty
+        with self._lock:
+            postings = [self._postings.get(term) for term in terms]
+            if not all(postings):
+                return empty
+            postings.sort(key=len)
+            n_docs = len(self._docs)
+            avg_len = (self._total_len / n_docs if n_docs else 1.0) or 1.0
+            idfs = [math.log(1 + (n_docs - len(p) + 0.5) / (len(p) + 0.5)) for p in postings]
+            type_counts: Counter = Counter()
+            tag_counts: Counter = Counter()
+            scored: List[tuple] = []
+            for item_id in postings[0]:
+                if not all(item_id in other for other in postings[1:]):
+                    continue
+                doc = self._docs[item_id]
+                if not _matches_scope(doc, session_id, user_id):
+                    continue
+                doc_tags = doc.get("tags") or []
+                if required_tags and not required_tags.issubset(doc_tags):
+                    continue
+                type_counts[doc.get("content_type")] += 1
+                if content_type and doc.get("content_type") != content_type:
+                    continue
+                tag_counts.update(doc_tags)
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self._doc_len[item_id] / avg_len)
+                score = 0.0
+                for idf, term_postings in zip(idfs, postings):
+                    tf = term_postings[item_id]
+                    score += idf * tf * (BM25_K1 + 1) / (tf + norm)
+                scored.append((score, str(doc.get("created_at") or ""), item_id))
+
+            top = heapq.nlargest(max(1, min(int(limit), 100)), scored)
+            items = [
+                {**self._docs[item_id], "rank": round(score, 6), "highlight": highlight(self._texts[item_id], terms)}
+                for score, _, item_id in top
+            ]
+
+        return {
+            "items": items,
+            "total": len(scored),
+            "facets": {
+                "content_type": dict(type_counts),
+                "tags": dict(sorted(tag_counts.items(), key=lambda kv: (-kv[1], kv[0]))[:MAX_TAG_FACETS]),
+            },
+        }
+
+
+_local_index: Optional[LibrarySearchIndex] = None
+_local_index_lock = threading.Lock()
+
+
+def local_index() -> LibrarySearchIndex:
+    """Index over the local_store library, built on first use."""
+    global _local_index  # pylint: disable=global-statement
+    if _local_index is None:
+        with _local_index_lock:
+            if _local_index is None:
+                from backend import local_store
+
+                _local_index = LibrarySearchIndex(local_store.iter_library_items())
+    return _local_index
+
+
+def index_local_item(item: Dict[str, Any]) -> None:
+    if _local_index is not None:
+        _local_index.add(item)
+
+
+def unindex_local_item(item_id: str) -> None:
+    if _local_index is not None:
+        _local_index.remove(item_id)
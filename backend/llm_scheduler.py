@@ -0,0 +1,71 @@
+"""
+Process-wide concurrency limits for async LLM calls.
+
+Every outbound OpenRouter request made from the event loop holds a slot
+from a global pool (LLM_MAX_CONCURRENCY). Work that was started
+speculatively, before a user asked for it, additionally holds a slot from
+a much smaller pool (LLM_SPECULATIVE_CONCURRENCY), so it can never crowd
+out interactive requests. Speculative work is marked by running it under
+``speculative_context`` set to True; tasks spawned from it inherit the mark.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Optional, Tuple
+
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+LLM_SPECULATIVE_CONCURRENCY = int(os.getenv("LLM_SPECULATIVE_CONCURRENCY", "4"))
+
+speculative_context: ContextVar[bool] = ContextVar("llm_speculative", default=False)
+
+
+class LLMScheduler:
+    """Two-level semaphore: a global pool plus a sub-pool for speculative calls."""
+
+    def __init__(
+        self,
+        max_concurrency: int = LLM_MAX_CONCURRENCY,
+        speculative_concurrency: int = LLM_SPECULATIVE_CONCURRENCY,
+    ):
+        self.max_concurrency = max(1, max_concurrency)
+        self.speculative_concurrency = max(1, min(speculative_concurrency, self.max_concurrency))
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._global: Optional[asyncio.Semaphore] = None
+        self._speculative: Optional[asyncio.Semaphore] = None
+        self.in_flight = 0
+        self.speculative_in_flight = 0
+
+    def _semaphores(self) -> Tuple[asyncio.Semaphore, asyncio.Semaphore]:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._global is None or self._speculative is None:
+            self._loop = loop
+            self._global = asyncio.Semaphore(self.max_concurrency)
+            self._speculative = asyncio.Semaphore(self.speculative_concurrency)
+        return self._global, self._speculative
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold one LLM slot for the duration of the block."""
+        global_sem, speculative_sem = self._semaphores()
+        speculative = speculative_context.get()
+        if speculative:
+            await speculative_sem.acquire()
+            self.speculative_in_flight += 1
+        try:
+            async with global_sem:
+                self.in_flight += 1
+                try:
+                    yield
+                finally:
+                    self.in_flight -= 1
+        finally:
+            if speculative:
+                self.speculative_in_flight -= 1
+                speculative_sem.release()
+
+
+llm_scheduler = LLMScheduler()
@@ -0,0 +1,262 @@
+"""
+SQLite stand-in for the Supabase tables, for local development without a
+Supabase project.
+
+Enabled by setting NOTIONCLIPS_LOCAL_DB to a file path (or ":memory:").
+Functions mirror the signatures in backend.supabase_client and use the
+same single-statement JSON updates as the Postgres RPCs, so appends and
+question patches are atomic here too.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional
+
+LOCAL_DB_PATH = os.getenv("NOTIONCLIPS_LOCAL_DB", "").strip()
+
+_JSON_COLUMNS = ("sources", "knowledge_map", "tutor_output", "qa_history", "content_data", "tags")
+_STUDY_SESSION_COLUMNS = (
+    "id", "user_id", "session_id", "learning_goal", "student_level",
+    "sources", "knowledge_map", "tutor_output", "qa_history", "status",
+    "created_at", "updated_at",
+)
+_LIBRARY_LIST_COLUMNS = (
+    "id", "user_id", "session_id", "content_type", "title", "source_url", "video_id",
+    "summary", "notion_page_id", "tags", "created_at", "updated_at",
+)
+
+_conn: Optional[sqlite3.Connection] = None
+_lock = threading.Lock()
+
+
+def is_enabled() -> bool:
+    return bool(LOCAL_DB_PATH)
+
+
+def _get_conn() -> sqlite3.Connection:
+    global _conn  # pylint: disable=global-statement
+    if _conn:
+        return _conn
+    conn = sqlite3.connect(LOCAL_DB_PATH or ":memory:", check_same_thread=False, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS study_sessions (
+          id text PRIMARY KEY,
+          user_id text,
+          session_id text,
+          learning_goal text NOT NULL,
+          student_level text NOT NULL,
+          sources text DEFAULT '[]',
+          knowledge_map text,
+          tutor_output text,
+          qa_history text DEFAULT '[]',
+          status text DEFAULT 'building',
+          created_at text,
+          updated_at text
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS user_library (
+          id text PRIMARY KEY,
+          user_id text,
+          session_id text NOT NULL,
+          content_type text NOT NULL,
+          title text NOT NULL,
+          source_url text,
+          video_id text,
+          summary text,
+          content_data text DEFAULT '{}',
+          notion_page_id text,
+          tags text DEFAULT '[]',
+          created_at text,
+          updated_at text
+        )
+        """
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_user_library_session_created "
+        "ON user_library(session_id, created_at DESC, id DESC)"
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_user_library_user_created "
+        "ON user_library(user_id, created_at DESC, id DESC)"
+    )
+    _conn = conn
+    return _conn
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _row_to_dict(row: sqlite3.Row) -> Dict[str, Any]:
+    out = dict(row)
+    for column in _JSON_COLUMNS:
+        if out.get(column) is not None:
+            out[column] = json.loads(out[column])
+    return out
+
+
+def create_study_session(
+    user_id: Optional[str],
+    session_id: str,
+    learning_goal: str,
+    student_level: str,
+    sources: list,
+) -> str:
+    study_session_id = str(uuid.uuid4())
+    now = _now()
+    with _lock:
+        _get_conn().execute(
+            "INSERT INTO study_sessions (id, user_id, session_id, learning_goal, student_level, sources, "
+            "qa_history, status, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, '[]', 'building', ?, ?)",
+            (study_session_id, user_id, session_id, learning_goal, student_level, json.dumps(sources), now, now),
+        )
+    return study_session_id
+
+
+def get_study_session(study_session_id: str) -> Optional[dict]:
+    with _lock:
+        row = _get_conn().execute(
+            "SELECT * FROM study_sessions WHERE id = ?", (study_session_id,)
+        ).fetchone()
+    return _row_to_dict(row) if row else None
+
+
+def update_study_session(study_session_id: str, updates: dict) -> None:
+    payload = {k: v for k, v in updates.items() if k in _STUDY_SESSION_COLUMNS and k != "id"}
+    payload["updated_at"] = _now()
+    assignments = ", ".join(f"{column} = ?" for column in payload)
+    values = [json.dumps(v) if k in _JSON_COLUMNS else v for k, v in payload.items()]
+    with _lock:
+        _get_conn().execute(
+            f"UPDATE study_sessions SET {assignments} WHERE id = ?",
+            (*values, study_session_id),
+        )
+
+
+def append_qa_history(study_session_id: str, qa_entry: dict) -> None:
+    with _lock:
+        _get_conn().execute(
+            "UPDATE study_sessions "
+            "SET qa_history = json_insert(COALESCE(qa_history, '[]'), '$[#]', json(?)), updated_at = ? "
+            "WHERE id = ?",
+            (json.dumps(qa_entry), _now(), study_session_id),
+        )
+
+
+def record_study_answer(
+    study_session_id: str,
+    question_id: str,
+    question_patch: dict,
+    qa_entry: dict,
+) -> None:
+    keys = list(question_patch)
+    set_args = ", ".join("?, json(?)" for _ in keys)
+    params: list = []
+    for key in keys:
+        params.extend([f"$.{key}", json.dumps(question_patch[key])])
+    patched = f"json_set(value, {set_args})" if keys else "json(value)"
+    sql = (
+        "UPDATE study_sessions SET "
+        "tutor_output = json_set(tutor_output, '$.knowledge_check', ("
+        f"  SELECT json_group_array(CASE WHEN json_extract(value, '$.id') = ? THEN {patched} ELSE json(value) END)"
+        "   FROM (SELECT value FROM json_each(tutor_output, '$.knowledge_check') ORDER BY key)"
+        ")), "
+        "qa_history = json_insert(COALESCE(qa_history, '[]'), '$[#]', json(?)), "
+        "updated_at = ? "
+        "WHERE id = ? AND json_type(tutor_output, '$.knowledge_check') = 'array'"
+    )
+    with _lock:
+        _get_conn().execute(
+            sql,
+            (question_id, *params, json.dumps(qa_entry), _now(), study_session_id),
+        )
+
+
+def save_library_item(item_data: dict) -> dict:
+    now = _now()
+    row = {"id": str(uuid.uuid4()), "created_at": now, "updated_at": now, **item_data}
+    columns = [c for c in (*_LIBRARY_LIST_COLUMNS, "content_data") if c in row]
+    values = [json.dumps(row[c]) if c in _JSON_COLUMNS else row[c] for c in columns]
+    with _lock:
+        _get_conn().execute(
+            f"INSERT INTO user_library ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})",
+            values,
+        )
+    return {column: row.get(column) for column in (*_LIBRARY_LIST_COLUMNS, "content_data")}
+
+
+def _library_where(session_id: str, user_id: Optional[str], content_type: Optional[str]):
+    clauses, params = (["user_id = ?"], [user_id]) if user_id else (["session_id = ?"], [session_id])
+    if content_type:
+        clauses.append("content_type = ?")
+        params.append(content_type)
+    return clauses, params
+
+
+def list_library_items(
+    session_id: str,
+    user_id: Optional[str],
+    content_type: Optional[str],
+    limit: int,
+    offset: int = 0,
+    after: Optional[tuple] = None,
+    with_count: bool = False,
+    include_content: bool = False,
+) -> tuple[List[dict], Optional[int]]:
+    """Rows ordered by (created_at, id) desc after the keyset position ``after``; limit is not capped."""
+    clauses, params = _library_where(session_id, user_id, content_type)
+    columns = (*_LIBRARY_LIST_COLUMNS, "content_data") if include_content else _LIBRARY_LIST_COLUMNS
+    total = None
+    with _lock:
+        conn = _get_conn()
+        if with_count:
+            total = conn.execute(
+                f"SELECT count(*) FROM user_library WHERE {' AND '.join(clauses)}", params
+            ).fetchone()[0]
+        if after:
+            clauses.append("(created_at < ? OR (created_at = ? AND id < ?))")
+            params.extend([after[0], after[0], after[1]])
+            offset = 0
+        rows = conn.execute(
+            f"SELECT {', '.join(columns)} FROM user_library WHERE {' AND '.join(clauses)} "
+            "ORDER BY created_at DESC, id DESC LIMIT ? OFFSET ?",
+            (*params, limit, max(0, offset)),
+        ).fetchall()
+    return [_row_to_dict(row) for row in rows], total
+
+
+def get_library_item(item_id: str, session_id: str, user_id: Optional[str]) -> Optional[dict]:
+    clauses, params = _library_where(session_id, user_id, None)
+    with _lock:
+        row = _get_conn().execute(
+            f"SELECT * FROM user_library WHERE id = ? AND {' AND '.join(clauses)}", (item_id, *params)
+        ).fetchone()
+    return _row_to_dict(row) if row else None
+
+
+def delete_library_item(item_id: str, session_id: str, user_id: Optional[str]) -> bool:
+    clauses, params = _library_where(session_id, user_id, None)
+    with _lock:
+        cursor = _get_conn().execute(
+            f"DELETE FROM user_library WHERE id = ? AND {' AND '.join(clauses)}", (item_id, *params)
+        )
+    return cursor.rowcount > 0
+
+
+def iter_library_items() -> Iterator[dict]:
+    """Every library row including content_data (used to build the search index)."""
+    with _lock:
+        rows = _get_conn().execute("SELECT * FROM user_library").fetchall()
+    for row in rows:
+        yield _row_to_dict(row)
@@ -4,11 +4,13 @@ from __future__ import annotations
 from backend.export_utils import insights_to_markdown
 from fastapi.responses import PlainTextResponse
 
+import asyncio
 import logging
 import os
 import time
 import hashlib
 import json
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone
 from typing import Any, Dict, List, Literal, Optional
 import requests
@@ -19,11 +21,30 @@ from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
 
-from backend.content_ingestion import extract_text_from_pdf, extract_text_from_url
+from backend.analytics_pipeline import analytics_writer
+from backend import article_pipeline
+from backend.article_pipeline import load_article, url_hash as article_url_hash
+from backend.content_ingestion import shutdown_pdf_workers
+from backend.meeting_jobs import AUDIO_TOO_LARGE, MAX_AUDIO_BYTES, meeting_jobs, router as meeting_jobs_router
 from backend.notion_oauth import router as notion_oauth_router
-from backend.smart_watch import router as smart_watch_router, get_transcript_context
+from backend.pdf_text_cache import load_pdf_text
+from backend.smart_watch import (
+    router as smart_watch_router,
+    cached_transcript,
+    cancel_speculative_tasks,
+    close_http_client,
+    get_transcript_context,
+)
 from backend.study_session import router as study_session_router
+from backend.transcript import (
+    Transcript,
+    TranscriptLike,
+    is_content_hash,
+    lookup_transcript,
+    remember_transcript,
+)
 from backend.unified_library import router as unified_library_router
+from backend.uploads import MAX_PDF_BYTES, PDF_TOO_LARGE, UploadSizeLimitMiddleware, spooled_upload
 from backend.supabase_client import (
     get_cached_insights,
     get_cached_transcript,
@@ -46,6 +67,13 @@ logger.setLevel(logging.INFO)
 ModeLiteral = Literal["study", "work", "quick"]
 
 
+TRANSCRIPT_REF_DESCRIPTION = (
+    "Instead of transcript: a YouTube video id/URL whose transcript is cached, or the sha256 "
+    "of a transcript sent earlier (returned as transcript_ref). 409 transcript_ref_unknown means "
+    "the server no longer has it and the full transcript must be sent."
+)
+
+
 class TranscriptRequest(BaseModel):
     """Request payload for /transcript endpoint."""
 
@@ -63,12 +91,15 @@ class TranscriptResponse(BaseModel):
     duration_minutes: float
     cache_hit: bool = False
     fetch_ms: int = 0
+    transcript_ref: Optional[str] = None
 
 
 class ExtractRequest(BaseModel):
     """Request payload for /extract endpoint."""
 
-    transcript: str = Field(..., description="Full transcript text to analyze")
+    transcript: Optional[str] = Field(default=None, description="Full transcript text to analyze")
+    transcript_ref: Optional[str] = Field(default=None, description=TRANSCRIPT_REF_DESCRIPTION)
+    include_source_text: bool = Field(True, description="Echo the transcript back as source_text.")
     mode: ModeLiteral = Field("study", description="Extraction mode")
     questions: Optional[List[str]] = Field(
         default=None,
@@ -93,6 +124,7 @@ class ExtractResponse(BaseModel):
     insights: Dict[str, Any]
     source_text: str = ""
     cache_hit: bool = False
+    transcript_ref: Optional[str] = None
 
 
 class ArticleExtractRequest(BaseModel):
@@ -101,17 +133,43 @@ class ArticleExtractRequest(BaseModel):
     session_id: str
     user_id: Optional[str] = None
     sections: Optional[Dict[str, bool]] = None
+    include_source_text: bool = True
 
 
-def _extract_with_cache(
-    content_text: str,
+async def _resolve_transcript(text: Optional[str], ref: Optional[str], empty_detail: str) -> Transcript:
+    """
+    The request's transcript: the inline text when given, else the cached
+    transcript named by ``ref`` (content sha256 or video id). Inline texts
+    are registered so later requests can send just the ref.
+    """
+    text = (text or "").strip()
+    if text:
+        return remember_transcript(text)
+    ref = (ref or "").strip()
+    if not ref:
+        raise HTTPException(status_code=400, detail=empty_detail)
+
+    if is_content_hash(ref):
+        transcript = lookup_transcript(ref)
+    else:
+        video_id = extract_video_id(ref)
+        transcript = await cached_transcript(video_id) if video_id else None
+    if not transcript:
+        raise HTTPException(
+            status_code=409,
+            detail={"error": "transcript_ref_unknown", "message": "Transcript not cached; send the full transcript."},
+        )
+    return transcript
+
+
+def _insights_cache_key(
     mode: ModeLiteral,
     sections: Dict[str, bool],
     source_hash: str,
     source_type: str,
-    duration_minutes: Optional[float] = None,
     questions: Optional[List[str]] = None,
-) -> ExtractResponse:
+) -> tuple[str, str]:
+    """Return (sections_key, cache_key) for an extraction."""
     sections_key = json.dumps(sections, sort_keys=True, separators=(",", ":"))
     questions_key = ""
     if questions:
@@ -119,27 +177,59 @@ def _extract_with_cache(
     cache_key = hashlib.sha256(
         f"{source_type}|{mode}|{sections_key}|{source_hash}|{PROMPT_VERSION}{questions_key}".encode("utf-8")
     ).hexdigest()
+    return sections_key, cache_key
 
+
+def _read_cached_insights(cache_key: str) -> Optional[Dict[str, Any]]:
     try:
         cached = get_cached_insights(cache_key)
     except Exception as exc:
         logger.warning("Insights cache read failed key=%s: %s", cache_key[:10], exc)
-        cached = None
+        return None
+    return cached if cached and isinstance(cached.get("insights"), dict) else None
+
+
+def _cached_extract_response(
+    cached: Dict[str, Any],
+    mode: ModeLiteral,
+    content_text: TranscriptLike,
+    duration_minutes: Optional[float],
+    include_source_text: bool = True,
+) -> ExtractResponse:
+    content = remember_transcript(content_text)
+    return ExtractResponse(
+        mode=mode,
+        word_count=int(cached.get("word_count") or content.word_count),
+        duration_minutes=duration_minutes,
+        insights=cached["insights"],
+        source_text=content.text if include_source_text else "",
+        cache_hit=True,
+        transcript_ref=content.sha256 if content else None,
+    )
+
+
+def _extract_with_cache(
+    content_text: TranscriptLike,
+    mode: ModeLiteral,
+    sections: Dict[str, bool],
+    source_hash: str,
+    source_type: str,
+    duration_minutes: Optional[float] = None,
+    questions: Optional[List[str]] = None,
+    check_cache: bool = True,
+    include_source_text: bool = True,
+) -> ExtractResponse:
+    sections_key, cache_key = _insights_cache_key(mode, sections, source_hash, source_type, questions)
+    content = remember_transcript(content_text)
 
-    if cached and isinstance(cached.get("insights"), dict):
+    cached = _read_cached_insights(cache_key) if check_cache else None
+    if cached:
         logger.info("Insights cache hit key=%s mode=%s source=%s", cache_key[:10], mode, source_type)
-        return ExtractResponse(
-            mode=mode,
-            word_count=int(cached.get("word_count") or len(content_text.split())),
-            duration_minutes=duration_minutes,
-            insights=cached["insights"],
-            source_text=content_text,
-            cache_hit=True,
-        )
+        return _cached_extract_response(cached, mode, content, duration_minutes, include_source_text)
 
     try:
         insights = generate_insights(
-            content=content_text,
+            content=content,
             mode=mode,
             sections=sections,
             duration_minutes=duration_minutes or 0,
@@ -150,7 +240,7 @@ def _extract_with_cache(
         logger.exception("Extraction failed for source=%s", source_type)
         raise HTTPException(status_code=502, detail=str(exc)) from exc
 
-    word_count = len(content_text.split())
+    word_count = content.word_count
     serialized = insights.dict() if isinstance(insights, (StudyNotes, WorkBrief, VideoInsights)) else insights
 
     try:
@@ -170,8 +260,9 @@ def _extract_with_cache(
         word_count=word_count,
         duration_minutes=duration_minutes,
         insights=serialized,
-        source_text=content_text,
+        source_text=content.text if include_source_text else "",
         cache_hit=False,
+        transcript_ref=content.sha256 if content else None,
     )
 
 
@@ -179,7 +270,8 @@ class QARequest(BaseModel):
     """Request payload for /qa endpoint."""
 
     question: str = Field(..., description="User question about the video.")
-    transcript: str = Field(..., description="Full transcript text used for Q&A.")
+    transcript: Optional[str] = Field(default=None, description="Full transcript text used for Q&A.")
+    transcript_ref: Optional[str] = Field(default=None, description=TRANSCRIPT_REF_DESCRIPTION)
     mode: ModeLiteral = Field("study", description="Current study/work/quick mode.")
     chat_mode: Literal["strict", "open"] = Field(
         "strict",
@@ -200,7 +292,8 @@ class QAResponse(BaseModel):
 
 
 class VerdictRequest(BaseModel):
-    transcript: str = Field(..., description="Transcript text used to decide watch/skim/skip.")
+    transcript: Optional[str] = Field(default=None, description="Transcript text used to decide watch/skim/skip.")
+    transcript_ref: Optional[str] = Field(default=None, description=TRANSCRIPT_REF_DESCRIPTION)
     mode: ModeLiteral = Field("quick", description="User intent mode for verdict context.")
 
 
@@ -348,10 +441,37 @@ class SynthesisResponse(BaseModel):
     synthesis_cache_used: bool = False
 
 
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    """Start background writers on boot; flush them and close shared clients on shutdown."""
+    await analytics_writer.start()
+    await meeting_jobs.start()
+    try:
+        yield
+    finally:
+        await cancel_speculative_tasks()
+        await meeting_jobs.stop()
+        await analytics_writer.stop()
+        await close_http_client()
+        await article_pipeline.close_http_client()
+        shutdown_pdf_workers()
+
+
 app = FastAPI(
     title="Notionclips Backend",
     version="1.0.0",
     description="REST API for transcript retrieval, AI extraction, Notion pushes, and Notion OAuth.",
+    lifespan=lifespan,
+)
+
+# Registered before CORS so oversized-upload 413s still carry CORS headers.
+app.add_middleware(
+    UploadSizeLimitMiddleware,
+    limits=[
+        (r"/extract/pdf", MAX_PDF_BYTES, PDF_TOO_LARGE),
+        (r"/study-session/[^/]+/add-pdf", MAX_PDF_BYTES, PDF_TOO_LARGE),
+        (r"/meeting/jobs", MAX_AUDIO_BYTES, AUDIO_TOO_LARGE),
+    ],
 )
 
 # More robust CORS for development
@@ -385,6 +505,7 @@ async def global_exception_handler(request: Request, exc: Exception):
         }
     )
 
+app.include_router(meeting_jobs_router)
 app.include_router(notion_oauth_router)
 app.include_router(smart_watch_router)
 app.include_router(study_session_router)
@@ -424,9 +545,9 @@ async def fetch_transcript(payload: TranscriptRequest) -> TranscriptResponse:
         if transcript:
             duration_raw = cached.get("duration_minutes")
             try:
-                duration = float(duration_raw) if duration_raw is not None else len(transcript.split()) / 130
+                duration = float(duration_raw) if duration_raw is not None else Transcript(transcript).duration_estimate_minutes
             except (TypeError, ValueError):
-                duration = len(transcript.split()) / 130
+                duration = Transcript(transcript).duration_estimate_minutes
             logger.info("Transcript cache hit for video_id=%s", video_id)
             fetch_ms = int((time.perf_counter() - start) * 1000)
             return TranscriptResponse(
@@ -434,6 +555,7 @@ async def fetch_transcript(payload: TranscriptRequest) -> TranscriptResponse:
                 duration_minutes=duration,
                 cache_hit=True,
                 fetch_ms=fetch_ms,
+                transcript_ref=remember_transcript(transcript).sha256,
             )
 
     try:
@@ -457,15 +579,14 @@ async def fetch_transcript(payload: TranscriptRequest) -> TranscriptResponse:
         duration_minutes=duration,
         cache_hit=False,
         fetch_ms=fetch_ms,
+        transcript_ref=remember_transcript(transcript.strip()).sha256 if transcript.strip() else None,
     )
 
 
 @app.post("/extract", response_model=ExtractResponse)
 async def extract_insights(payload: ExtractRequest) -> ExtractResponse:
-    """Run AI extraction on a provided transcript."""
-    transcript = payload.transcript.strip()
-    if not transcript:
-        raise HTTPException(status_code=400, detail="transcript must not be empty")
+    """Run AI extraction on a provided (or referenced) transcript."""
+    transcript = await _resolve_transcript(payload.transcript, payload.transcript_ref, "transcript must not be empty")
 
     sections = payload.sections or {
         "summary": True,
@@ -473,15 +594,15 @@ async def extract_insights(payload: ExtractRequest) -> ExtractResponse:
         "topics": True,
         "action_items": True,
     }
-    transcript_hash = hashlib.sha256(transcript.encode("utf-8")).hexdigest()
     return _extract_with_cache(
         content_text=transcript,
         mode=payload.mode,
         sections=sections,
-        source_hash=transcript_hash,
+        source_hash=transcript.sha256,
         source_type="video",
         duration_minutes=payload.duration_minutes,
         questions=payload.questions,
+        include_source_text=payload.include_source_text,
     )
 
 
@@ -492,6 +613,7 @@ async def extract_pdf(
     session_id: str = Form(...),
     user_id: Optional[str] = Form(None),
     sections: Optional[str] = Form(None),
+    include_source_text: bool = Form(True),
 ) -> ExtractResponse:
     if not session_id.strip():
         raise HTTPException(status_code=400, detail="session_id is required")
@@ -500,25 +622,23 @@ async def extract_pdf(
             status_code=422,
             detail={"error": "pdf_unreadable", "message": "Could not read this PDF. Try a text-based PDF."},
         )
-    file_bytes = await file.read()
-    if len(file_bytes) > 10 * 1024 * 1024:
-        raise HTTPException(
-            status_code=413,
-            detail={"error": "file_too_large", "message": "PDF must be under 10MB"},
-        )
-
     try:
-        _, text = extract_text_from_pdf(file_bytes)
+        async with spooled_upload(file, MAX_PDF_BYTES) as upload:
+            pdf = await load_pdf_text(upload.path, key=upload.sha256)
+    except HTTPException:
+        raise
     except Exception:
         raise HTTPException(
             status_code=422,
             detail={"error": "pdf_unreadable", "message": "Could not read this PDF. Try a text-based PDF."},
         )
+    text = pdf["text"]
     if not text.strip():
         raise HTTPException(
             status_code=422,
             detail={"error": "pdf_unreadable", "message": "Could not read this PDF. Try a text-based PDF."},
         )
+    logger.info("PDF text source=%s key=%s", pdf["source"], pdf["content_hash"][:10])
 
     parsed_sections = {"summary": True, "key_takeaways": True, "topics": True, "action_items": True}
     if sections:
@@ -529,14 +649,14 @@ async def extract_pdf(
         except Exception:
             pass
 
-    source_hash = hashlib.sha256(file_bytes).hexdigest()
     return _extract_with_cache(
         content_text=text,
         mode=mode,
         sections=parsed_sections,
-        source_hash=source_hash,
+        source_hash=pdf["content_hash"],
         source_type="pdf",
         duration_minutes=None,
+        include_source_text=include_source_text,
     )
 
 
@@ -548,8 +668,15 @@ async def extract_article(payload: ArticleExtractRequest) -> ExtractResponse:
     if not payload.session_id.strip():
         raise HTTPException(status_code=400, detail="session_id is required")
 
+    # Insights and article text are both keyed by the URL, so check the caches
+    # before touching the network; a cached copy of either skips the download.
+    sections = payload.sections or {"summary": True, "key_takeaways": True, "topics": True, "action_items": True}
+    source_hash = article_url_hash(url)
+    _, cache_key = _insights_cache_key(payload.mode, sections, source_hash, "article")
+    cached = await asyncio.to_thread(_read_cached_insights, cache_key)
+
     try:
-        _, text = extract_text_from_url(url)
+        article = await load_article(url, allow_stale=cached is not None)
     except Exception:
         raise HTTPException(
             status_code=422,
@@ -558,16 +685,22 @@ async def extract_article(payload: ArticleExtractRequest) -> ExtractResponse:
                 "message": "Could not extract content from this URL. The site may block automated access.",
             },
         )
+    logger.info("Article text source=%s key=%s", article["source"], source_hash[:10])
 
-    sections = payload.sections or {"summary": True, "key_takeaways": True, "topics": True, "action_items": True}
-    source_hash = hashlib.sha256(url.encode("utf-8")).hexdigest()
+    if cached:
+        logger.info("Insights cache hit key=%s mode=%s source=article", cache_key[:10], payload.mode)
+        return _cached_extract_response(
+            cached, payload.mode, article["text"], None, include_source_text=payload.include_source_text
+        )
     return _extract_with_cache(
-        content_text=text,
+        content_text=article["text"],
         mode=payload.mode,
         sections=sections,
         source_hash=source_hash,
         source_type="article",
         duration_minutes=None,
+        check_cache=False,
+        include_source_text=payload.include_source_text,
     )
 @app.get("/export/markdown")
 async def export_markdown(
@@ -1091,9 +1224,9 @@ async def push_timestamp_notes_endpoint(payload: TimestampNotionRequest) -> Time
 @app.post("/qa", response_model=QAResponse)
 async def answer_question_endpoint(payload: QARequest) -> QAResponse:
     """Answer user questions about a transcript using Gemini helper."""
-    transcript = payload.transcript.strip()
-    if not transcript:
-        raise HTTPException(status_code=400, detail="transcript must not be empty for Q&A")
+    transcript = await _resolve_transcript(
+        payload.transcript, payload.transcript_ref, "transcript must not be empty for Q&A"
+    )
 
     try:
         answer = answer_question(
@@ -1113,9 +1246,9 @@ async def answer_question_endpoint(payload: QARequest) -> QAResponse:
 
 @app.post("/verdict", response_model=VerdictResponse)
 async def pre_watch_verdict_endpoint(payload: VerdictRequest) -> VerdictResponse:
-    transcript = payload.transcript.strip()
-    if not transcript:
-        raise HTTPException(status_code=400, detail="transcript must not be empty for verdict")
+    transcript = await _resolve_transcript(
+        payload.transcript, payload.transcript_ref, "transcript must not be empty for verdict"
+    )
 
     verdict = get_pre_watch_verdict(transcript=transcript, mode=payload.mode)
 
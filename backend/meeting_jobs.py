@@ -0,0 +1,337 @@
+"""
+Meeting ingestion API: upload a recording, poll a job, get summary and tasks.
+
+POST /meeting/jobs streams the audio to a temp file (size-capped, never held
+in memory) and queues a job; a fixed set of background workers takes jobs in
+order, transcribes them on a TranscriptionEngine created with
+in_process=False and then runs analyze_meeting. That engine sends every
+recording, short or long, to its pool of TRANSCRIBE_WORKERS processes, so
+the model never loads into (or blocks) the web process. GET
+/meeting/jobs/{job_id} reports status, stage progress, the position in line
+while waiting (for a job worker or for the transcription engine) and, once
+done, the transcript, tasks and summary.
+
+Transcription needs packages that are not in requirements.txt: numpy plus
+openai-whisper (and ffmpeg on PATH) or faster-whisper, selected with
+TRANSCRIBE_BACKEND. Without them uploads are refused with 503 rather than
+accepted and failed later.
+
+Jobs live in process memory for MEETING_JOB_TTL_SECONDS; they are not
+persisted across restarts.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import logging
+import os
+import shutil
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, File, Form, HTTPException, UploadFile
+from pydantic import BaseModel
+
+from backend.memory_cache import TTLCache
+from backend.uploads import spooled_upload
+from gemini import analyze_meeting, calculate_accuracy
+
+logger = logging.getLogger("notionclips.meeting_jobs")
+
+router = APIRouter(prefix="/meeting", tags=["meeting"])
+
+MAX_AUDIO_BYTES = int(os.getenv("MAX_AUDIO_UPLOAD_BYTES", str(200 * 1024 * 1024)))
+MEETING_JOB_WORKERS = int(os.getenv("MEETING_JOB_WORKERS", "2"))
+MEETING_MAX_QUEUED = int(os.getenv("MEETING_MAX_QUEUED", "20"))
+MEETING_JOB_TTL_SECONDS = int(os.getenv("MEETING_JOB_TTL_SECONDS", str(24 * 3600)))
+
+AUDIO_EXTENSIONS = {".wav", ".mp3", ".m4a", ".mp4", ".ogg", ".flac", ".webm"}
+AUDIO_TOO_LARGE = {
+    "error": "file_too_large",
+    "message": f"Audio must be under {MAX_AUDIO_BYTES // (1024 * 1024)}MB",
+}
+
+# Share of the progress bar given to transcription; analysis fills the rest.
+_TRANSCRIBE_SHARE = 0.8
+
+TRANSCRIPTION_UNAVAILABLE = {
+    "error": "transcription_unavailable",
+    "message": "Meeting transcription is not installed on this server.",
+}
+
+# job_id -> job dict (see _new_job)
+MEETING_JOBS: TTLCache[Dict[str, Any]] = TTLCache(max_entries=1000, ttl_seconds=MEETING_JOB_TTL_SECONDS)
+
+
+class MeetingJobResponse(BaseModel):
+    job_id: str
+    status: str  # queued | transcribing | analyzing | done | failed
+    progress: float
+    queue_position: Optional[int] = None
+    filename: Optional[str] = None
+    created_at: str
+    updated_at: str
+    error: Optional[str] = None
+    duration_minutes: Optional[float] = None
+    transcript: Optional[str] = None
+    segments: Optional[List[Dict[str, Any]]] = None
+    tasks: Optional[Dict[str, Any]] = None
+    summary: Optional[Dict[str, Any]] = None
+    accuracy: Optional[float] = None
+    processing_seconds: Optional[float] = None
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _new_job(session_id: str, filename: str, path: str, include_tasks: bool, include_summary: bool) -> Dict[str, Any]:
+    now = _now()
+    return {
+        "job_id": uuid.uuid4().hex,
+        "session_id": session_id,
+        "filename": filename,
+        "path": path,
+        "include_tasks": include_tasks,
+        "include_summary": include_summary,
+        "status": "queued",
+        "progress": 0.0,
+        "created_at": now,
+        "updated_at": now,
+        "error": None,
+        "result": None,
+    }
+
+
+def _update(job: Dict[str, Any], **fields: Any) -> None:
+    job.update(fields)
+    job["updated_at"] = _now()
+
+
+def transcription_unavailable_reason() -> Optional[str]:
+    """Why jobs could not be transcribed here (missing packages), or None. Checked without importing them."""
+    backend = os.getenv("TRANSCRIBE_BACKEND", "whisper").strip().lower()
+    module = {"whisper": "whisper", "faster-whisper": "faster_whisper"}.get(backend)
+    if module is None:
+        return f"Unknown TRANSCRIBE_BACKEND {backend!r}"
+    for name in ("numpy", module):
+        if importlib.util.find_spec(name) is None:
+            return f"Python package {name!r} is not installed"
+    if backend == "whisper" and shutil.which("ffmpeg") is None:
+        return "ffmpeg is not on PATH (needed by openai-whisper)"
+    return None
+
+
+_engine = None
+
+
+def _get_engine():
+    """The jobs' TranscriptionEngine: pool-only, so Whisper never runs in this process."""
+    global _engine  # pylint: disable=global-statement
+    if _engine is None:
+        from transcriber import TranscriptionEngine  # heavy (numpy, model backends): only load when a job runs
+
+        _engine = TranscriptionEngine(in_process=False)
+    return _engine
+
+
+def _remove_file(path: Optional[str]) -> None:
+    if not path:
+        return
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class MeetingJobQueue:
+    """FIFO of meeting jobs drained by MEETING_JOB_WORKERS background tasks."""
+
+    def __init__(self, workers: int = MEETING_JOB_WORKERS, max_queued: int = MEETING_MAX_QUEUED):
+        self.workers = max(1, workers)
+        self.max_queued = max(1, max_queued)
+        self._queue: Optional[asyncio.Queue] = None
+        self._waiting: List[str] = []
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def running(self) -> bool:
+        return any(not task.done() for task in self._tasks)
+
+    def queue_position(self, job_id: str) -> Optional[int]:
+        try:
+            return self._waiting.index(job_id) + 1
+        except ValueError:
+            return None
+
+    async def start(self) -> None:
+        if self.running:
+            return
+        reason = transcription_unavailable_reason()
+        if reason:
+            logger.warning("Meeting transcription unavailable, uploads will get 503: %s", reason)
+        self._queue = asyncio.Queue()
+        self._waiting = []
+        self._tasks = [
+            asyncio.create_task(self._run(), name=f"meeting-job-worker-{i}") for i in range(self.workers)
+        ]
+
+    async def stop(self) -> None:
+        tasks, self._tasks = self._tasks, []
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if _engine is not None:
+            _engine.shutdown()
+        # Audio of jobs that never ran would otherwise stay in the temp dir.
+        while self._queue is not None and not self._queue.empty():
+            job = self._queue.get_nowait()
+            _remove_file(job.get("path"))
+        self._waiting = []
+
+    async def submit(self, job: Dict[str, Any]) -> None:
+        if not self.running:
+            await self.start()
+        if len(self._waiting) >= self.max_queued:
+            raise HTTPException(
+                status_code=429,
+                detail={"error": "queue_full", "message": "Too many meetings are waiting. Try again in a few minutes."},
+            )
+        MEETING_JOBS.set(job["job_id"], job)
+        self._waiting.append(job["job_id"])
+        self._queue.put_nowait(job)
+
+    async def _run(self) -> None:
+        assert self._queue is not None
+        while True:
+            job = await self._queue.get()
+            try:
+                self._waiting.remove(job["job_id"])
+            except ValueError:
+                pass
+            try:
+                await _process(job)
+            except asyncio.CancelledError:
+                _update(job, status="failed", error="Server shut down before the job finished")
+                raise
+            except Exception as exc:
+                logger.exception("Meeting job %s failed", job["job_id"])
+                _update(job, status="failed", error=str(exc) or type(exc).__name__)
+            finally:
+                _remove_file(job.pop("path", None))
+                self._queue.task_done()
+
+
+async def _process(job: Dict[str, Any]) -> None:
+    started = time.perf_counter()
+
+    def on_progress(fraction: float) -> None:
+        # Called from the engine's thread; a plain dict update is enough for polling.
+        _update(job, progress=round(fraction * _TRANSCRIBE_SHARE, 3))
+
+    # Reported as queued until the engine starts it (see _queue_position).
+    future = _get_engine().submit(job["path"], on_progress=on_progress)
+    _update(job, status="transcribing", progress=0.0, transcription=future)
+    try:
+        transcription = await asyncio.wrap_future(future)
+    finally:
+        job.pop("transcription", None)
+    transcript = transcription["text"]
+    if len(transcript.strip()) < 50:
+        raise ValueError("Transcript is too short or empty. Nothing to analyze.")
+
+    _update(job, status="analyzing", progress=_TRANSCRIBE_SHARE)
+    tasks, summary = await asyncio.to_thread(
+        analyze_meeting,
+        transcript,
+        include_tasks=job["include_tasks"],
+        include_summary=job["include_summary"],
+    )
+    result = {
+        "transcript": transcript,
+        "segments": transcription["segments"],
+        "duration_minutes": round(transcription["duration_seconds"] / 60, 2),
+        "tasks": tasks.dict() if tasks else None,
+        "summary": summary.dict() if summary else None,
+        "accuracy": calculate_accuracy(tasks) if tasks else None,
+        "processing_seconds": round(time.perf_counter() - started, 2),
+    }
+    _update(job, status="done", progress=1.0, result=result)
+    logger.info(
+        "Meeting job %s done: %.1f min audio in %.1fs",
+        job["job_id"], result["duration_minutes"], result["processing_seconds"],
+    )
+
+
+meeting_jobs = MeetingJobQueue()
+
+
+def _queue_position(job: Dict[str, Any]) -> Optional[int]:
+    """Jobs ahead of this one plus one, counting jobs the engine has not started yet."""
+    future = job.get("transcription")
+    if future is not None:
+        return _engine.queue_position(future) if _engine is not None else None
+    if job["status"] != "queued":
+        return None
+    position = meeting_jobs.queue_position(job["job_id"])
+    if position is None:
+        return None
+    return position + (_engine.pending_jobs() if _engine is not None else 0)
+
+
+def _job_response(job: Dict[str, Any]) -> MeetingJobResponse:
+    queue_position = _queue_position(job)
+    return MeetingJobResponse(
+        job_id=job["job_id"],
+        status="queued" if queue_position is not None else job["status"],
+        progress=job["progress"],
+        queue_position=queue_position,
+        filename=job.get("filename"),
+        created_at=job["created_at"],
+        updated_at=job["updated_at"],
+        error=job.get("error"),
+        **(job.get("result") or {}),
+    )
+
+
+@router.post("/jobs", response_model=MeetingJobResponse, status_code=202)
+async def create_meeting_job(
+    file: UploadFile = File(...),
+    session_id: str = Form(...),
+    include_tasks: bool = Form(True),
+    include_summary: bool = Form(True),
+):
+    if not session_id.strip():
+        raise HTTPException(status_code=400, detail="session_id is required")
+    reason = transcription_unavailable_reason()
+    if reason:
+        logger.warning("Refusing meeting upload: %s", reason)
+        raise HTTPException(status_code=503, detail=TRANSCRIPTION_UNAVAILABLE)
+    filename = file.filename or "meeting.wav"
+    suffix = os.path.splitext(filename)[1].lower()
+    if suffix not in AUDIO_EXTENSIONS:
+        raise HTTPException(
+            status_code=415,
+            detail={"error": "unsupported_audio", "message": f"Supported formats: {', '.join(sorted(AUDIO_EXTENSIONS))}"},
+        )
+
+    async with spooled_upload(file, MAX_AUDIO_BYTES, AUDIO_TOO_LARGE, suffix=suffix, keep=True) as upload:
+        path = upload.path
+    job = _new_job(session_id, filename, path, include_tasks, include_summary)
+    try:
+        await meeting_jobs.submit(job)
+    except HTTPException:
+        _remove_file(path)
+        raise
+    return _job_response(job)
+
+
+@router.get("/jobs/{job_id}", response_model=MeetingJobResponse)
+async def get_meeting_job(job_id: str, session_id: str):
+    job = MEETING_JOBS.get(job_id)
+    if not job or job.get("session_id") != session_id:
+        raise HTTPException(status_code=404, detail="Meeting job not found")
+    return _job_response(job)
@@ -0,0 +1,93 @@
+"""Small in-process caches shared by the backend routers."""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Generic, Hashable, Optional, Tuple, TypeVar
+
+V = TypeVar("V")
+
+
+class TTLCache(Generic[V]):
+    """Thread-safe LRU cache with a per-entry time-to-live.
+
+    Entries are evicted least-recently-used first once ``max_entries`` is
+    reached, and lazily dropped on read once older than ``ttl_seconds``.
+    A ``ttl_seconds`` of ``None`` keeps entries until they are evicted.
+    With ``weigh`` and ``max_weight`` (e.g. a size in bytes), entries are
+    also evicted while the total weight is over ``max_weight``, and a
+    single value heavier than that is not stored at all.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        ttl_seconds: Optional[float] = None,
+        max_weight: Optional[int] = None,
+        weigh: Optional[Callable[[V], int]] = None,
+    ):
+        self.max_entries = max(1, int(max_entries))
+        self.ttl_seconds = ttl_seconds
+        self.max_weight = max_weight if weigh is not None else None
+        self._weigh = weigh
+        self._weight = 0
+        self._data: "OrderedDict[Hashable, Tuple[float, V, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            stored_at, value, _ = entry
+            if self.ttl_seconds is not None and time.monotonic() - stored_at > self.ttl_seconds:
+                self._remove(key)
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: V) -> None:
+        weight = self._weigh(value) if self._weigh is not None else 0
+        with self._lock:
+            self._remove(key)
+            if self.max_weight is not None and weight > self.max_weight:
+                return
+            self._data[key] = (time.monotonic(), value, weight)
+            self._weight += weight
+            while len(self._data) > self.max_entries or (
+                self.max_weight is not None and self._weight > self.max_weight
+            ):
+                _, (_, _, evicted) = self._data.popitem(last=False)
+                self._weight -= evicted
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._remove(key)
+            return entry[1] if entry is not None else default
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._weight = 0
+
+    @property
+    def weight(self) -> int:
+        return self._weight
+
+    def _remove(self, key: Hashable) -> Optional[Tuple[float, V, int]]:
+        entry = self._data.pop(key, None)
+        if entry is not None:
+            self._weight -= entry[2]
+        return entry
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+
+_MISSING = object()
@@ -0,0 +1,144 @@
+"""
+Content-addressed cache of extracted PDF text.
+
+Uploads are keyed by sha256 of their bytes and looked up in process memory,
+then in the pdf_text_cache table, before PyMuPDF ever opens the file; a
+re-uploaded PDF costs one hash. Rows written by an older extractor
+(PDF_EXTRACTOR_VERSION) count as misses, so changing how text is extracted
+never serves stale output. Parsing runs off the event loop, and concurrent
+uploads of the same bytes share one parse. A shared parse reads its own
+hard link (or copy) of the spooled upload, so it survives the request that
+started it finishing or being cancelled.
+
+SQL to run in Supabase SQL editor:
+
+CREATE TABLE IF NOT EXISTS pdf_text_cache (
+  content_hash text PRIMARY KEY,
+  extractor_version text NOT NULL,
+  title text,
+  pdf_text text,
+  pdf_blob text,
+  byte_size bigint,
+  updated_at timestamptz DEFAULT now()
+);
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import os
+import shutil
+import uuid
+from typing import Any, Dict, Optional, Tuple
+
+from backend.content_ingestion import PdfSource, extract_text_from_pdf
+from backend.memory_cache import TTLCache
+from backend.supabase_client import get_cached_pdf_text, save_cached_pdf_text
+
+logger = logging.getLogger("notionclips.pdf_text_cache")
+
+PDF_EXTRACTOR_VERSION = "v2"  # v2: full text with [Page N] markers, no 50k truncation
+
+# content_hash -> {"title", "text"}
+PDF_TEXTS: TTLCache[Dict[str, str]] = TTLCache(max_entries=128, ttl_seconds=24 * 3600)
+
+_in_flight: Dict[str, asyncio.Task] = {}
+
+
+def content_hash(file_bytes: bytes) -> str:
+    return hashlib.sha256(file_bytes).hexdigest()
+
+
+def _source_size(source: PdfSource) -> int:
+    return len(source) if isinstance(source, (bytes, bytearray, memoryview)) else os.path.getsize(source)
+
+
+def _read_stored(key: str) -> Optional[Dict[str, str]]:
+    try:
+        row = get_cached_pdf_text(key)
+    except Exception as exc:
+        logger.warning("PDF text cache read failed key=%s: %s", key[:10], exc)
+        return None
+    if not row or row.get("extractor_version") != PDF_EXTRACTOR_VERSION or not row.get("pdf_text"):
+        return None
+    return {"title": row.get("title") or "Untitled Document", "text": row["pdf_text"]}
+
+
+def _write_stored(key: str, entry: Dict[str, str], byte_size: int) -> None:
+    try:
+        save_cached_pdf_text(
+            content_hash=key,
+            extractor_version=PDF_EXTRACTOR_VERSION,
+            title=entry["title"],
+            pdf_text=entry["text"],
+            byte_size=byte_size,
+        )
+    except Exception as exc:
+        logger.warning("PDF text cache write failed key=%s: %s", key[:10], exc)
+
+
+def _own_source(source: PdfSource) -> Tuple[PdfSource, Optional[str]]:
+    """
+    A source the shared parse can keep reading after the caller's temp file is
+    removed: paths are hard-linked (copied across filesystems). Returns the
+    source and the path to delete afterwards, if any.
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return bytes(source), None
+    path = os.fspath(source)
+    owned = os.path.join(os.path.dirname(path), f"notionclips-pdf-parse-{uuid.uuid4().hex}.pdf")
+    try:
+        os.link(path, owned)
+    except OSError:
+        shutil.copyfile(path, owned)
+    return owned, owned
+
+
+async def _parse(key: str, source: PdfSource, owned_path: Optional[str] = None) -> Dict[str, str]:
+    try:
+        title, text = await asyncio.to_thread(extract_text_from_pdf, source)
+        entry = {"title": title, "text": text}
+        if text.strip():
+            PDF_TEXTS.set(key, entry)
+            await asyncio.to_thread(_write_stored, key, entry, _source_size(source))
+        return entry
+    finally:
+        if owned_path:
+            try:
+                os.remove(owned_path)
+            except OSError:
+                pass
+
+
+async def load_pdf_text(source: PdfSource, key: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Return {"content_hash", "title", "text", "source"} for a PDF given as bytes
+    or as a spooled file path (pass the sha256 computed while spooling as
+    ``key``); source is memory, cache or parsed. Parse errors propagate.
+    """
+    if key is None:
+        if not isinstance(source, (bytes, bytearray, memoryview)):
+            raise ValueError("key is required when loading a PDF from a path")
+        key = await asyncio.to_thread(content_hash, bytes(source))
+    entry = PDF_TEXTS.get(key)
+    origin = "memory"
+    if entry is None:
+        entry = await asyncio.to_thread(_read_stored, key)
+        origin = "cache"
+        if entry:
+            PDF_TEXTS.set(key, entry)
+    if entry is None:
+        loop = asyncio.get_running_loop()
+        task = _in_flight.get(key)
+        if task is None or task.get_loop() is not loop:
+            # Taken before the task is created: the caller may be cancelled (and its
+            # temp file removed) before the task first runs.
+            owned, owned_path = _own_source(source)
+            task = loop.create_task(_parse(key, owned, owned_path))
+            _in_flight[key] = task
+            task.add_done_callback(lambda done, key=key: _in_flight.pop(key, None) if _in_flight.get(key) is done else None)
+        entry = await asyncio.shield(task)
+        origin = "parsed"
+    return {"content_hash": key, "title": entry["title"], "text": entry["text"], "source": origin}
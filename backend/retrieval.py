@@ -0,0 +1,140 @@
+"""Lightweight lexical retrieval (BM25) over in-memory passages."""
+
+from __future__ import annotations
+
+import heapq
+import math
+import re
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Tuple
+
+PASSAGE_WINDOW_WORDS = 120
+PASSAGE_STRIDE_WORDS = 90
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+_TOKEN_RE = re.compile(r"[a-z0-9]{3,}")
+_STOPWORDS = frozenset(
+    """
+    the and for are but not you all any can had her was one our out has have
+    him his how its may new now old see two who did get let say she too use
+    that with this from they will would there their what about which when
+    make like time just know take into your some could them than then these
+    other been were does doing also more most such only over very here where
+    why should between because being while after before each same both
+    """.split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word tokens (3+ chars) with common stopwords removed."""
+    return [tok for tok in _TOKEN_RE.findall((text or "").lower()) if tok not in _STOPWORDS]
+
+
+def stem(token: str) -> str:
+    """Strip common English inflections so "networks"/"network" and "learning"/"learn" match."""
+    if len(token) > 4:
+        if token.endswith("ies"):
+            return token[:-3] + "y"
+        for suffix in ("ing", "ed", "es", "s"):
+            if token.endswith(suffix) and not token.endswith("ss"):
+                return token[: -len(suffix)]
+    return token
+
+
+def split_into_passages(
+    text: str,
+    window_words: int = PASSAGE_WINDOW_WORDS,
+    stride_words: int = PASSAGE_STRIDE_WORDS,
+) -> List[str]:
+    """Split text into overlapping word windows."""
+    words = (text or "").split()
+    if not words:
+        return []
+    stride = max(1, min(stride_words, window_words))
+    passages = []
+    start = 0
+    while start < len(words):
+        end = min(start + window_words, len(words))
+        passages.append(" ".join(words[start:end]))
+        if end == len(words):
+            break
+        start += stride
+    return passages
+
+
+class PassageIndex:
+    """Inverted index with BM25 scoring over a fixed set of passages.
+
+    Each passage is a dict carrying at least ``text``; any other keys
+    (source index, timestamps, ...) are returned untouched with the hit.
+    All tokenisation happens once at build time, so a query only walks
+    the postings of its own tokens.
+    """
+
+    def __init__(self, passages: List[Dict[str, Any]]):
+        self.passages = passages
+        self._postings: Dict[str, List[Tuple[int, int]]] = {}
+        self._doc_len: List[int] = []
+        for doc_id, passage in enumerate(passages):
+            counts = Counter(tokenize(str(passage.get("text") or "")))
+            self._doc_len.append(sum(counts.values()))
+            for tok, tf in counts.items():
+                self._postings.setdefault(tok, []).append((doc_id, tf))
+        total = len(passages)
+        self._avg_len = (sum(self._doc_len) / total) if total else 0.0
+        self._idf = {
+            tok: math.log(1 + (total - len(post) + 0.5) / (len(post) + 0.5))
+            for tok, post in self._postings.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self.passages)
+
+    @classmethod
+    def from_sources(
+        cls,
+        sources: Iterable[Dict[str, Any]],
+        window_words: int = PASSAGE_WINDOW_WORDS,
+        stride_words: int = PASSAGE_STRIDE_WORDS,
+    ) -> "PassageIndex":
+        """Build an index from study-session style sources (``extracted_text``)."""
+        passages: List[Dict[str, Any]] = []
+        for source in sources:
+            text = str(source.get("extracted_text") or "")
+            for position, chunk in enumerate(split_into_passages(text, window_words, stride_words)):
+                passages.append({
+                    "source_index": source.get("source_index"),
+                    "position": position,
+                    "text": chunk,
+                })
+        return cls(passages)
+
+    def scores(self, query: str) -> Dict[int, float]:
+        """Return BM25 scores keyed by passage position for passages matching the query."""
+        scores: Dict[int, float] = {}
+        if not self.passages:
+            return scores
+        avg_len = self._avg_len or 1.0
+        for tok in set(tokenize(query)):
+            postings = self._postings.get(tok)
+            if not postings:
+                continue
+            idf = self._idf[tok]
+            for doc_id, tf in postings:
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self._doc_len[doc_id] / avg_len)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+        return scores
+
+    def search(self, query: str, top_k: int = 3) -> List[Tuple[float, Dict[str, Any]]]:
+        """Return up to ``top_k`` (score, passage) pairs, best first."""
+        scores = self.scores(query)
+        best = heapq.nlargest(max(1, top_k), scores.items(), key=lambda item: item[1])
+        return [(score, self.passages[doc_id]) for doc_id, score in best]
+
+    def first_passage(self, **match: Any) -> Dict[str, Any]:
+        """First passage whose fields equal ``match`` (e.g. ``source_index=0``), or ``{}``."""
+        for passage in self.passages:
+            if all(passage.get(k) == v for k, v in match.items()):
+                return passage
+        return {}
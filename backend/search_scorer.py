@@ -0,0 +1,124 @@
+"""
+Metadata-only relevance scoring for YouTube search results.
+
+Scores every candidate of a search page in one pass: the query is
+tokenised once (memoised across requests), then each video's title and
+channel token sets are matched against it with field weights, a
+whole-phrase bonus and a small duration prior. Scores map to a
+watch/skim/skip verdict plus a confidence that is high only for
+clear-cut matches, so callers can skip the LLM for those. Missing
+overlap is not evidence of irrelevance (synonyms, "C++", two-letter
+terms), so skips stay at or below SKIP_MAX_CONFIDENCE and never clear
+the fast-path threshold; only a strong watch can.
+"""
+
+from __future__ import annotations
+
+import re
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+from backend.retrieval import stem, tokenize
+
+TITLE_WEIGHT = 0.75
+CHANNEL_WEIGHT = 0.25
+PHRASE_BONUS = 0.15
+SHORT_VIDEO_SECONDS = 60
+LONG_VIDEO_SECONDS = 4 * 3600
+
+WATCH_SCORE = 0.6
+SKIP_SCORE = 0.25
+SKIP_MAX_CONFIDENCE = 0.6
+NO_TOKENS_CONFIDENCE = 0.4
+
+REASONS = {
+    "watch": "Title and channel strongly match your search intent.",
+    "skim": "Partially relevant by title keywords; verify focus before deep watching.",
+    "skip": "Metadata appears weakly related to your search intent.",
+    "no_tokens": "Search terms are too short to match on title; check the video directly.",
+}
+
+
+@lru_cache(maxsize=4096)
+def _query_profile(search_query: str) -> Tuple[FrozenSet[str], str]:
+    tokens = frozenset(stem(tok) for tok in tokenize(search_query))
+    phrase = " ".join(tokenize(search_query))
+    return tokens, phrase
+
+
+def _field_tokens(text: str) -> FrozenSet[str]:
+    return frozenset(stem(tok) for tok in tokenize(text))
+
+
+def parse_duration_seconds(value: Optional[str]) -> Optional[int]:
+    """Parse "SS", "MM:SS" or "H:MM:SS" into seconds."""
+    parts = str(value or "").strip().split(":")
+    if not parts or not all(re.fullmatch(r"\d{1,3}", p) for p in parts) or len(parts) > 3:
+        return None
+    seconds = 0
+    for part in parts:
+        seconds = seconds * 60 + int(part)
+    return seconds
+
+
+def _duration_factor(duration: Optional[str]) -> float:
+    seconds = parse_duration_seconds(duration)
+    if seconds is None:
+        return 1.0
+    if seconds < SHORT_VIDEO_SECONDS:
+        return 0.8
+    if seconds > LONG_VIDEO_SECONDS:
+        return 0.9
+    return 1.0
+
+
+def _verdict_for_score(score: float) -> Dict[str, Any]:
+    if score >= WATCH_SCORE:
+        verdict = "watch"
+        confidence = 0.6 + 0.35 * (score - WATCH_SCORE) / (1 - WATCH_SCORE)
+    elif score < SKIP_SCORE:
+        verdict = "skip"
+        confidence = 0.5 + (SKIP_MAX_CONFIDENCE - 0.5) * (SKIP_SCORE - score) / SKIP_SCORE
+    else:
+        verdict = "skim"
+        confidence = 0.5 + 0.1 * (score - SKIP_SCORE) / (WATCH_SCORE - SKIP_SCORE)
+    return {
+        "verdict": verdict,
+        "confidence": round(min(0.95, confidence), 3),
+        "reason": REASONS[verdict],
+    }
+
+
+def score_videos(search_query: str, videos: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Score all candidates for one query. Returns one dict per video, in input
+    order, with video_id, score, verdict, confidence and reason.
+    """
+    query_tokens, phrase = _query_profile(search_query)
+    if not query_tokens:
+        # Nothing to match on (e.g. "AI"): no lexical evidence either way.
+        return [
+            {
+                "video_id": str(video.get("video_id") or ""),
+                "score": 0.0,
+                "verdict": "skim",
+                "confidence": NO_TOKENS_CONFIDENCE,
+                "reason": REASONS["no_tokens"],
+            }
+            for video in videos
+        ]
+    out: List[Dict[str, Any]] = []
+    for video in videos:
+        title = str(video.get("title") or "")
+        title_cov = len(query_tokens & _field_tokens(title)) / len(query_tokens)
+        channel_cov = len(query_tokens & _field_tokens(str(video.get("channel_name") or ""))) / len(query_tokens)
+        score = TITLE_WEIGHT * title_cov + CHANNEL_WEIGHT * channel_cov
+        if phrase and len(query_tokens) > 1 and phrase in " ".join(tokenize(title)):
+            score += PHRASE_BONUS
+        score = min(1.0, score) * _duration_factor(video.get("duration"))
+        out.append({
+            "video_id": str(video.get("video_id") or ""),
+            "score": round(score, 4),
+            **_verdict_for_score(score),
+        })
+    return out
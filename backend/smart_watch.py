@@ -34,21 +34,50 @@ import logging
 import os
 import re
 import time
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
 
 import httpx
 from fastapi import APIRouter
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel, Field
 
+from backend.analytics_pipeline import (
+    enqueue_analytics_event,
+    enqueue_library_item,
+    enqueue_smart_watch_analysis,
+)
+from backend.coalescer import BatchCoalescer
+from backend.llm_scheduler import llm_scheduler, speculative_context
+from backend.retrieval import PassageIndex
+from backend.search_scorer import score_videos
+from backend.transcript import Transcript, TranscriptLike, remember_transcript
+from backend.smart_watch_cache import (
+    TRANSCRIPTS,
+    chunk_hash,
+    deep_cache_key,
+    get_search_verdict,
+    lookup_deep_result,
+    lookup_quick_result,
+    normalize_question,
+    store_deep_result,
+    store_quick_result,
+    store_search_verdict,
+)
+from backend.smart_watch_rollups import (
+    compute_rollup_deltas,
+    dashboard_scope,
+    remember_video_duration,
+    rollup_to_dashboard,
+)
 from backend.supabase_client import (
+    INSIGHTS_TABLE,
+    SMART_WATCH_TABLE,
     get_cached_transcript,
+    get_session,
+    get_smart_watch_rollup,
     list_smart_watch_analyses,
     list_analytics_events,
-    get_session,
     save_cached_transcript,
-    save_smart_watch_analysis,
-    track_analytics_event,
 )
 from youtube_mode import extract_video_id, get_youtube_transcript
 
@@ -59,6 +88,41 @@ OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1/chat/completions"
 OPENROUTER_MODEL = "openai/gpt-4o-mini"
 PROMPT_VERSION = "smart-watch-v1"
 QUICK_CHECK_WORD_BUDGET = 700
+SEARCH_VERDICT_BATCH_SIZE = 8
+SEARCH_FAST_PATH_CONFIDENCE = 0.85
+# Verdicts served because the LLM was unavailable are keyword guesses; never claim more than this.
+SEARCH_FALLBACK_MAX_CONFIDENCE = 0.55
+SEARCH_VERDICT_COALESCE_MS = int(os.getenv("SEARCH_VERDICT_COALESCE_MS", "25"))
+# Stage 2 sends only the best-ranked chunks to the LLM, widening while too
+# few moments have been found.
+DEEP_CANDIDATE_CHUNKS = 6
+DEEP_WIDEN_CHUNKS = 6
+DEEP_MAX_CHUNKS = 18
+DEEP_MIN_MOMENTS = 3
+# Streaming deep analysis stops once this many moments are found (the
+# response never carries more than _dedupe_and_rank keeps).
+DEEP_STREAM_STOP_AFTER = 5
+
+
+_http_client: Optional[httpx.AsyncClient] = None
+_http_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def _openrouter_client() -> httpx.AsyncClient:
+    """Shared keep-alive client for OpenRouter calls (one per event loop)."""
+    global _http_client, _http_client_loop  # pylint: disable=global-statement
+    loop = asyncio.get_running_loop()
+    if _http_client is None or _http_client.is_closed or _http_client_loop is not loop:
+        _http_client = httpx.AsyncClient(timeout=20)
+        _http_client_loop = loop
+    return _http_client
+
+
+async def close_http_client() -> None:
+    global _http_client  # pylint: disable=global-statement
+    client, _http_client = _http_client, None
+    if client is not None and not client.is_closed:
+        await client.aclose()
 
 
 class SmartWatchQuickRequest(BaseModel):
@@ -66,6 +130,8 @@ class SmartWatchQuickRequest(BaseModel):
     user_question: str
     session_id: str
     transcript: Optional[str] = None
+    # Start deep analysis in the background when the verdict is watch/skim.
+    speculative_deep: bool = False
 
 
 class SmartWatchQuickResult(BaseModel):
@@ -76,14 +142,27 @@ class SmartWatchQuickResult(BaseModel):
     video_id: str
     cache_hit: bool
     stage1_ms: int
+    verdict_cache_hit: bool = False
+    speculative_deep_started: bool = False
     prompt_version: str = PROMPT_VERSION
 
 
+class SmartWatchPrefetchRequest(BaseModel):
+    video_url: str
+    session_id: Optional[str] = None
+
+
+class SmartWatchPrefetchResponse(BaseModel):
+    video_id: str
+    status: str
+
+
 class SmartWatchDeepRequest(BaseModel):
     video_id: str
     user_question: str
     session_id: str
     verdict: str = "watch"
+    stream: bool = False
 
 
 class SmartWatchMoment(BaseModel):
@@ -99,11 +178,22 @@ class SmartWatchDeepResult(BaseModel):
     total_relevant_moments: int
     analysis_complete: bool
     stage2_ms: int
+    cache_hit: bool = False
     skipped: Optional[bool] = None
     reason: Optional[str] = None
     prompt_version: str = PROMPT_VERSION
 
 
+class SmartWatchDeepCancelRequest(BaseModel):
+    video_id: str
+    user_question: str
+    session_id: str
+
+
+class SmartWatchDeepCancelResponse(BaseModel):
+    cancelled: bool
+
+
 class SmartWatchHistoryRequest(BaseModel):
     session_id: str
     user_id: Optional[str] = None
@@ -168,6 +258,9 @@ class SearchResultVideoMeta(BaseModel):
 class SearchResultVerdictRequest(BaseModel):
     search_query: str
     videos: List[SearchResultVideoMeta] = Field(default_factory=list)
+    # Answer clear-cut videos from the metadata scorer without an LLM call.
+    fast_path: bool = False
+    fast_path_threshold: float = Field(default=SEARCH_FAST_PATH_CONFIDENCE, ge=0.0, le=1.0)
 
 
 class SearchResultVerdictItem(BaseModel):
@@ -175,11 +268,14 @@ class SearchResultVerdictItem(BaseModel):
     verdict: str
     reason: str
     confidence: float = 0.5
+    source: str = "llm"
 
 
 class SearchResultVerdictResponse(BaseModel):
     items: List[SearchResultVerdictItem]
     stage_ms: int
+    cache_hits: int = 0
+    fast_path_hits: int = 0
     prompt_version: str = PROMPT_VERSION
 
 
@@ -202,29 +298,17 @@ def _normalize_search_verdict(value: str) -> str:
     return "skim"
 
 
-def _metadata_heuristic_verdict(search_query: str, video: Dict[str, Any]) -> Dict[str, Any]:
-    query_tokens = {t for t in re.split(r"\W+", search_query.lower()) if len(t) > 2}
-    title = str(video.get("title") or "").lower()
-    channel = str(video.get("channel_name") or "").lower()
-    haystack = f"{title} {channel}"
-    overlap = sum(1 for token in query_tokens if token in haystack)
-    if overlap >= 3:
-        return {
-            "verdict": "watch",
-            "confidence": 0.75,
-            "reason": "Title and channel strongly match your search intent.",
+def _heuristic_search_items(search_query: str, videos: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    # Flagged so fallbacks are served but never cached.
+    return [
+        {
+            **item,
+            "confidence": min(item["confidence"], SEARCH_FALLBACK_MAX_CONFIDENCE),
+            "reason": f"Heuristic estimate: {item['reason']}",
+            "heuristic": True,
         }
-    if overlap >= 1:
-        return {
-            "verdict": "skim",
-            "confidence": 0.58,
-            "reason": "Partially relevant by title keywords; verify focus before deep watching.",
-        }
-    return {
-        "verdict": "skip",
-        "confidence": 0.42,
-        "reason": "Metadata appears weakly related to your search intent.",
-    }
+        for item in score_videos(search_query, videos)
+    ]
 
 
 async def _run_search_result_batch_verdict(
@@ -233,13 +317,7 @@ async def _run_search_result_batch_verdict(
 ) -> List[Dict[str, Any]]:
     key = os.getenv("OPENROUTER_API_KEY", "").strip()
     if not key:
-        return [
-            {
-                "video_id": str(v.get("video_id") or ""),
-                **_metadata_heuristic_verdict(search_query, v),
-            }
-            for v in videos
-        ]
+        return _heuristic_search_items(search_query, videos)
 
     system_prompt = """
 You are ranking YouTube search results for learning relevance.
@@ -278,58 +356,141 @@ Return ONLY valid JSON in this exact shape:
     headers = {"Authorization": f"Bearer {key}", "Content-Type": "application/json"}
 
     try:
-        async with httpx.AsyncClient(timeout=12) as client:
-            resp = await client.post(OPENROUTER_BASE_URL, headers=headers, json=payload)
-            resp.raise_for_status()
-            data = resp.json()
-            content = data["choices"][0]["message"]["content"]
-            parsed = _clean_json(content)
-            raw_items = parsed.get("items") or []
-            if not isinstance(raw_items, list):
-                raise ValueError("Invalid items payload")
-
-            by_id = {str(v.get("video_id") or ""): v for v in videos}
-            out: List[Dict[str, Any]] = []
-            for item in raw_items:
-                if not isinstance(item, dict):
-                    continue
-                video_id = str(item.get("video_id") or "").strip()
-                if not video_id or video_id not in by_id:
-                    continue
-                confidence = float(item.get("confidence", 0.5))
-                confidence = max(0.0, min(1.0, confidence))
-                reason = str(item.get("reason") or "Metadata relevance estimate.").strip()
-                if not reason:
-                    reason = "Metadata relevance estimate."
-                out.append(
-                    {
-                        "video_id": video_id,
-                        "verdict": _normalize_search_verdict(item.get("verdict")),
-                        "confidence": confidence,
-                        "reason": reason[:180],
-                    }
-                )
+        async with llm_scheduler.slot():
+            resp = await _openrouter_client().post(OPENROUTER_BASE_URL, headers=headers, json=payload, timeout=12)
+        resp.raise_for_status()
+        data = resp.json()
+        content = data["choices"][0]["message"]["content"]
+        parsed = _clean_json(content)
+        raw_items = parsed.get("items") or []
+        if not isinstance(raw_items, list):
+            raise ValueError("Invalid items payload")
+
+        by_id = {str(v.get("video_id") or ""): v for v in videos}
+        out: List[Dict[str, Any]] = []
+        for item in raw_items:
+            if not isinstance(item, dict):
+                continue
+            video_id = str(item.get("video_id") or "").strip()
+            if not video_id or video_id not in by_id:
+                continue
+            confidence = float(item.get("confidence", 0.5))
+            confidence = max(0.0, min(1.0, confidence))
+            reason = str(item.get("reason") or "Metadata relevance estimate.").strip()
+            if not reason:
+                reason = "Metadata relevance estimate."
+            out.append(
+                {
+                    "video_id": video_id,
+                    "verdict": _normalize_search_verdict(item.get("verdict")),
+                    "confidence": confidence,
+                    "reason": reason[:180],
+                }
+            )
 
-            if not out:
-                raise ValueError("No usable verdicts")
+        if not out:
+            raise ValueError("No usable verdicts")
 
-            seen = {o["video_id"] for o in out}
-            for video in videos:
-                video_id = str(video.get("video_id") or "")
-                if not video_id or video_id in seen:
-                    continue
-                out.append({"video_id": video_id, **_metadata_heuristic_verdict(search_query, video)})
+        seen = {o["video_id"] for o in out}
+        unseen = [v for v in videos if str(v.get("video_id") or "") and str(v.get("video_id")) not in seen]
+        out.extend(_heuristic_search_items(search_query, unseen))
 
-            return out
+        return out
     except Exception as exc:
         logger.warning("Search result batch verdict failed, using heuristic fallback: %s", exc)
-        return [
-            {
-                "video_id": str(v.get("video_id") or ""),
-                **_metadata_heuristic_verdict(search_query, v),
-            }
-            for v in videos
-        ]
+        return _heuristic_search_items(search_query, videos)
+
+
+async def _search_verdict_batch(search_query: str, videos: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    items = await _run_search_result_batch_verdict(search_query, videos)
+    out: Dict[str, Dict[str, Any]] = {}
+    for item in items:
+        video_id = str(item.get("video_id") or "").strip()
+        if not video_id:
+            continue
+        out[video_id] = item
+        if not item.get("heuristic"):
+            store_search_verdict(search_query, video_id, PROMPT_VERSION, item)
+    return out
+
+
+# Cache misses from concurrent requests for the same query share one LLM call.
+search_verdict_coalescer: BatchCoalescer[Dict[str, Any]] = BatchCoalescer(
+    _search_verdict_batch,
+    max_batch=SEARCH_VERDICT_BATCH_SIZE,
+    window_ms=SEARCH_VERDICT_COALESCE_MS,
+)
+
+
+def _fetch_transcript(video_id: str, fetch_missing: bool) -> Tuple[Transcript, float, str]:
+    try:
+        cached = get_cached_transcript(video_id)
+    except Exception as exc:
+        logger.warning("Smart Watch cache read failed: %s", exc)
+        cached = None
+
+    if cached and cached.get("transcript"):
+        transcript = str(cached.get("transcript", "")).strip()
+        try:
+            duration_minutes = float(cached.get("duration_minutes") or 0.0)
+        except (TypeError, ValueError):
+            duration_minutes = 0.0
+        source = "supabase"
+    elif fetch_missing:
+        transcript, duration_minutes = get_youtube_transcript(video_id)
+        try:
+            save_cached_transcript(video_id, transcript, duration_minutes)
+        except Exception as exc:
+            logger.warning("Smart Watch transcript cache write failed: %s", exc)
+        source = "youtube"
+    else:
+        return Transcript(""), 0.0, "missing"
+
+    remember_video_duration(video_id, duration_minutes)
+    # The Transcript object is cached, so its derived indexes are shared across requests.
+    transcript = remember_transcript(transcript)
+    if transcript:
+        TRANSCRIPTS.set(video_id, {"transcript": transcript, "duration_minutes": duration_minutes})
+    return transcript, duration_minutes, source
+
+
+_transcript_loads: Dict[Tuple[str, bool], asyncio.Future] = {}
+
+
+def _start_transcript_load(video_id: str, fetch_missing: bool = True) -> asyncio.Future:
+    """Start (or join) a background transcript load; concurrent callers share one fetch."""
+    key = (video_id, fetch_missing)
+    task = _transcript_loads.get(key)
+    if task is not None and task.get_loop() is asyncio.get_running_loop():
+        return task
+    task = asyncio.ensure_future(asyncio.to_thread(_fetch_transcript, video_id, fetch_missing))
+    _transcript_loads[key] = task
+
+    def _done(done: asyncio.Future) -> None:
+        if _transcript_loads.get(key) is done:
+            del _transcript_loads[key]
+        if not done.cancelled() and done.exception() is not None:
+            logger.info("Transcript load failed video_id=%s: %s", video_id, done.exception())
+
+    task.add_done_callback(_done)
+    return task
+
+
+async def _load_transcript(video_id: str, fetch_missing: bool = True) -> Tuple[Transcript, float, str]:
+    """
+    Transcript, duration and where it came from ("memory", "supabase",
+    "youtube" or "missing"). Raises when YouTube fetching fails.
+    """
+    hit = TRANSCRIPTS.get(video_id)
+    if hit:
+        return hit["transcript"], float(hit.get("duration_minutes") or 0.0), "memory"
+    return await asyncio.shield(_start_transcript_load(video_id, fetch_missing))
+
+
+async def cached_transcript(video_id: str) -> Transcript:
+    """A video's transcript from memory or the transcript cache, never fetched from YouTube; empty when unknown."""
+    transcript, _, _ = await _load_transcript(video_id, fetch_missing=False)
+    return transcript
 
 
 def _clean_json(raw: str) -> Dict[str, Any]:
@@ -340,8 +501,13 @@ def _clean_json(raw: str) -> Dict[str, Any]:
     return json.loads(content)
 
 
-def _extract_timestamped_sentences(transcript: str) -> List[Dict[str, Any]]:
-    parts = re.split(r"(\[\d{2}:\d{2}\])", transcript)
+def _extract_timestamped_sentences(transcript: TranscriptLike) -> List[Dict[str, Any]]:
+    """Sentences tagged with their preceding [MM:SS] marker; parsed once per Transcript (shared, do not mutate)."""
+    return Transcript.of(transcript).cached("smart_watch.timestamped_sentences", _parse_timestamped_sentences)
+
+
+def _parse_timestamped_sentences(transcript: Transcript) -> List[Dict[str, Any]]:
+    parts = re.split(r"(\[\d{2}:\d{2}\])", transcript.text)
     current_ts = 0
     out: List[Dict[str, Any]] = []
 
@@ -366,7 +532,7 @@ def _format_mmss(seconds: int) -> str:
     return f"{m:02d}:{s:02d}"
 
 
-def get_transcript_context(transcript: str, target_seconds: int, window_seconds: int = 15) -> str:
+def get_transcript_context(transcript: TranscriptLike, target_seconds: int, window_seconds: int = 15) -> str:
     """
     Extracts the most relevant sentences from a timestamped transcript 
     for a given target time.
@@ -404,7 +570,7 @@ def get_transcript_context(transcript: str, target_seconds: int, window_seconds:
     return " ".join(relevant[:2])
 
 
-def _first_quarter_text(transcript: str) -> str:
+def _first_quarter_text(transcript: TranscriptLike) -> str:
     timestamped = _extract_timestamped_sentences(transcript)
     if timestamped:
         end = max(1, int(len(timestamped) * 0.25))
@@ -417,19 +583,16 @@ def _first_quarter_text(transcript: str) -> str:
                 lines.append(f"[{ts}] {text}")
         return "\n".join(lines)
 
-    tokens = transcript.split()
-    if not tokens:
+    source = Transcript.of(transcript)
+    if not source.word_count:
         return ""
-    end = max(1, int(len(tokens) * 0.25))
-    return " ".join(tokens[:end])
+    return source.opening(max(1, int(source.word_count * 0.25)))
 
 
-def _fixed_budget_excerpt(transcript: str, word_budget: int = QUICK_CHECK_WORD_BUDGET) -> str:
-    tokens = transcript.split()
-    if not tokens:
-        return ""
+def _fixed_budget_excerpt(transcript: TranscriptLike, word_budget: int = QUICK_CHECK_WORD_BUDGET) -> str:
     safe_budget = max(600, min(800, int(word_budget)))
-    return " ".join(tokens[:safe_budget])
+    # Only scans the first words; the extension's full transcript is never split.
+    return Transcript.of(transcript).opening(safe_budget)
 
 
 async def _run_stage1_quick_check(
@@ -472,7 +635,7 @@ Video title: {video_title}
 
     key = os.getenv("OPENROUTER_API_KEY", "").strip()
     if not key:
-        return {"verdict": "skim", "confidence": 0.5, "reason": "Analysis unavailable", "estimated_timestamp_range": None}
+        return {"verdict": "skim", "confidence": 0.5, "reason": "Analysis unavailable", "estimated_timestamp_range": None, "fallback": True}
 
     payload = {
         "model": OPENROUTER_MODEL,
@@ -485,35 +648,47 @@ Video title: {video_title}
     headers = {"Authorization": f"Bearer {key}", "Content-Type": "application/json"}
 
     try:
-        async with httpx.AsyncClient(timeout=10) as client:
-            resp = await client.post(OPENROUTER_BASE_URL, headers=headers, json=payload)
-            resp.raise_for_status()
-            data = resp.json()
-            content = data["choices"][0]["message"]["content"]
-            parsed = _clean_json(content)
-            verdict = str(parsed.get("verdict", "skim")).lower()
-            if verdict not in {"watch", "skim", "skip"}:
-                verdict = "skim"
-            confidence = float(parsed.get("confidence", 0.5))
-            confidence = max(0.0, min(1.0, confidence))
-            reason = str(parsed.get("reason", "Analysis unavailable")).strip() or "Analysis unavailable"
-            ts_range = parsed.get("estimated_timestamp_range")
-            ts_range = str(ts_range).strip() if isinstance(ts_range, str) and ts_range.strip() else None
-            return {
-                "verdict": verdict,
-                "confidence": confidence,
-                "reason": reason,
-                "estimated_timestamp_range": ts_range,
-            }
+        async with llm_scheduler.slot():
+            resp = await _openrouter_client().post(OPENROUTER_BASE_URL, headers=headers, json=payload, timeout=10)
+        resp.raise_for_status()
+        data = resp.json()
+        content = data["choices"][0]["message"]["content"]
+        parsed = _clean_json(content)
+        verdict = str(parsed.get("verdict", "skim")).lower()
+        if verdict not in {"watch", "skim", "skip"}:
+            verdict = "skim"
+        confidence = float(parsed.get("confidence", 0.5))
+        confidence = max(0.0, min(1.0, confidence))
+        reason = str(parsed.get("reason", "Analysis unavailable")).strip() or "Analysis unavailable"
+        ts_range = parsed.get("estimated_timestamp_range")
+        ts_range = str(ts_range).strip() if isinstance(ts_range, str) and ts_range.strip() else None
+        return {
+            "verdict": verdict,
+            "confidence": confidence,
+            "reason": reason,
+            "estimated_timestamp_range": ts_range,
+        }
     except Exception as exc:
         logger.warning("Stage 1 quick-check failed: %s", exc)
-        return {"verdict": "skim", "confidence": 0.5, "reason": "Analysis unavailable", "estimated_timestamp_range": None}
+        return {"verdict": "skim", "confidence": 0.5, "reason": "Analysis unavailable", "estimated_timestamp_range": None, "fallback": True}
 
 
 def _chunk_by_sentences(items: List[Dict[str, Any]], chunk_size: int = 30) -> List[List[Dict[str, Any]]]:
     return [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
 
 
+def _rank_chunks(user_question: str, formatted_chunks: List[str], index: Optional[PassageIndex] = None) -> List[int]:
+    """
+    Chunk indices ordered by BM25 relevance to the question. Chunks with no
+    lexical overlap follow in transcript order so widening still makes progress.
+    """
+    if index is None:
+        index = PassageIndex([{"text": ctext} for ctext in formatted_chunks])
+    scores = index.scores(user_question)
+    matched = sorted(scores, key=lambda i: (-scores[i], i))
+    return matched + [i for i in range(len(formatted_chunks)) if i not in scores]
+
+
 def _format_chunk_with_timestamps(chunk: List[Dict[str, Any]]) -> str:
     lines = []
     for item in chunk:
@@ -524,10 +699,11 @@ def _format_chunk_with_timestamps(chunk: List[Dict[str, Any]]) -> str:
     return "\n".join(lines)
 
 
-async def _analyze_chunk(user_question: str, chunk_text: str) -> List[Dict[str, Any]]:
+async def _analyze_chunk(user_question: str, chunk_text: str) -> Optional[List[Dict[str, Any]]]:
+    """Moments found in one chunk, or None when the chunk could not be analysed."""
     key = os.getenv("OPENROUTER_API_KEY", "").strip()
     if not key:
-        return []
+        return None
 
     system_prompt = """
 You are a precise timestamp extractor. Given a portion of a YouTube
@@ -569,38 +745,42 @@ Transcript chunk (with timestamps):
     headers = {"Authorization": f"Bearer {key}", "Content-Type": "application/json"}
 
     try:
-        async with httpx.AsyncClient(timeout=20) as client:
-            resp = await client.post(OPENROUTER_BASE_URL, headers=headers, json=payload)
-            resp.raise_for_status()
-            data = resp.json()
-            content = data["choices"][0]["message"]["content"]
-            parsed = _clean_json(content)
-            moments = parsed.get("relevant_moments") or []
-            if not isinstance(moments, list):
-                return []
-            cleaned: List[Dict[str, Any]] = []
-            for m in moments:
-                if not isinstance(m, dict):
-                    continue
-                quote = str(m.get("quote", "")).strip()
-                relevance = str(m.get("relevance", "")).strip()
+        async with llm_scheduler.slot():
+            resp = await _openrouter_client().post(OPENROUTER_BASE_URL, headers=headers, json=payload, timeout=20)
+        resp.raise_for_status()
+        data = resp.json()
+        content = data["choices"][0]["message"]["content"]
+        parsed = _clean_json(content)
+        moments = parsed.get("relevant_moments") or []
+        if not isinstance(moments, list):
+            return []
+        cleaned: List[Dict[str, Any]] = []
+        for m in moments:
+            if not isinstance(m, dict):
+                continue
+            try:
+                seconds = int(m.get("timestamp_seconds", 0))
+            except (TypeError, ValueError):
+                continue
+            quote = str(m.get("quote", "")).strip()
+            relevance = str(m.get("relevance", "")).strip()
                 
-                # Fallback to transcript context if AI didn't provide a quote
-                if not quote:
-                    quote = get_transcript_context(chunk_text, seconds)
-
-                cleaned.append(
-                    {
-                        "timestamp_seconds": max(0, seconds),
-                        "timestamp_display": str(m.get("timestamp_display", _format_mmss(seconds))),
-                        "quote": quote,
-                        "relevance": relevance,
-                    }
-                )
-            return cleaned
+            # Fallback to transcript context if AI didn't provide a quote
+            if not quote:
+                quote = get_transcript_context(chunk_text, seconds)
+
+            cleaned.append(
+                {
+                    "timestamp_seconds": max(0, seconds),
+                    "timestamp_display": str(m.get("timestamp_display", _format_mmss(seconds))),
+                    "quote": quote,
+                    "relevance": relevance,
+                }
+            )
+        return cleaned
     except Exception as exc:
         logger.warning("Stage 2 chunk analysis failed: %s", exc)
-        return []
+        return None
 
 
 def _dedupe_and_rank(moments: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
@@ -637,54 +817,52 @@ async def smart_watch_quick_check(payload: SmartWatchQuickRequest):
     if not video_id:
         return JSONResponse(status_code=400, content={"error": "invalid_video_url", "message": "Could not extract video id"})
 
-    cache_hit = False
-    transcript: Optional[str] = (payload.transcript or "").strip() or None
+    transcript: Optional[Transcript] = Transcript((payload.transcript or "").strip()) or None
     direct_transcript = bool(transcript)
-    duration_minutes: float = 0.0
-
-    if not transcript:
-        try:
-            cached = get_cached_transcript(video_id)
-        except Exception as exc:
-            logger.warning("Smart Watch cache read failed: %s", exc)
-            cached = None
+    excerpt_mode = "direct" if direct_transcript else "first_quarter"
+    video_title = video_id
 
-        if cached and cached.get("transcript"):
-            transcript = str(cached.get("transcript", "")).strip()
-            cache_hit = bool(transcript)
+    stage1 = lookup_quick_result(video_id, question, PROMPT_VERSION, excerpt_mode)
+    verdict_cache_hit = stage1 is not None
+    cache_hit = verdict_cache_hit
+    if stage1 is None:
+        if not transcript:
             try:
-                duration_minutes = float(cached.get("duration_minutes") or 0.0)
-            except (TypeError, ValueError):
-                duration_minutes = 0.0
+                transcript, _, source = await _load_transcript(video_id)
+            except Exception:
+                return JSONResponse(
+                    status_code=422,
+                    content={"error": "transcript_unavailable", "message": "Could not fetch transcript for this video"},
+                )
+            cache_hit = source != "youtube"
 
-    if not transcript:
-        try:
-            transcript, duration_minutes = get_youtube_transcript(video_id)
-        except Exception:
-            return JSONResponse(
-                status_code=422,
-                content={"error": "transcript_unavailable", "message": "Could not fetch transcript for this video"},
-            )
-        try:
-            save_cached_transcript(video_id, transcript, duration_minutes)
-        except Exception as exc:
-            logger.warning("Smart Watch transcript cache write failed: %s", exc)
+        if direct_transcript:
+            opening = _fixed_budget_excerpt(transcript, QUICK_CHECK_WORD_BUDGET)
+            excerpt_label = "Transcript opening (fixed 700-word budget from extension)"
+        else:
+            opening = _first_quarter_text(transcript)
+            excerpt_label = "Transcript opening (first 25%)"
 
-    if direct_transcript:
-        opening = _fixed_budget_excerpt(transcript, QUICK_CHECK_WORD_BUDGET)
-        excerpt_label = "Transcript opening (fixed 700-word budget from extension)"
-    else:
-        opening = _first_quarter_text(transcript)
-        excerpt_label = "Transcript opening (first 25%)"
+        stage1 = await _run_stage1_quick_check(question, video_title, opening, excerpt_label=excerpt_label)
+        if not stage1.pop("fallback", False):
+            store_quick_result(video_id, question, PROMPT_VERSION, excerpt_mode, stage1)
 
-    video_title = video_id
-    stage1 = await _run_stage1_quick_check(question, video_title, opening, excerpt_label=excerpt_label)
     stage1_ms = int((time.perf_counter() - stage1_start) * 1000)
     out = _safe_stage1_default(video_id=video_id, stage1_ms=stage1_ms)
     out.update(stage1)
     out["video_id"] = video_id
     out["cache_hit"] = cache_hit
+    out["verdict_cache_hit"] = verdict_cache_hit
     out["stage1_ms"] = stage1_ms
+    if payload.speculative_deep and out["verdict"] in {"watch", "skim"}:
+        if direct_transcript and TRANSCRIPTS.get(video_id) is None:
+            # The speculative run only reads cached transcripts; make the inline one visible to it.
+            transcript = remember_transcript(transcript)
+            TRANSCRIPTS.set(
+                video_id,
+                {"transcript": transcript, "duration_minutes": transcript.duration_estimate_minutes},
+            )
+        out["speculative_deep_started"] = start_speculative_deep(video_id, question, payload.session_id.strip())
     out["prompt_version"] = PROMPT_VERSION
 
     user_id = None
@@ -694,7 +872,7 @@ async def smart_watch_quick_check(payload: SmartWatchQuickRequest):
     except Exception:
         user_id = None
     try:
-        save_smart_watch_analysis(
+        enqueue_smart_watch_analysis(
             session_id=payload.session_id,
             video_id=video_id,
             video_url=video_url,
@@ -708,32 +886,24 @@ async def smart_watch_quick_check(payload: SmartWatchQuickRequest):
             relevant_moments=[],
             stage1_ms=stage1_ms,
         )
-        
-        # Also save to unified library
-        try:
-            save_library_item(
-                session_id=payload.session_id,
-                user_id=user_id,
-                content_type="smart_watch",
-                title=video_title or video_id or "YouTube Video",
-                source_url=video_url,
-                video_id=video_id,
-                summary=question,
-                content_data={
-                    "verdict": out["verdict"],
-                    "confidence": out["confidence"],
-                    "reason": out["reason"],
-                    "estimated_timestamp_range": out["estimated_timestamp_range"],
-                    "user_question": question,
-                    "stage1_ms": stage1_ms,
-                },
-            )
-        except Exception as lib_exc:
-            logger.warning(f"Failed to save Smart Watch to library: {lib_exc}")
-    except Exception as exc:
-        logger.warning("Failed saving Smart Watch quick analysis: %s", exc)
-    try:
-        track_analytics_event(
+        enqueue_library_item(
+            session_id=payload.session_id,
+            user_id=user_id,
+            content_type="smart_watch",
+            title=video_title or video_id or "YouTube Video",
+            source_url=video_url,
+            video_id=video_id,
+            summary=question,
+            content_data={
+                "verdict": out["verdict"],
+                "confidence": out["confidence"],
+                "reason": out["reason"],
+                "estimated_timestamp_range": out["estimated_timestamp_range"],
+                "user_question": question,
+                "stage1_ms": stage1_ms,
+            },
+        )
+        enqueue_analytics_event(
             session_id=payload.session_id,
             user_id=user_id,
             event_name="smart_watch_quick_check",
@@ -742,16 +912,33 @@ async def smart_watch_quick_check(payload: SmartWatchQuickRequest):
                 "verdict": out["verdict"],
                 "confidence": out["confidence"],
                 "cache_hit": cache_hit,
+                "verdict_cache_hit": verdict_cache_hit,
                 "stage1_ms": stage1_ms,
                 "prompt_version": PROMPT_VERSION,
             },
         )
     except Exception as exc:
-        logger.warning("Failed tracking quick-check analytics: %s", exc)
+        logger.warning("Failed queueing Smart Watch quick analysis writes: %s", exc)
 
     return SmartWatchQuickResult(**out)
 
 
+@router.post("/prefetch", response_model=SmartWatchPrefetchResponse)
+async def smart_watch_prefetch(payload: SmartWatchPrefetchRequest):
+    """
+    Warm the transcript caches for a video the user is looking at, so a
+    later quick-check only waits on the LLM. Returns immediately with
+    status "ready" (already in memory) or "warming" (load started).
+    """
+    video_id = extract_video_id(payload.video_url.strip())
+    if not video_id:
+        return JSONResponse(status_code=400, content={"error": "invalid_video_url", "message": "Could not extract video id"})
+    if TRANSCRIPTS.get(video_id) is not None:
+        return SmartWatchPrefetchResponse(video_id=video_id, status="ready")
+    _start_transcript_load(video_id)
+    return SmartWatchPrefetchResponse(video_id=video_id, status="warming")
+
+
 @router.post("/search-verdicts", response_model=SearchResultVerdictResponse)
 async def smart_watch_search_verdicts(payload: SearchResultVerdictRequest):
     stage_start = time.perf_counter()
@@ -781,7 +968,37 @@ async def smart_watch_search_verdicts(payload: SearchResultVerdictRequest):
     if not videos:
         return JSONResponse(status_code=400, content={"error": "invalid_input", "message": "videos must contain video_id and title"})
 
-    items = await _run_search_result_batch_verdict(search_query, videos)
+    group = " ".join(search_query.lower().split())
+    items: List[Dict[str, Any]] = []
+    misses: List[Dict[str, Any]] = []
+    for video in videos:
+        cached = get_search_verdict(search_query, video["video_id"], PROMPT_VERSION)
+        if cached:
+            items.append({"video_id": video["video_id"], **cached, "source": "cache"})
+        else:
+            misses.append(video)
+
+    fast_path_hits = 0
+    if payload.fast_path and misses:
+        undecided = []
+        for video, scored in zip(misses, score_videos(search_query, misses)):
+            if scored["confidence"] >= payload.fast_path_threshold:
+                items.append({**scored, "source": "heuristic"})
+                fast_path_hits += 1
+            else:
+                undecided.append(video)
+        misses = undecided
+
+    results = await asyncio.gather(
+        *[search_verdict_coalescer.submit(group, video["video_id"], video) for video in misses],
+        return_exceptions=True,
+    )
+    for video, result in zip(misses, results):
+        if isinstance(result, Exception):
+            result = _heuristic_search_items(search_query, [video])[0]
+        items.append({**result, "source": "heuristic" if result.get("heuristic") else "llm"})
+    order = {video["video_id"]: position for position, video in enumerate(videos)}
+    items.sort(key=lambda item: order.get(str(item.get("video_id") or ""), len(order)))
     stage_ms = int((time.perf_counter() - stage_start) * 1000)
 
     normalized = [
@@ -790,79 +1007,241 @@ async def smart_watch_search_verdicts(payload: SearchResultVerdictRequest):
             verdict=_normalize_search_verdict(item.get("verdict")),
             reason=str(item.get("reason") or "Metadata relevance estimate.").strip(),
             confidence=float(item.get("confidence", 0.5)),
+            source=str(item.get("source") or "llm"),
         )
         for item in items
         if str(item.get("video_id") or "").strip()
     ]
 
-    return SearchResultVerdictResponse(items=normalized, stage_ms=stage_ms)
+    return SearchResultVerdictResponse(
+        items=normalized,
+        stage_ms=stage_ms,
+        cache_hits=sum(1 for item in items if item.get("source") == "cache"),
+        fast_path_hits=fast_path_hits,
+    )
 
 
-@router.post("/deep-analysis", response_model=SmartWatchDeepResult)
-async def smart_watch_deep_analysis(payload: SmartWatchDeepRequest):
-    stage2_start = time.perf_counter()
-    video_id = payload.video_id.strip()
-    question = payload.user_question.strip()
-    if not video_id or not question:
-        return JSONResponse(status_code=400, content={"error": "invalid_input", "message": "video_id and user_question are required"})
-    if payload.verdict.strip().lower() == "skip":
-        return SmartWatchDeepResult(
-            relevant_moments=[],
-            total_relevant_moments=0,
-            analysis_complete=False,
-            stage2_ms=0,
-            skipped=True,
-            reason="Deep analysis skipped — video verdict was skip",
-            prompt_version=PROMPT_VERSION,
-        )
+async def _iter_chunk_moments(
+    question: str,
+    formatted_chunks: List[str],
+    hashes: List[str],
+    chunk_results: Dict[str, List[Dict[str, Any]]],
+    stats: Dict[str, Any],
+    stop_after: Optional[int] = None,
+    index: Optional[PassageIndex] = None,
+) -> AsyncIterator[Tuple[int, List[Dict[str, Any]]]]:
+    """
+    Run the ranked, widening chunk passes and yield (chunk_index, moments)
+    in transcript order within each pass: a chunk is yielded once every
+    earlier chunk of its pass has finished. When stop_after distinct moments
+    (as _dedupe_and_rank would keep them) have been found, outstanding chunk
+    calls are cancelled, the finished chunks are flushed and
+    stats["stopped_early"] is set. New results are written into chunk_results.
+    """
+    ranked = _rank_chunks(question, formatted_chunks, index)
+    selected: List[int] = []
+    found: List[Dict[str, Any]] = []
+    while len(selected) < min(len(ranked), DEEP_MAX_CHUNKS):
+        step = DEEP_CANDIDATE_CHUNKS if not selected else DEEP_WIDEN_CHUNKS
+        order = sorted(ranked[len(selected):min(len(selected) + step, DEEP_MAX_CHUNKS)])
+        selected.extend(order)
+        finished: Dict[int, Optional[List[Dict[str, Any]]]] = {
+            i: chunk_results[hashes[i]] for i in order if hashes[i] in chunk_results
+        }
+        for moments in finished.values():
+            found.extend(moments or [])
+        tasks = {
+            asyncio.create_task(_analyze_chunk(question, formatted_chunks[i])): i
+            for i in order if i not in finished
+        }
+        stats["chunks_analyzed"] += len(tasks)
+        frontier = 0
+        try:
+            while True:
+                while frontier < len(order) and order[frontier] in finished:
+                    moments = finished[order[frontier]]
+                    if moments:
+                        yield order[frontier], moments
+                    frontier += 1
+                if frontier == len(order):
+                    break
+                if stop_after is not None and len(_dedupe_and_rank(found)) >= stop_after:
+                    stats["stopped_early"] = True
+                    for i in order[frontier:]:
+                        if finished.get(i):
+                            yield i, finished[i]
+                    return
+                done, _ = await asyncio.wait(
+                    [task for task in tasks if not task.done()],
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                for task in done:
+                    i = tasks[task]
+                    result = None if task.cancelled() or task.exception() else task.result()
+                    finished[i] = result
+                    if result is None:
+                        stats["failed"] += 1
+                        continue
+                    chunk_results[hashes[i]] = result
+                    found.extend(result)
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+        if len(found) >= DEEP_MIN_MOMENTS:
+            return
+
+
+def _deep_chunks(transcript: TranscriptLike) -> List[str]:
+    def build(source: Transcript) -> List[str]:
+        items = _extract_timestamped_sentences(source)
+        return [_format_chunk_with_timestamps(chunk) for chunk in _chunk_by_sentences(items, 30) if chunk]
+
+    return Transcript.of(transcript).cached("smart_watch.deep_chunks", build)
+
+
+def _deep_chunk_hashes(transcript: TranscriptLike) -> List[str]:
+    return Transcript.of(transcript).cached(
+        "smart_watch.deep_chunk_hashes", lambda source: [chunk_hash(ctext) for ctext in _deep_chunks(source)]
+    )
 
-    try:
-        cached = get_cached_transcript(video_id)
-    except Exception as exc:
-        logger.warning("Smart Watch cache read failed for deep analysis: %s", exc)
-        cached = None
 
-    transcript = str((cached or {}).get("transcript") or "").strip()
-    if not transcript:
-        return JSONResponse(
-            status_code=422,
-            content={"error": "transcript_unavailable", "message": "Could not fetch transcript for this video"},
-        )
+def _deep_index(transcript: TranscriptLike) -> PassageIndex:
+    """BM25 index over the deep chunks, built once per transcript rather than per question."""
+    return Transcript.of(transcript).cached(
+        "smart_watch.deep_index", lambda source: PassageIndex([{"text": ctext} for ctext in _deep_chunks(source)])
+    )
 
-    items = _extract_timestamped_sentences(transcript)
-    chunks = _chunk_by_sentences(items, 30)
-    formatted_chunks = [_format_chunk_with_timestamps(chunk) for chunk in chunks if chunk]
+
+_speculative_deep: Dict[str, asyncio.Task] = {}
+# deep cache key -> session_ids that asked for the speculative run
+_speculative_owners: Dict[str, Set[str]] = {}
+
+
+async def _speculative_deep_analysis(video_id: str, question: str) -> None:
+    """Run stage 2 ahead of the user's request and leave the result in the deep cache."""
+    speculative_context.set(True)
+    cached_result = lookup_deep_result(video_id, question, PROMPT_VERSION)
+    if cached_result and cached_result.get("complete"):
+        return
+    transcript, _, _ = await _load_transcript(video_id, fetch_missing=False)
+    formatted_chunks = _deep_chunks(transcript)
     if not formatted_chunks:
-        return SmartWatchDeepResult(
-            relevant_moments=[],
-            total_relevant_moments=0,
-            analysis_complete=True,
-            stage2_ms=int((time.perf_counter() - stage2_start) * 1000),
-            prompt_version=PROMPT_VERSION,
-        )
+        return
+    chunk_results: Dict[str, List[Dict[str, Any]]] = dict((cached_result or {}).get("chunks") or {})
+    hashes = _deep_chunk_hashes(transcript)
+    index = _deep_index(transcript)
+    stats: Dict[str, Any] = {"chunks_analyzed": 0, "failed": 0, "stopped_early": False}
+    found: List[Dict[str, Any]] = []
+    complete = False
+    try:
+        async for _, moments in _iter_chunk_moments(question, formatted_chunks, hashes, chunk_results, stats, index=index):
+            found.extend(moments)
+        complete = stats["failed"] == 0
+    finally:
+        # Keep finished chunks even when cancelled so the real request can reuse them.
+        # The Supabase write runs in a thread, off the event loop. The shield keeps a
+        # second cancel (shutdown) from abandoning it; the thread finishes either way.
+        if chunk_results and stats["chunks_analyzed"]:
+            await asyncio.shield(asyncio.to_thread(
+                store_deep_result, video_id, question, PROMPT_VERSION, _dedupe_and_rank(found), chunk_results, complete,
+            ))
+
+
+def start_speculative_deep(video_id: str, question: str, session_id: str) -> bool:
+    """
+    Start speculative stage 2 for (video, question) unless already running or
+    cached. Every session that asks is recorded as an owner of the run.
+    """
+    key = deep_cache_key(video_id, normalize_question(question), PROMPT_VERSION)
+    task = _speculative_deep.get(key)
+    if task is not None and not task.done():
+        _speculative_owners.setdefault(key, set()).add(session_id)
+        return True
+    cached_result = lookup_deep_result(video_id, question, PROMPT_VERSION)
+    if cached_result and cached_result.get("complete"):
+        return False
+    task = asyncio.create_task(_speculative_deep_analysis(video_id, question))
+    _speculative_deep[key] = task
+    _speculative_owners[key] = {session_id}
+
+    def _done(done: asyncio.Task) -> None:
+        if _speculative_deep.get(key) is done:
+            del _speculative_deep[key]
+            _speculative_owners.pop(key, None)
+        if not done.cancelled() and done.exception() is not None:
+            logger.warning("Speculative deep analysis failed video_id=%s: %s", video_id, done.exception())
+
+    task.add_done_callback(_done)
+    return True
+
+
+async def _join_speculative_deep(video_id: str, question: str) -> None:
+    task = _speculative_deep.get(deep_cache_key(video_id, normalize_question(question), PROMPT_VERSION))
+    if task is None or task.done():
+        return
+    # On failure or cancellation of the speculative run, fall through to a
+    # normal run that reuses whatever chunks it cached.
+    try:
+        await asyncio.shield(task)
+    except asyncio.CancelledError:
+        if not task.cancelled():
+            raise
+    except Exception:
+        return
 
-    tasks = [_analyze_chunk(question, ctext) for ctext in formatted_chunks]
-    results = await asyncio.gather(*tasks, return_exceptions=True)
-    all_moments: List[Dict[str, Any]] = []
-    for result in results:
-        if isinstance(result, Exception):
-            continue
-        all_moments.extend(result)
 
-    deduped = _dedupe_and_rank(all_moments)
-    with_urls = []
-    for m in deduped:
-        sec = int(m.get("timestamp_seconds", 0))
-        with_urls.append(
-            {
-                "timestamp_seconds": sec,
-                "timestamp_display": str(m.get("timestamp_display", _format_mmss(sec))),
-                "quote": str(m.get("quote", "")),
-                "relevance": str(m.get("relevance", "")),
-                "youtube_url": f"https://youtube.com/watch?v={video_id}&t={sec}",
-            }
-        )
+def cancel_speculative_deep(video_id: str, question: str, session_id: str) -> bool:
+    """
+    Withdraw session_id's interest in a speculative run; the run is cancelled
+    once no session that started or joined it still wants it.
+    """
+    key = deep_cache_key(video_id, normalize_question(question), PROMPT_VERSION)
+    task = _speculative_deep.get(key)
+    owners = _speculative_owners.get(key)
+    if task is None or task.done() or not owners or session_id not in owners:
+        return False
+    owners.discard(session_id)
+    if owners:
+        return False
+    task.cancel()
+    return True
+
+
+async def cancel_speculative_tasks() -> None:
+    """Cancel all speculative stage-2 work (app shutdown)."""
+    tasks = [task for task in _speculative_deep.values() if not task.done()]
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def _moment_with_url(video_id: str, moment: Dict[str, Any]) -> Dict[str, Any]:
+    sec = int(moment.get("timestamp_seconds", 0))
+    return {
+        "timestamp_seconds": sec,
+        "timestamp_display": str(moment.get("timestamp_display", _format_mmss(sec))),
+        "quote": str(moment.get("quote", "")),
+        "relevance": str(moment.get("relevance", "")),
+        "youtube_url": f"https://youtube.com/watch?v={video_id}&t={sec}",
+    }
+
 
+def _ndjson_line(event: Dict[str, Any]) -> bytes:
+    return (json.dumps(event) + "\n").encode("utf-8")
+
+
+def _finish_deep_analysis(
+    payload: SmartWatchDeepRequest,
+    video_id: str,
+    question: str,
+    moments: List[Dict[str, Any]],
+    analysis_complete: bool,
+    cache_hit: bool,
+    chunks_analyzed: int,
+    stage2_start: float,
+) -> SmartWatchDeepResult:
+    with_urls = [_moment_with_url(video_id, m) for m in moments]
     stage2_ms = int((time.perf_counter() - stage2_start) * 1000)
     user_id = None
     try:
@@ -871,7 +1250,7 @@ async def smart_watch_deep_analysis(payload: SmartWatchDeepRequest):
     except Exception:
         user_id = None
     try:
-        save_smart_watch_analysis(
+        enqueue_smart_watch_analysis(
             session_id=payload.session_id,
             video_id=video_id,
             video_url=f"https://youtube.com/watch?v={video_id}",
@@ -882,10 +1261,7 @@ async def smart_watch_deep_analysis(payload: SmartWatchDeepRequest):
             relevant_moments=with_urls,
             stage2_ms=stage2_ms,
         )
-    except Exception as exc:
-        logger.warning("Failed saving Smart Watch deep analysis: %s", exc)
-    try:
-        track_analytics_event(
+        enqueue_analytics_event(
             session_id=payload.session_id,
             user_id=user_id,
             event_name="smart_watch_deep_analysis",
@@ -893,21 +1269,139 @@ async def smart_watch_deep_analysis(payload: SmartWatchDeepRequest):
                 "video_id": video_id,
                 "moments_found": len(with_urls),
                 "stage2_ms": stage2_ms,
+                "cache_hit": cache_hit,
+                "chunks_analyzed": chunks_analyzed,
+                "streamed": payload.stream,
                 "prompt_version": PROMPT_VERSION,
             },
         )
     except Exception as exc:
-        logger.warning("Failed tracking deep-analysis analytics: %s", exc)
+        logger.warning("Failed queueing Smart Watch deep analysis writes: %s", exc)
 
     return SmartWatchDeepResult(
         relevant_moments=[SmartWatchMoment(**m) for m in with_urls],
         total_relevant_moments=len(with_urls),
-        analysis_complete=True,
+        analysis_complete=analysis_complete,
         stage2_ms=stage2_ms,
+        cache_hit=cache_hit,
         prompt_version=PROMPT_VERSION,
     )
 
 
+def _deep_result_response(payload: SmartWatchDeepRequest, result: SmartWatchDeepResult):
+    if not payload.stream:
+        return result
+    lines = [_ndjson_line({"type": "moment", "moment": m.dict()}) for m in result.relevant_moments]
+    lines.append(_ndjson_line({"type": "done", **result.dict()}))
+    return StreamingResponse(iter(lines), media_type="application/x-ndjson")
+
+
+@router.post("/deep-analysis", response_model=SmartWatchDeepResult)
+async def smart_watch_deep_analysis(payload: SmartWatchDeepRequest):
+    """
+    Find the moments that answer the question. With stream=true the response
+    is NDJSON: {"type": "moment", "moment": {...}} lines as chunks finish
+    (timestamp order within each pass, stopping early after
+    DEEP_STREAM_STOP_AFTER moments), then one {"type": "done", ...} line
+    carrying the full SmartWatchDeepResult.
+    """
+    stage2_start = time.perf_counter()
+    video_id = payload.video_id.strip()
+    question = payload.user_question.strip()
+    if not video_id or not question:
+        return JSONResponse(status_code=400, content={"error": "invalid_input", "message": "video_id and user_question are required"})
+    if payload.verdict.strip().lower() == "skip":
+        return _deep_result_response(payload, SmartWatchDeepResult(
+            relevant_moments=[],
+            total_relevant_moments=0,
+            analysis_complete=False,
+            stage2_ms=0,
+            skipped=True,
+            reason="Deep analysis skipped — video verdict was skip",
+            prompt_version=PROMPT_VERSION,
+        ))
+
+    await _join_speculative_deep(video_id, question)
+    cached_result = lookup_deep_result(video_id, question, PROMPT_VERSION)
+    if cached_result and cached_result.get("complete"):
+        moments = list(cached_result.get("moments") or [])
+        return _deep_result_response(
+            payload,
+            _finish_deep_analysis(payload, video_id, question, moments, True, True, 0, stage2_start),
+        )
+
+    transcript, _, _ = await _load_transcript(video_id, fetch_missing=False)
+    if not transcript:
+        return JSONResponse(
+            status_code=422,
+            content={"error": "transcript_unavailable", "message": "Could not fetch transcript for this video"},
+        )
+
+    formatted_chunks = _deep_chunks(transcript)
+    if not formatted_chunks:
+        return _deep_result_response(payload, SmartWatchDeepResult(
+            relevant_moments=[],
+            total_relevant_moments=0,
+            analysis_complete=True,
+            stage2_ms=int((time.perf_counter() - stage2_start) * 1000),
+            prompt_version=PROMPT_VERSION,
+        ))
+
+    # Reuse per-chunk results from an earlier (possibly partial) run.
+    chunk_results: Dict[str, List[Dict[str, Any]]] = dict((cached_result or {}).get("chunks") or {})
+    hashes = _deep_chunk_hashes(transcript)
+    index = _deep_index(transcript)
+    stats: Dict[str, Any] = {"chunks_analyzed": 0, "failed": 0, "stopped_early": False}
+
+    def finish(found: List[Dict[str, Any]]) -> SmartWatchDeepResult:
+        deduped = _dedupe_and_rank(found)
+        # A stream that stopped early skipped chunks; don't let it be served as the full result.
+        analysis_complete = stats["failed"] == 0 and not stats["stopped_early"]
+        if chunk_results and stats["chunks_analyzed"]:
+            store_deep_result(video_id, question, PROMPT_VERSION, deduped, chunk_results, analysis_complete)
+        return _finish_deep_analysis(
+            payload, video_id, question, deduped, analysis_complete,
+            bool(cached_result) and not stats["chunks_analyzed"], stats["chunks_analyzed"], stage2_start,
+        )
+
+    if not payload.stream:
+        found: List[Dict[str, Any]] = []
+        async for _, moments in _iter_chunk_moments(question, formatted_chunks, hashes, chunk_results, stats, index=index):
+            found.extend(moments)
+        return await asyncio.to_thread(finish, found)
+
+    async def stream_events() -> AsyncIterator[bytes]:
+        found: List[Dict[str, Any]] = []
+        emitted: List[int] = []
+        async for _, moments in _iter_chunk_moments(
+            question, formatted_chunks, hashes, chunk_results, stats, stop_after=DEEP_STREAM_STOP_AFTER, index=index,
+        ):
+            found.extend(moments)
+            for moment in moments:
+                sec = int(moment.get("timestamp_seconds", 0))
+                if len(emitted) >= DEEP_STREAM_STOP_AFTER or any(abs(sec - ts) <= 30 for ts in emitted):
+                    continue
+                emitted.append(sec)
+                yield _ndjson_line({"type": "moment", "moment": _moment_with_url(video_id, moment)})
+        result = await asyncio.to_thread(finish, found)
+        yield _ndjson_line({"type": "done", "stopped_early": stats["stopped_early"], **result.dict()})
+
+    return StreamingResponse(stream_events(), media_type="application/x-ndjson")
+
+
+@router.post("/deep-analysis/cancel", response_model=SmartWatchDeepCancelResponse)
+async def smart_watch_deep_analysis_cancel(payload: SmartWatchDeepCancelRequest):
+    """
+    Cancel speculative deep analysis the user no longer needs (e.g. navigated
+    away). Only a session that started or joined the run can withdraw it.
+    """
+    session_id = payload.session_id.strip()
+    if not session_id:
+        return JSONResponse(status_code=400, content={"error": "invalid_input", "message": "session_id is required"})
+    cancelled = cancel_speculative_deep(payload.video_id.strip(), payload.user_question.strip(), session_id)
+    return SmartWatchDeepCancelResponse(cancelled=cancelled)
+
+
 @router.post("/history", response_model=SmartWatchHistoryResponse)
 async def smart_watch_history(payload: SmartWatchHistoryRequest):
     session_id = payload.session_id.strip()
@@ -956,14 +1450,14 @@ async def smart_watch_analytics(payload: SmartWatchAnalyticsRequest):
     if not session_id or not event_name:
         return JSONResponse(status_code=400, content={"error": "invalid_input", "message": "session_id and event_name are required"})
     try:
-        track_analytics_event(
+        enqueue_analytics_event(
             session_id=session_id,
             user_id=(payload.user_id or None),
             event_name=event_name,
             payload=payload.payload or {},
         )
     except Exception as exc:
-        logger.warning("Failed tracking analytics event: %s", exc)
+        logger.warning("Failed queueing analytics event: %s", exc)
     return {"status": "ok"}
 
 
@@ -980,6 +1474,16 @@ async def smart_watch_dashboard(payload: SmartWatchDashboardRequest):
         return JSONResponse(status_code=403, content={"error": "forbidden", "message": "Cannot access another user's dashboard"})
     effective_user_id = requested_user_id or session_user_id or None
 
+    scope = dashboard_scope(session_id, effective_user_id)
+    try:
+        rollup = get_smart_watch_rollup(scope)
+    except Exception as exc:
+        logger.warning("Smart Watch rollup read failed scope=%s: %s", scope, exc)
+        rollup = None
+    if rollup:
+        return SmartWatchDashboardResponse(**rollup_to_dashboard(rollup))
+
+    # No rollup row yet (rebuild_smart_watch_rollups() not run for this scope): fold recent rows.
     try:
         analyses = list_smart_watch_analyses(session_id=session_id, user_id=effective_user_id, limit=100)
     except Exception:
@@ -989,50 +1493,6 @@ async def smart_watch_dashboard(payload: SmartWatchDashboardRequest):
     except Exception:
         events = []
 
-    verdicts = [str(a.get("verdict") or "").lower() for a in analyses]
-    confidences = [float(a["confidence"]) for a in analyses if a.get("confidence") is not None]
-    stage1 = [int(a["stage1_ms"]) for a in analyses if a.get("stage1_ms") is not None]
-    stage2 = [int(a["stage2_ms"]) for a in analyses if a.get("stage2_ms") is not None]
-    timestamps_generated = sum(len(a.get("relevant_moments") or []) for a in analyses)
-    estimated_time_saved_minutes = 0.0
-
-    duration_cache: Dict[str, float] = {}
-    for analysis in analyses:
-        video_id = str(analysis.get("video_id") or "").strip()
-        if not video_id:
-            continue
-        if video_id not in duration_cache:
-            try:
-                cached_t = get_cached_transcript(video_id) or {}
-                duration_cache[video_id] = float(cached_t.get("duration_minutes") or 0.0)
-            except Exception:
-                duration_cache[video_id] = 0.0
-
-        duration_minutes = duration_cache.get(video_id, 0.0)
-        if duration_minutes <= 0:
-            continue
-        verdict = str(analysis.get("verdict") or "").lower()
-        if verdict == "skip":
-            estimated_time_saved_minutes += duration_minutes
-        elif verdict == "skim":
-            estimated_time_saved_minutes += duration_minutes * 0.65
-
-    timestamp_clicks = 0
-    for ev in events:
-        insights = ev.get("insights") or {}
-        if insights.get("event_name") == "smart_watch_timestamp_clicked":
-            timestamp_clicks += 1
-
-    return SmartWatchDashboardResponse(
-        total_analyses=len(analyses),
-        watch_count=sum(1 for v in verdicts if v == "watch"),
-        skim_count=sum(1 for v in verdicts if v == "skim"),
-        skip_count=sum(1 for v in verdicts if v == "skip"),
-        avg_confidence=round(sum(confidences) / len(confidences), 3) if confidences else 0.0,
-        timestamp_clicks=timestamp_clicks,
-        timestamps_generated=timestamps_generated,
-        avg_stage1_ms=int(sum(stage1) / len(stage1)) if stage1 else 0,
-        avg_stage2_ms=int(sum(stage2) / len(stage2)) if stage2 else 0,
-        estimated_time_saved_minutes=round(estimated_time_saved_minutes, 1),
-    )
-
+    rows = [(SMART_WATCH_TABLE, a) for a in analyses] + [(INSIGHTS_TABLE, e) for e in events]
+    deltas = compute_rollup_deltas(rows)
+    return SmartWatchDashboardResponse(**rollup_to_dashboard(deltas.get(scope)))
@@ -0,0 +1,240 @@
+"""
+Result caches for Smart Watch stages.
+
+Deep-analysis results are cached per (video_id, normalized question,
+PROMPT_VERSION) in process memory and in the shared insight cache table
+(mode="smart_watch_deep"). Questions are normalized to a sorted set of
+stemmed content tokens, so rephrasings like "What is backprop?" and
+"what's backprop" share an entry; negations are kept as a "not" token, so
+"does it explain X" and "doesn't it explain X" never do. Near-duplicates
+that differ by a token (but agree on negation) are matched by Jaccard
+similarity over the entries stored for the video.
+Per-chunk moments are kept alongside the final result so a partially
+failed run only re-analyses the chunks that failed.
+
+Stage-1 quick-check verdicts are cached the same way (mode
+"smart_watch_quick"), keyed additionally by which transcript excerpt the
+verdict was computed from. Recently used transcripts are held in a small
+in-process LRU so quick-check and deep analysis skip the Supabase read.
+
+Search-result verdicts are cached per (normalized query, video_id,
+PROMPT_VERSION) in process memory only; they are cheap to recompute and
+the same queries recur within hours, not days.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import re
+from typing import Any, Dict, FrozenSet, List, Optional
+
+from backend.memory_cache import TTLCache
+from backend.retrieval import stem, tokenize
+from backend.supabase_client import (
+    get_cached_insights,
+    list_cached_insight_keys,
+    save_cached_insights,
+)
+
+logger = logging.getLogger("notionclips.smart_watch_cache")
+
+DEEP_CACHE_MODE = "smart_watch_deep"
+QUICK_CACHE_MODE = "smart_watch_quick"
+NEAR_DUPLICATE_JACCARD = 0.8
+NEGATION_TOKEN = "not"
+_CONTRACTION_RE = re.compile(r"n['\u2019]t\b")
+_NEGATION_RE = re.compile(r"\b(?:not|no|never|nor|without|cannot)\b")
+SEARCH_VERDICT_TTL_SECONDS = int(os.getenv("SEARCH_VERDICT_TTL_SECONDS", str(6 * 3600)))
+TRANSCRIPT_LRU_SIZE = int(os.getenv("SMART_WATCH_TRANSCRIPT_LRU_SIZE", "64"))
+
+# cache_key -> {"question_key", "moments", "chunks", "complete"}
+DEEP_RESULTS: TTLCache[Dict[str, Any]] = TTLCache(max_entries=1000, ttl_seconds=24 * 3600)
+# "video_id|prompt_version" -> {question_key: cache_key} for near-duplicate matching.
+DEEP_QUESTION_KEYS: TTLCache[Dict[str, str]] = TTLCache(max_entries=2000, ttl_seconds=24 * 3600)
+# cache_key -> stage-1 fields (verdict, confidence, reason, estimated_timestamp_range)
+QUICK_RESULTS: TTLCache[Dict[str, Any]] = TTLCache(max_entries=5000, ttl_seconds=24 * 3600)
+# video_id -> {"transcript", "duration_minutes"}
+TRANSCRIPTS: TTLCache[Dict[str, Any]] = TTLCache(max_entries=TRANSCRIPT_LRU_SIZE, ttl_seconds=3600)
+# "query_key|video_id|prompt_version" -> {"verdict", "confidence", "reason"}
+SEARCH_VERDICTS: TTLCache[Dict[str, Any]] = TTLCache(max_entries=20000, ttl_seconds=SEARCH_VERDICT_TTL_SECONDS)
+
+
+def question_tokens(question: str) -> FrozenSet[str]:
+    text = _CONTRACTION_RE.sub(" not", (question or "").lower())
+    tokens = {stem(tok) for tok in tokenize(text)}
+    # tokenize() drops "not"/"no" as stopwords; the key must still tell them apart.
+    if _NEGATION_RE.search(text):
+        tokens.add(NEGATION_TOKEN)
+    return frozenset(tokens)
+
+
+def normalize_question(question: str) -> str:
+    """Order- and inflection-insensitive key for a user question."""
+    tokens = question_tokens(question)
+    if not tokens:
+        return " ".join((question or "").lower().split())
+    return " ".join(sorted(tokens))
+
+
+def chunk_hash(chunk_text: str) -> str:
+    return hashlib.sha1(chunk_text.encode("utf-8")).hexdigest()[:16]
+
+
+def deep_cache_key(video_id: str, question_key: str, prompt_version: str) -> str:
+    return hashlib.sha256(f"deep|{video_id}|{question_key}|{prompt_version}".encode("utf-8")).hexdigest()
+
+
+def _jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def _known_question_keys(video_id: str, prompt_version: str) -> Dict[str, str]:
+    known = DEEP_QUESTION_KEYS.get(f"{video_id}|{prompt_version}")
+    if known is not None:
+        return known
+    known = {}
+    try:
+        for row in list_cached_insight_keys(DEEP_CACHE_MODE, video_id):
+            question_key = str(row.get("sections_key") or "")
+            if question_key:
+                known[question_key] = deep_cache_key(video_id, question_key, prompt_version)
+    except Exception as exc:
+        logger.warning("Deep cache key listing failed video_id=%s: %s", video_id, exc)
+    DEEP_QUESTION_KEYS.set(f"{video_id}|{prompt_version}", known)
+    return known
+
+
+def _load_entry(cache_key: str, memory: TTLCache = DEEP_RESULTS) -> Optional[Dict[str, Any]]:
+    entry = memory.get(cache_key)
+    if entry is not None:
+        return entry
+    try:
+        row = get_cached_insights(cache_key)
+    except Exception as exc:
+        logger.warning("Insight cache read failed key=%s: %s", cache_key[:10], exc)
+        return None
+    if row and isinstance(row.get("insights"), dict):
+        entry = row["insights"]
+        memory.set(cache_key, entry)
+        return entry
+    return None
+
+
+def lookup_deep_result(video_id: str, question: str, prompt_version: str) -> Optional[Dict[str, Any]]:
+    """
+    Return the cached entry for this question (exact normalized match first,
+    then the closest near-duplicate above NEAR_DUPLICATE_JACCARD), or None.
+    Entries may be partial (complete=False) with reusable per-chunk results.
+    """
+    question_key = normalize_question(question)
+    entry = _load_entry(deep_cache_key(video_id, question_key, prompt_version))
+    if entry is not None:
+        return entry
+
+    wanted = question_tokens(question)
+    best_key, best_score = None, 0.0
+    for other_key, cache_key in _known_question_keys(video_id, prompt_version).items():
+        other = frozenset(other_key.split())
+        if (NEGATION_TOKEN in other) != (NEGATION_TOKEN in wanted):
+            continue
+        score = _jaccard(wanted, other)
+        if score > best_score:
+            best_key, best_score = cache_key, score
+    if best_key and best_score >= NEAR_DUPLICATE_JACCARD:
+        return _load_entry(best_key)
+    return None
+
+
+def store_deep_result(
+    video_id: str,
+    question: str,
+    prompt_version: str,
+    moments: List[Dict[str, Any]],
+    chunks: Dict[str, List[Dict[str, Any]]],
+    complete: bool,
+) -> None:
+    question_key = normalize_question(question)
+    cache_key = deep_cache_key(video_id, question_key, prompt_version)
+    entry = {
+        "question_key": question_key,
+        "moments": moments,
+        "chunks": chunks,
+        "complete": complete,
+    }
+    DEEP_RESULTS.set(cache_key, entry)
+    known = DEEP_QUESTION_KEYS.get(f"{video_id}|{prompt_version}")
+    if known is not None:
+        known[question_key] = cache_key
+    try:
+        save_cached_insights(
+            cache_key=cache_key,
+            mode=DEEP_CACHE_MODE,
+            transcript_hash=video_id,
+            sections_key=question_key,
+            insights=entry,
+            word_count=0,
+        )
+    except Exception as exc:
+        logger.warning("Deep cache write failed key=%s: %s", cache_key[:10], exc)
+
+
+def quick_cache_key(video_id: str, question_key: str, prompt_version: str, excerpt_mode: str) -> str:
+    return hashlib.sha256(
+        f"quick|{video_id}|{question_key}|{prompt_version}|{excerpt_mode}".encode("utf-8")
+    ).hexdigest()
+
+
+def lookup_quick_result(
+    video_id: str,
+    question: str,
+    prompt_version: str,
+    excerpt_mode: str,
+) -> Optional[Dict[str, Any]]:
+    cache_key = quick_cache_key(video_id, normalize_question(question), prompt_version, excerpt_mode)
+    return _load_entry(cache_key, QUICK_RESULTS)
+
+
+def store_quick_result(
+    video_id: str,
+    question: str,
+    prompt_version: str,
+    excerpt_mode: str,
+    result: Dict[str, Any],
+) -> None:
+    question_key = normalize_question(question)
+    cache_key = quick_cache_key(video_id, question_key, prompt_version, excerpt_mode)
+    QUICK_RESULTS.set(cache_key, result)
+    try:
+        save_cached_insights(
+            cache_key=cache_key,
+            mode=QUICK_CACHE_MODE,
+            transcript_hash=video_id,
+            sections_key=question_key,
+            insights=result,
+            word_count=0,
+        )
+    except Exception as exc:
+        logger.warning("Quick-check cache write failed key=%s: %s", cache_key[:10], exc)
+
+
+def _search_verdict_key(search_query: str, video_id: str, prompt_version: str) -> str:
+    return f"{normalize_question(search_query)}|{video_id}|{prompt_version}"
+
+
+def get_search_verdict(search_query: str, video_id: str, prompt_version: str) -> Optional[Dict[str, Any]]:
+    return SEARCH_VERDICTS.get(_search_verdict_key(search_query, video_id, prompt_version))
+
+
+def store_search_verdict(search_query: str, video_id: str, prompt_version: str, item: Dict[str, Any]) -> None:
+    SEARCH_VERDICTS.set(
+        _search_verdict_key(search_query, video_id, prompt_version),
+        {
+            "verdict": item.get("verdict"),
+            "confidence": item.get("confidence"),
+            "reason": item.get("reason"),
+        },
+    )
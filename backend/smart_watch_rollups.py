@@ -0,0 +1,303 @@
+"""
+Incrementally maintained Smart Watch dashboard counters.
+
+Every analysis/event row written through the analytics pipeline is folded
+into per-scope deltas ("session:<session_id>" and, when known,
+"user:<user_id>") that are added server-side in one RPC per scope, so the
+dashboard reads a single row instead of scanning history.
+
+SQL to run in Supabase SQL editor:
+
+CREATE TABLE smart_watch_rollups (
+  scope text PRIMARY KEY,
+  total_analyses integer DEFAULT 0,
+  watch_count integer DEFAULT 0,
+  skim_count integer DEFAULT 0,
+  skip_count integer DEFAULT 0,
+  confidence_sum double precision DEFAULT 0,
+  confidence_count integer DEFAULT 0,
+  stage1_ms_sum bigint DEFAULT 0,
+  stage1_count integer DEFAULT 0,
+  stage2_ms_sum bigint DEFAULT 0,
+  stage2_count integer DEFAULT 0,
+  timestamps_generated integer DEFAULT 0,
+  timestamp_clicks integer DEFAULT 0,
+  time_saved_minutes double precision DEFAULT 0,
+  updated_at timestamptz DEFAULT now()
+);
+
+CREATE TABLE video_durations (
+  video_id text PRIMARY KEY,
+  duration_minutes double precision NOT NULL DEFAULT 0,
+  updated_at timestamptz DEFAULT now()
+);
+
+CREATE OR REPLACE FUNCTION increment_smart_watch_rollup(p_scope text, p_delta jsonb)
+RETURNS void LANGUAGE sql AS $$
+  INSERT INTO smart_watch_rollups AS r (
+    scope, total_analyses, watch_count, skim_count, skip_count,
+    confidence_sum, confidence_count, stage1_ms_sum, stage1_count,
+    stage2_ms_sum, stage2_count, timestamps_generated, timestamp_clicks,
+    time_saved_minutes, updated_at
+  ) VALUES (
+    p_scope,
+    COALESCE((p_delta->>'total_analyses')::int, 0),
+    COALESCE((p_delta->>'watch_count')::int, 0),
+    COALESCE((p_delta->>'skim_count')::int, 0),
+    COALESCE((p_delta->>'skip_count')::int, 0),
+    COALESCE((p_delta->>'confidence_sum')::float8, 0),
+    COALESCE((p_delta->>'confidence_count')::int, 0),
+    COALESCE((p_delta->>'stage1_ms_sum')::bigint, 0),
+    COALESCE((p_delta->>'stage1_count')::int, 0),
+    COALESCE((p_delta->>'stage2_ms_sum')::bigint, 0),
+    COALESCE((p_delta->>'stage2_count')::int, 0),
+    COALESCE((p_delta->>'timestamps_generated')::int, 0),
+    COALESCE((p_delta->>'timestamp_clicks')::int, 0),
+    COALESCE((p_delta->>'time_saved_minutes')::float8, 0),
+    now()
+  )
+  ON CONFLICT (scope) DO UPDATE SET
+    total_analyses = r.total_analyses + EXCLUDED.total_analyses,
+    watch_count = r.watch_count + EXCLUDED.watch_count,
+    skim_count = r.skim_count + EXCLUDED.skim_count,
+    skip_count = r.skip_count + EXCLUDED.skip_count,
+    confidence_sum = r.confidence_sum + EXCLUDED.confidence_sum,
+    confidence_count = r.confidence_count + EXCLUDED.confidence_count,
+    stage1_ms_sum = r.stage1_ms_sum + EXCLUDED.stage1_ms_sum,
+    stage1_count = r.stage1_count + EXCLUDED.stage1_count,
+    stage2_ms_sum = r.stage2_ms_sum + EXCLUDED.stage2_ms_sum,
+    stage2_count = r.stage2_count + EXCLUDED.stage2_count,
+    timestamps_generated = r.timestamps_generated + EXCLUDED.timestamps_generated,
+    timestamp_clicks = r.timestamp_clicks + EXCLUDED.timestamp_clicks,
+    time_saved_minutes = r.time_saved_minutes + EXCLUDED.time_saved_minutes,
+    updated_at = now();
+$$;
+
+-- Rebuild every scope's counters from history. Run once after the tables above
+-- (after the video_durations backfill below), before the dashboard switches to
+-- rollups; otherwise a scope's first new event creates a row without its past
+-- analyses. Safe to re-run: counters are recomputed, not added to.
+CREATE OR REPLACE FUNCTION rebuild_smart_watch_rollups()
+RETURNS void LANGUAGE sql AS $$
+  INSERT INTO smart_watch_rollups AS r (
+    scope, total_analyses, watch_count, skim_count, skip_count,
+    confidence_sum, confidence_count, stage1_ms_sum, stage1_count,
+    stage2_ms_sum, stage2_count, timestamps_generated, time_saved_minutes, updated_at
+  )
+  SELECT
+    a.scope,
+    count(*),
+    count(*) FILTER (WHERE a.verdict = 'watch'),
+    count(*) FILTER (WHERE a.verdict = 'skim'),
+    count(*) FILTER (WHERE a.verdict = 'skip'),
+    COALESCE(sum(a.confidence), 0),
+    count(a.confidence),
+    COALESCE(sum(a.stage1_ms), 0),
+    count(a.stage1_ms),
+    COALESCE(sum(a.stage2_ms), 0),
+    count(a.stage2_ms),
+    COALESCE(sum(jsonb_array_length(COALESCE(a.relevant_moments, '[]'::jsonb))), 0),
+    COALESCE(sum(CASE a.verdict
+      WHEN 'skip' THEN d.duration_minutes
+      WHEN 'skim' THEN d.duration_minutes * 0.65
+    END), 0),
+    now()
+  FROM (
+    SELECT 'session:' || session_id AS scope, lower(verdict) AS verdict, video_id,
+           confidence, stage1_ms, stage2_ms, relevant_moments
+    FROM smart_watch_analyses WHERE session_id IS NOT NULL
+    UNION ALL
+    SELECT 'user:' || user_id, lower(verdict), video_id,
+           confidence, stage1_ms, stage2_ms, relevant_moments
+    FROM smart_watch_analyses WHERE user_id IS NOT NULL
+  ) a
+  LEFT JOIN video_durations d ON d.video_id = a.video_id AND d.duration_minutes > 0
+  GROUP BY a.scope
+  ON CONFLICT (scope) DO UPDATE SET
+    total_analyses = EXCLUDED.total_analyses,
+    watch_count = EXCLUDED.watch_count,
+    skim_count = EXCLUDED.skim_count,
+    skip_count = EXCLUDED.skip_count,
+    confidence_sum = EXCLUDED.confidence_sum,
+    confidence_count = EXCLUDED.confidence_count,
+    stage1_ms_sum = EXCLUDED.stage1_ms_sum,
+    stage1_count = EXCLUDED.stage1_count,
+    stage2_ms_sum = EXCLUDED.stage2_ms_sum,
+    stage2_count = EXCLUDED.stage2_count,
+    timestamps_generated = EXCLUDED.timestamps_generated,
+    time_saved_minutes = EXCLUDED.time_saved_minutes,
+    updated_at = now();
+
+  INSERT INTO smart_watch_rollups AS r (scope, timestamp_clicks, updated_at)
+  SELECT c.scope, count(*), now()
+  FROM (
+    SELECT 'session:' || (insights->>'session_id') AS scope
+    FROM insight_cache
+    WHERE mode = 'analytics' AND insights->>'event_name' = 'smart_watch_timestamp_clicked'
+      AND insights->>'session_id' IS NOT NULL
+    UNION ALL
+    SELECT 'user:' || (insights->>'user_id')
+    FROM insight_cache
+    WHERE mode = 'analytics' AND insights->>'event_name' = 'smart_watch_timestamp_clicked'
+      AND insights->>'user_id' IS NOT NULL
+  ) c
+  GROUP BY c.scope
+  ON CONFLICT (scope) DO UPDATE SET timestamp_clicks = EXCLUDED.timestamp_clicks, updated_at = now();
+$$;
+
+-- One-time backfill of video_durations from existing transcripts, then the rollups:
+INSERT INTO video_durations (video_id, duration_minutes)
+SELECT video_id, COALESCE(duration_minutes, 0) FROM transcript_cache
+ON CONFLICT (video_id) DO NOTHING;
+
+SELECT rebuild_smart_watch_rollups();
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from backend.memory_cache import TTLCache
+from backend.supabase_client import (
+    INSIGHTS_TABLE,
+    SMART_WATCH_TABLE,
+    get_video_durations,
+    increment_smart_watch_rollup,
+)
+
+logger = logging.getLogger("notionclips.smart_watch_rollups")
+
+TIMESTAMP_CLICK_EVENT = "smart_watch_timestamp_clicked"
+SKIM_TIME_SAVED_RATIO = 0.65
+
+COUNTER_FIELDS = (
+    "total_analyses", "watch_count", "skim_count", "skip_count",
+    "confidence_sum", "confidence_count", "stage1_ms_sum", "stage1_count",
+    "stage2_ms_sum", "stage2_count", "timestamps_generated", "timestamp_clicks",
+    "time_saved_minutes",
+)
+
+# video_id -> duration_minutes, so repeated videos skip the durations query.
+VIDEO_DURATIONS: TTLCache[float] = TTLCache(max_entries=5000, ttl_seconds=24 * 3600)
+
+
+def rollup_scopes(session_id: Optional[str], user_id: Optional[str]) -> List[str]:
+    scopes = []
+    if session_id:
+        scopes.append(f"session:{session_id}")
+    if user_id:
+        scopes.append(f"user:{user_id}")
+    return scopes
+
+
+def dashboard_scope(session_id: str, user_id: Optional[str]) -> str:
+    return f"user:{user_id}" if user_id else f"session:{session_id}"
+
+
+def remember_video_duration(video_id: str, duration_minutes: float) -> None:
+    if video_id and duration_minutes and duration_minutes > 0:
+        VIDEO_DURATIONS.set(video_id, float(duration_minutes))
+
+
+def resolve_video_durations(video_ids: Iterable[str]) -> Dict[str, float]:
+    """Durations from the in-process cache, with one batched query for misses."""
+    out: Dict[str, float] = {}
+    missing = []
+    for video_id in set(video_ids):
+        cached = VIDEO_DURATIONS.get(video_id)
+        if cached is None:
+            missing.append(video_id)
+        else:
+            out[video_id] = cached
+    if missing:
+        try:
+            fetched = get_video_durations(missing)
+        except Exception as exc:
+            logger.warning("Video duration lookup failed: %s", exc)
+            fetched = {}
+        for video_id, minutes in fetched.items():
+            remember_video_duration(video_id, minutes)
+            out[video_id] = minutes
+    return out
+
+
+def _analysis_delta(record: Dict[str, Any], duration_minutes: float) -> Dict[str, Any]:
+    delta: Dict[str, Any] = {"total_analyses": 1}
+    verdict = str(record.get("verdict") or "").lower()
+    if verdict in {"watch", "skim", "skip"}:
+        delta[f"{verdict}_count"] = 1
+    if record.get("confidence") is not None:
+        delta["confidence_sum"] = float(record["confidence"])
+        delta["confidence_count"] = 1
+    if record.get("stage1_ms") is not None:
+        delta["stage1_ms_sum"] = int(record["stage1_ms"])
+        delta["stage1_count"] = 1
+    if record.get("stage2_ms") is not None:
+        delta["stage2_ms_sum"] = int(record["stage2_ms"])
+        delta["stage2_count"] = 1
+    moments = record.get("relevant_moments") or []
+    if moments:
+        delta["timestamps_generated"] = len(moments)
+    if duration_minutes > 0:
+        if verdict == "skip":
+            delta["time_saved_minutes"] = duration_minutes
+        elif verdict == "skim":
+            delta["time_saved_minutes"] = duration_minutes * SKIM_TIME_SAVED_RATIO
+    return delta
+
+
+def _merge(into: Dict[str, Any], delta: Dict[str, Any]) -> None:
+    for key, value in delta.items():
+        into[key] = into.get(key, 0) + value
+
+
+def compute_rollup_deltas(rows: List[Tuple[str, Dict[str, Any]]]) -> Dict[str, Dict[str, Any]]:
+    """Fold written (table, row) pairs into per-scope counter deltas."""
+    analyses = [row for table, row in rows if table == SMART_WATCH_TABLE]
+    durations = resolve_video_durations(
+        str(r.get("video_id") or "") for r in analyses
+        if str(r.get("verdict") or "").lower() in {"skip", "skim"}
+    )
+
+    deltas: Dict[str, Dict[str, Any]] = {}
+    for record in analyses:
+        delta = _analysis_delta(record, durations.get(str(record.get("video_id") or ""), 0.0))
+        for scope in rollup_scopes(record.get("session_id"), record.get("user_id")):
+            _merge(deltas.setdefault(scope, {}), delta)
+
+    for table, row in rows:
+        if table != INSIGHTS_TABLE or row.get("mode") != "analytics":
+            continue
+        insights = row.get("insights") or {}
+        if insights.get("event_name") != TIMESTAMP_CLICK_EVENT:
+            continue
+        for scope in rollup_scopes(insights.get("session_id"), insights.get("user_id")):
+            _merge(deltas.setdefault(scope, {}), {"timestamp_clicks": 1})
+    return deltas
+
+
+def apply_rollups(rows: List[Tuple[str, Dict[str, Any]]]) -> None:
+    """Flush hook for the analytics pipeline: one increment RPC per touched scope."""
+    for scope, delta in compute_rollup_deltas(rows).items():
+        try:
+            increment_smart_watch_rollup(scope, delta)
+        except Exception as exc:
+            logger.warning("Rollup increment failed scope=%s: %s", scope, exc)
+
+
+def rollup_to_dashboard(row: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Convert a rollup row (or None) into SmartWatchDashboardResponse fields."""
+    r = {field: (row or {}).get(field) or 0 for field in COUNTER_FIELDS}
+    return {
+        "total_analyses": int(r["total_analyses"]),
+        "watch_count": int(r["watch_count"]),
+        "skim_count": int(r["skim_count"]),
+        "skip_count": int(r["skip_count"]),
+        "avg_confidence": round(r["confidence_sum"] / r["confidence_count"], 3) if r["confidence_count"] else 0.0,
+        "timestamp_clicks": int(r["timestamp_clicks"]),
+        "timestamps_generated": int(r["timestamps_generated"]),
+        "avg_stage1_ms": int(r["stage1_ms_sum"] / r["stage1_count"]) if r["stage1_count"] else 0,
+        "avg_stage2_ms": int(r["stage2_ms_sum"] / r["stage2_count"]) if r["stage2_count"] else 0,
+        "estimated_time_saved_minutes": round(float(r["time_saved_minutes"]), 1),
+    }
@@ -0,0 +1,122 @@
+"""
+Compressed encoding for large cache payloads (transcripts, insight JSON).
+
+Blobs are base64 text so they travel through PostgREST like any other
+column: one format byte followed by the compressed payload. Format 1 is
+zlib (always available); format 2 is zstd, used when the optional
+``zstandard`` package is installed. Decoding streams the payload through
+an incremental decompressor and UTF-8 decoder in fixed-size slices, so a
+large transcript is never held as both compressed and decompressed bytes.
+
+Off by default, because the blob columns are selected and written only when
+a codec is set: run the SQL below first, then set SUPABASE_CACHE_CODEC=zlib.
+Use zstd only once every backend worker has ``zstandard`` installed (it is
+not in requirements.txt); a worker without it cannot read zstd blobs.
+
+SQL to run in Supabase SQL editor:
+
+ALTER TABLE transcript_cache ADD COLUMN IF NOT EXISTS transcript_blob text;
+ALTER TABLE insight_cache ADD COLUMN IF NOT EXISTS insights_blob text;
+"""
+
+from __future__ import annotations
+
+import base64
+import codecs
+import json
+import os
+import zlib
+from typing import Any, Iterator, Optional
+
+try:
+    import zstandard  # type: ignore
+except ImportError:  # optional dependency
+    zstandard = None
+
+FORMAT_ZLIB = 1
+FORMAT_ZSTD = 2
+
+# "none" (default: raw columns only, blob columns never selected), "zlib" or "zstd".
+CACHE_CODEC = os.getenv("SUPABASE_CACHE_CODEC", "none").strip().lower()
+# Payloads smaller than this are stored raw; compression would not pay for the base64 overhead.
+MIN_COMPRESS_BYTES = int(os.getenv("SUPABASE_CACHE_MIN_COMPRESS_BYTES", "2048"))
+
+_B64_SLICE = 64 * 1024  # multiple of 4, so each slice decodes independently
+_ZLIB_LEVEL = 6
+_ZSTD_LEVEL = 6
+
+
+def is_enabled() -> bool:
+    return CACHE_CODEC in {"zstd", "zlib"}
+
+
+def _format() -> int:
+    return FORMAT_ZSTD if CACHE_CODEC == "zstd" and zstandard is not None else FORMAT_ZLIB
+
+
+def encode_bytes(raw: bytes) -> str:
+    fmt = _format()
+    if fmt == FORMAT_ZSTD:
+        payload = zstandard.ZstdCompressor(level=_ZSTD_LEVEL).compress(raw)
+    else:
+        payload = zlib.compress(raw, _ZLIB_LEVEL)
+    return base64.b64encode(bytes([fmt]) + payload).decode("ascii")
+
+
+def encode_text(text: str) -> Optional[str]:
+    """Compressed blob for text, or None when it is too small to be worth it (or disabled)."""
+    raw = (text or "").encode("utf-8")
+    if not is_enabled() or len(raw) < MIN_COMPRESS_BYTES:
+        return None
+    return encode_bytes(raw)
+
+
+def encode_json(value: Any) -> Optional[str]:
+    return encode_text(json.dumps(value, ensure_ascii=False, separators=(",", ":")))
+
+
+def _compressed_slices(blob: str) -> Iterator[bytes]:
+    for start in range(0, len(blob), _B64_SLICE):
+        yield base64.b64decode(blob[start:start + _B64_SLICE])
+
+
+def iter_decoded_text(blob: str) -> Iterator[str]:
+    """Yield the decoded text of a blob piece by piece."""
+    slices = _compressed_slices(blob)
+    first = next(slices, b"")
+    if not first:
+        return
+    fmt, first = first[0], first[1:]
+    if fmt == FORMAT_ZLIB:
+        decompressor = zlib.decompressobj()
+        feed, flush = decompressor.decompress, decompressor.flush
+    elif fmt == FORMAT_ZSTD:
+        if zstandard is None:
+            raise RuntimeError("zstd-compressed cache blob but the zstandard package is not installed")
+        decompressor = zstandard.ZstdDecompressor().decompressobj()
+        feed, flush = decompressor.decompress, decompressor.flush
+    else:
+        raise ValueError(f"Unknown cache blob format byte: {fmt}")
+
+    utf8 = codecs.getincrementaldecoder("utf-8")()
+    for piece in _chain(first, slices):
+        text = utf8.decode(feed(piece))
+        if text:
+            yield text
+    tail = utf8.decode(flush(), final=True)
+    if tail:
+        yield tail
+
+
+def _chain(first: bytes, rest: Iterator[bytes]) -> Iterator[bytes]:
+    if first:
+        yield first
+    yield from rest
+
+
+def decode_text(blob: str) -> str:
+    return "".join(iter_decoded_text(blob))
+
+
+def decode_json(blob: str) -> Any:
+    return json.loads(decode_text(blob))
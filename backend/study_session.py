@@ -26,6 +26,40 @@ USING (auth.uid() = user_id);
 
 CREATE INDEX ON study_sessions(user_id, created_at DESC);
 
+-- Atomic, constant-payload writes used by /answer (see supabase_client).
+CREATE OR REPLACE FUNCTION append_study_qa_history(p_study_session_id uuid, p_entry jsonb)
+RETURNS void LANGUAGE sql AS $$
+  UPDATE study_sessions
+  SET qa_history = COALESCE(qa_history, '[]'::jsonb) || jsonb_build_array(p_entry),
+      updated_at = now()
+  WHERE id = p_study_session_id;
+$$;
+
+CREATE OR REPLACE FUNCTION record_study_answer(
+  p_study_session_id uuid,
+  p_question_id text,
+  p_patch jsonb,
+  p_entry jsonb
+)
+RETURNS void LANGUAGE sql AS $$
+  UPDATE study_sessions
+  SET tutor_output = jsonb_set(
+        tutor_output,
+        '{knowledge_check}',
+        (
+          SELECT COALESCE(
+            jsonb_agg(CASE WHEN q->>'id' = p_question_id THEN q || p_patch ELSE q END ORDER BY ord),
+            '[]'::jsonb
+          )
+          FROM jsonb_array_elements(tutor_output->'knowledge_check') WITH ORDINALITY AS t(q, ord)
+        )
+      ),
+      qa_history = COALESCE(qa_history, '[]'::jsonb) || jsonb_build_array(p_entry),
+      updated_at = now()
+  WHERE id = p_study_session_id
+    AND jsonb_typeof(tutor_output->'knowledge_check') = 'array';
+$$;
+
 sources jsonb structure — array of objects:
 [{
   "source_index": 0,
@@ -119,15 +153,19 @@ from typing import Any, Dict, List, Optional
 from fastapi import APIRouter, File, HTTPException, UploadFile
 from pydantic import BaseModel, Field
 
-from backend.content_ingestion import extract_text_from_pdf, extract_text_from_url
+from backend.article_pipeline import load_article
+from backend.memory_cache import TTLCache
+from backend.pdf_text_cache import load_pdf_text
+from backend.retrieval import PassageIndex
 from backend.supabase_client import (
-    append_qa_history,
     create_study_session,
     get_session,
     get_study_session,
+    record_study_answer,
     update_study_session,
     save_library_item,
 )
+from backend.uploads import MAX_PDF_BYTES, spooled_upload
 from gemini import (
     ANSWER_EVALUATION_PROMPT,
     KNOWLEDGE_MAP_PROMPT,
@@ -153,6 +191,12 @@ router = APIRouter(prefix="/study-session", tags=["study-session"])
 
 ALLOWED_LEVELS = {"beginner", "some_background", "advanced"}
 ALLOWED_SOURCE_TYPES = {"youtube", "pdf", "article"}
+EVIDENCE_TOP_K = 3
+PROMPT_SOURCE_MAX_CHARS = 50000  # per source, when sources are pasted into a prompt
+
+# Per-study-session passage indexes, built at /build and reused by /answer.
+# Key: study_session_id -> PassageIndex over all successfully extracted sources.
+PASSAGE_INDEXES: TTLCache[PassageIndex] = TTLCache(max_entries=256, ttl_seconds=6 * 3600)
 
 
 class StudySessionCreateRequest(BaseModel):
@@ -229,12 +273,16 @@ def _default_tutor_output(learning_goal: str) -> dict:
 
 
 def _format_sources_for_prompt(sources: List[dict]) -> str:
+    # Extracted text is stored in full (PDFs are no longer truncated at ingestion);
+    # only the copy pasted into the prompt is capped per source.
     lines = []
     for source in sources:
         idx = source.get("source_index")
         s_type = source.get("type")
         title = source.get("title") or source.get("url_or_filename") or "Untitled"
         text = source.get("extracted_text") or ""
+        if len(text) > PROMPT_SOURCE_MAX_CHARS:
+            text = text[:PROMPT_SOURCE_MAX_CHARS] + "\n\n[Content truncated — source too long]"
         lines.append(f'SOURCE {idx} [{s_type}] "{title}": {text}')
     return "\n".join(lines)
 
@@ -245,17 +293,37 @@ def _score_concept(question: str, concept: dict) -> int:
     return sum(1 for tok in name if tok in q_tokens)
 
 
-def _find_excerpt(text: str, phrase: str, window_words: int = 500) -> str:
-    words = text.split()
-    if not words:
-        return ""
-    joined = " ".join(words).lower()
-    idx = joined.find(phrase.lower())
-    if idx == -1:
-        return " ".join(words[:window_words])
-    before = max(0, joined[:idx].count(" ") - 50)
-    after = min(len(words), before + window_words)
-    return " ".join(words[before:after])
+def _get_passage_index(study_session_id: str, session: dict) -> PassageIndex:
+    index = PASSAGE_INDEXES.get(study_session_id)
+    if index is None:
+        # Cold worker or evicted entry: rebuild once from the stored sources.
+        sources = [s for s in (session.get("sources") or []) if s.get("extraction_status") == "done"]
+        index = PassageIndex.from_sources(sources)
+        PASSAGE_INDEXES.set(study_session_id, index)
+    return index
+
+
+def _retrieve_evidence(
+    index: PassageIndex,
+    question: str,
+    concept: Optional[dict],
+    top_k: int = EVIDENCE_TOP_K,
+) -> tuple[str, Optional[int]]:
+    """
+    Returns (excerpt, top_source_index) for the answer-evaluation prompt.
+    Passages are ranked across all sources; the concept's best source is
+    used as a fallback when nothing in the index matches the query.
+    """
+    concept_name = str((concept or {}).get("concept_name") or "")
+    hits = index.search(f"{question} {concept_name}", top_k=top_k)
+    if hits:
+        excerpt = "\n\n".join(
+            f"[SOURCE {passage.get('source_index')}] {passage.get('text', '')}" for _, passage in hits
+        )
+        return excerpt, hits[0][1].get("source_index")
+    fallback_index = (concept or {}).get("best_source_index", 0)
+    fallback = index.first_passage(source_index=fallback_index)
+    return str(fallback.get("text") or ""), None
 
 
 @router.post("/create")
@@ -303,20 +371,17 @@ async def add_pdf(study_session_id: str, file: UploadFile = File(...)):
     if not session:
         raise HTTPException(status_code=404, detail="Study session not found")
 
-    file_bytes = await file.read()
-    if len(file_bytes) > 10 * 1024 * 1024:
-        raise HTTPException(
-            status_code=413,
-            detail={"error": "file_too_large", "message": "PDF must be under 10MB"},
-        )
-
     try:
-        title, text = extract_text_from_pdf(file_bytes)
+        async with spooled_upload(file, MAX_PDF_BYTES) as upload:
+            pdf = await load_pdf_text(upload.path, key=upload.sha256)
+    except HTTPException:
+        raise
     except Exception:
         raise HTTPException(
             status_code=422,
             detail={"error": "pdf_unreadable", "message": "Could not read this PDF. Try a text-based PDF."},
         )
+    title, text = pdf["title"], pdf["text"]
     if not text.strip():
         raise HTTPException(
             status_code=422,
@@ -395,9 +460,9 @@ async def build_session(study_session_id: str, payload: StudySessionBuildRequest
             return s
         if s_type == "article":
             try:
-                title, text = await asyncio.to_thread(extract_text_from_url, url)
-                s["title"] = title
-                s["extracted_text"] = text
+                article = await load_article(url)
+                s["title"] = article["title"]
+                s["extracted_text"] = article["text"]
                 s["extraction_status"] = "done"
             except Exception:
                 s["extraction_status"] = "failed"
@@ -421,6 +486,7 @@ async def build_session(study_session_id: str, payload: StudySessionBuildRequest
     update_study_session(study_session_id, {"sources": sources})
 
     successful_sources = [s for s in sources if s.get("extraction_status") == "done"]
+    PASSAGE_INDEXES.set(study_session_id, PassageIndex.from_sources(successful_sources))
     if len(successful_sources) < 2:
         try:
             update_study_session(study_session_id, {"status": "failed"})
@@ -554,7 +620,6 @@ async def submit_answer(study_session_id: str, payload: AnswerRequest):
     tutor_output = session.get("tutor_output") or {}
     knowledge_map = session.get("knowledge_map") or {}
     questions = list(tutor_output.get("knowledge_check") or [])
-    sources = list(session.get("sources") or [])
 
     target = next((q for q in questions if q.get("id") == payload.question_id), None)
     if not target:
@@ -562,10 +627,13 @@ async def submit_answer(study_session_id: str, payload: AnswerRequest):
 
     concepts = knowledge_map.get("concepts") or []
     best_concept = max(concepts, key=lambda c: _score_concept(target.get("question", ""), c), default=None)
-    source_index = (best_concept or {}).get("best_source_index", 0)
-    source = next((s for s in sources if s.get("source_index") == source_index), None) or {}
-    source_text = source.get("extracted_text") or ""
-    excerpt = _find_excerpt(source_text, (best_concept or {}).get("concept_name", ""), 500)
+    if best_concept is not None and _score_concept(target.get("question", ""), best_concept) == 0:
+        best_concept = None
+    index = _get_passage_index(study_session_id, session)
+    excerpt, top_source_index = _retrieve_evidence(index, target.get("question", ""), best_concept)
+    source_index = (best_concept or {}).get("best_source_index")
+    if source_index is None:
+        source_index = top_source_index if top_source_index is not None else 0
 
     eval_prompt = ANSWER_EVALUATION_PROMPT.format(
         learning_goal=session.get("learning_goal", ""),
@@ -600,15 +668,6 @@ async def submit_answer(study_session_id: str, payload: AnswerRequest):
             "cited_source_index": source_index,
         }
 
-    for question in questions:
-        if question.get("id") == payload.question_id:
-            question["answered"] = True
-            question["user_answer"] = payload.user_answer
-            question["evaluation"] = evaluation
-
-    tutor_output["knowledge_check"] = questions
-    update_study_session(study_session_id, {"tutor_output": tutor_output})
-
     qa_entry = {
         "question_id": payload.question_id,
         "question_text": target.get("question"),
@@ -616,7 +675,12 @@ async def submit_answer(study_session_id: str, payload: AnswerRequest):
         "evaluation": evaluation,
         "answered_at": datetime.now(timezone.utc).isoformat(),
     }
-    append_qa_history(study_session_id, qa_entry)
+    record_study_answer(
+        study_session_id,
+        question_id=payload.question_id,
+        question_patch={"answered": True, "user_answer": payload.user_answer, "evaluation": evaluation},
+        qa_entry=qa_entry,
+    )
 
     return {"evaluation": evaluation, "question_id": payload.question_id, "session_updated": True}
 
@@ -2,15 +2,21 @@
 
 from __future__ import annotations
 
+import base64
+import json
 import os
+import uuid
 from datetime import datetime, timezone
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
 from dotenv import load_dotenv
+from postgrest.exceptions import APIError
 from supabase import Client, create_client
 
 load_dotenv()
 
+from backend import library_search, local_store, storage_codec  # noqa: E402  (read env after load_dotenv)
+
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_SERVICE_KEY = os.getenv("SUPABASE_SERVICE_KEY")
 SESSIONS_TABLE = os.getenv("SUPABASE_SESSIONS_TABLE", "sessions")
@@ -19,9 +25,65 @@ INSIGHTS_TABLE = os.getenv("SUPABASE_INSIGHTS_TABLE", "insight_cache")
 SMART_WATCH_TABLE = os.getenv("SUPABASE_SMART_WATCH_TABLE", "smart_watch_analyses")
 STUDY_SESSIONS_TABLE = os.getenv("SUPABASE_STUDY_SESSIONS_TABLE", "study_sessions")
 LIBRARY_TABLE = os.getenv("SUPABASE_LIBRARY_TABLE", "user_library")
+ROLLUPS_TABLE = os.getenv("SUPABASE_SMART_WATCH_ROLLUPS_TABLE", "smart_watch_rollups")
+VIDEO_DURATIONS_TABLE = os.getenv("SUPABASE_VIDEO_DURATIONS_TABLE", "video_durations")
+ARTICLES_TABLE = os.getenv("SUPABASE_ARTICLES_TABLE", "article_cache")
+PDF_TEXT_TABLE = os.getenv("SUPABASE_PDF_TEXT_TABLE", "pdf_text_cache")
+
+# Explicit projections: never select("*") on wide cache tables.
+TRANSCRIPT_COLUMNS = "video_id,transcript,duration_minutes" + (",transcript_blob" if storage_codec.is_enabled() else "")
+INSIGHT_COLUMNS = "cache_key,mode,transcript_hash,sections_key,insights,word_count,updated_at" + (
+    ",insights_blob" if storage_codec.is_enabled() else ""
+)
+ARTICLE_COLUMNS = "url_hash,url,title,article_text,etag,last_modified,fetched_at" + (
+    ",article_blob" if storage_codec.is_enabled() else ""
+)
+PDF_TEXT_COLUMNS = "content_hash,extractor_version,title,pdf_text" + (
+    ",pdf_blob" if storage_codec.is_enabled() else ""
+)
+ANALYTICS_EVENT_COLUMNS = "cache_key,mode,transcript_hash,sections_key,insights,updated_at"
+SMART_WATCH_COLUMNS = (
+    "id,user_id,session_id,video_id,video_url,video_title,user_question,verdict,confidence,reason,"
+    "estimated_timestamp_range,relevant_moments,stage1_ms,stage2_ms,created_at"
+)
+ROLLUP_COLUMNS = (
+    "scope,total_analyses,watch_count,skim_count,skip_count,confidence_sum,confidence_count,"
+    "stage1_ms_sum,stage1_count,stage2_ms_sum,stage2_count,timestamps_generated,timestamp_clicks,"
+    "time_saved_minutes,updated_at"
+)
+# Library lists never carry the content_data jsonb; the detail fetch does.
+LIBRARY_LIST_COLUMNS = (
+    "id,user_id,session_id,content_type,title,source_url,video_id,summary,notion_page_id,tags,"
+    "created_at,updated_at"
+)
+LIBRARY_DETAIL_COLUMNS = LIBRARY_LIST_COLUMNS + ",content_data"
+LIBRARY_COUNT_MODES = {None, "exact", "planned", "estimated"}
+STUDY_SESSION_COLUMNS = (
+    "id,user_id,session_id,learning_goal,student_level,sources,knowledge_map,tutor_output,"
+    "qa_history,status,created_at,updated_at"
+)
 
 _client: Optional[Client] = None
 
+
+def _decode_transcript_row(row: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    if not row:
+        return row
+    blob = row.pop("transcript_blob", None)
+    if blob:
+        row["transcript"] = storage_codec.decode_text(blob)
+    return row
+
+
+def _decode_insight_row(row: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    if not row:
+        return row
+    blob = row.pop("insights_blob", None)
+    if blob:
+        row["insights"] = storage_codec.decode_json(blob)
+    return row
+
+
 def get_latest_insight(session_id: str):
     """
     Fetches the most recent insight from insight_cache
@@ -30,15 +92,15 @@ def get_latest_insight(session_id: str):
     try:
         client = _get_client()
         result = (
-            client.table("insight_cache")
-            .select("*")
+            client.table(INSIGHTS_TABLE)
+            .select(INSIGHT_COLUMNS)
             .eq("session_id", session_id)
             .order("created_at", desc=True)
             .limit(1)
             .maybe_single()
             .execute()
         )
-        return result.data if result.data else None
+        return _decode_insight_row(result.data) if result.data else None
     except Exception:
         return None
 def _get_client() -> Client:
@@ -121,16 +183,16 @@ def get_cached_transcript(video_id: str) -> Optional[Dict[str, Any]]:
     client = _get_client()
     response = (
         client.table(TRANSCRIPTS_TABLE)
-        .select("*")
+        .select(TRANSCRIPT_COLUMNS)
         .eq("video_id", video_id)
         .maybe_single()
         .execute()
     )
-    return response.data
+    return _decode_transcript_row(response.data) if response else None
 
 
 def save_cached_transcript(video_id: str, transcript: str, duration_minutes: float) -> Dict[str, Any]:
-    """Upsert transcript cache row for a YouTube video."""
+    """Upsert transcript cache row for a YouTube video (compressed when large)."""
     client = _get_client()
     payload = {
         "video_id": video_id,
@@ -138,12 +200,142 @@ def save_cached_transcript(video_id: str, transcript: str, duration_minutes: flo
         "duration_minutes": duration_minutes,
         "updated_at": datetime.now(timezone.utc).isoformat(),
     }
+    if storage_codec.is_enabled():
+        blob = storage_codec.encode_text(transcript)
+        payload["transcript_blob"] = blob
+        if blob:
+            payload["transcript"] = ""
+    client.table(TRANSCRIPTS_TABLE).upsert(payload, on_conflict="video_id", returning="minimal").execute()
+    try:
+        save_video_duration(video_id, duration_minutes)
+    except Exception:
+        pass
+    payload.pop("transcript_blob", None)
+    payload["transcript"] = transcript
+    return payload
+
+
+def get_cached_article(url_hash: str) -> Optional[Dict[str, Any]]:
+    """Fetch cached article text and its HTTP validators by sha256(url)."""
+    client = _get_client()
     response = (
-        client.table(TRANSCRIPTS_TABLE)
-        .upsert(payload, on_conflict="video_id")
+        client.table(ARTICLES_TABLE)
+        .select(ARTICLE_COLUMNS)
+        .eq("url_hash", url_hash)
+        .maybe_single()
         .execute()
     )
-    return response.data[0] if response.data else payload
+    row = response.data if response else None
+    if row:
+        blob = row.pop("article_blob", None)
+        if blob:
+            row["article_text"] = storage_codec.decode_text(blob)
+    return row
+
+
+def save_cached_article(
+    url_hash: str,
+    url: str,
+    title: str,
+    article_text: str,
+    etag: Optional[str] = None,
+    last_modified: Optional[str] = None,
+    fetched_at: Optional[str] = None,
+) -> None:
+    """Upsert article text (compressed when large) with its ETag/Last-Modified validators."""
+    client = _get_client()
+    payload = {
+        "url_hash": url_hash,
+        "url": url,
+        "title": title,
+        "article_text": article_text,
+        "etag": etag,
+        "last_modified": last_modified,
+        "fetched_at": fetched_at or datetime.now(timezone.utc).isoformat(),
+    }
+    if storage_codec.is_enabled():
+        blob = storage_codec.encode_text(article_text)
+        payload["article_blob"] = blob
+        if blob:
+            payload["article_text"] = ""
+    client.table(ARTICLES_TABLE).upsert(payload, on_conflict="url_hash", returning="minimal").execute()
+
+
+def get_cached_pdf_text(content_hash: str) -> Optional[Dict[str, Any]]:
+    """Fetch extracted PDF text by sha256 of the uploaded bytes."""
+    client = _get_client()
+    response = (
+        client.table(PDF_TEXT_TABLE)
+        .select(PDF_TEXT_COLUMNS)
+        .eq("content_hash", content_hash)
+        .maybe_single()
+        .execute()
+    )
+    row = response.data if response else None
+    if row:
+        blob = row.pop("pdf_blob", None)
+        if blob:
+            row["pdf_text"] = storage_codec.decode_text(blob)
+    return row
+
+
+def save_cached_pdf_text(
+    content_hash: str,
+    extractor_version: str,
+    title: str,
+    pdf_text: str,
+    byte_size: int,
+) -> None:
+    """Upsert extracted PDF text (compressed when large) keyed by the upload's sha256."""
+    client = _get_client()
+    payload = {
+        "content_hash": content_hash,
+        "extractor_version": extractor_version,
+        "title": title,
+        "pdf_text": pdf_text,
+        "byte_size": byte_size,
+        "updated_at": datetime.now(timezone.utc).isoformat(),
+    }
+    if storage_codec.is_enabled():
+        blob = storage_codec.encode_text(pdf_text)
+        payload["pdf_blob"] = blob
+        if blob:
+            payload["pdf_text"] = ""
+    client.table(PDF_TEXT_TABLE).upsert(payload, on_conflict="content_hash", returning="minimal").execute()
+
+
+def save_video_duration(video_id: str, duration_minutes: float) -> None:
+    """Upsert the lightweight video_id -> duration row used by dashboards."""
+    client = _get_client()
+    client.table(VIDEO_DURATIONS_TABLE).upsert(
+        {
+            "video_id": video_id,
+            "duration_minutes": float(duration_minutes or 0.0),
+            "updated_at": datetime.now(timezone.utc).isoformat(),
+        },
+        on_conflict="video_id",
+    ).execute()
+
+
+def get_video_durations(video_ids: List[str]) -> Dict[str, float]:
+    """Fetch durations for many videos in one query. Missing ids are omitted."""
+    ids = sorted({v for v in video_ids if v})
+    if not ids:
+        return {}
+    client = _get_client()
+    response = (
+        client.table(VIDEO_DURATIONS_TABLE)
+        .select("video_id,duration_minutes")
+        .in_("video_id", ids)
+        .execute()
+    )
+    out: Dict[str, float] = {}
+    for row in response.data or []:
+        try:
+            out[str(row["video_id"])] = float(row.get("duration_minutes") or 0.0)
+        except (TypeError, ValueError, KeyError):
+            continue
+    return out
 
 
 def get_cached_insights(cache_key: str) -> Optional[Dict[str, Any]]:
@@ -151,12 +343,12 @@ def get_cached_insights(cache_key: str) -> Optional[Dict[str, Any]]:
     client = _get_client()
     response = (
         client.table(INSIGHTS_TABLE)
-        .select("*")
+        .select(INSIGHT_COLUMNS)
         .eq("cache_key", cache_key)
         .maybe_single()
         .execute()
     )
-    return response.data
+    return _decode_insight_row(response.data) if response else None
 
 
 def save_cached_insights(
@@ -167,7 +359,7 @@ def save_cached_insights(
     insights: Dict[str, Any],
     word_count: int,
 ) -> Dict[str, Any]:
-    """Upsert extracted insights cache row."""
+    """Upsert extracted insights cache row (insights compressed when large)."""
     client = _get_client()
     payload = {
         "cache_key": cache_key,
@@ -178,15 +370,33 @@ def save_cached_insights(
         "word_count": word_count,
         "updated_at": datetime.now(timezone.utc).isoformat(),
     }
+    if storage_codec.is_enabled():
+        blob = storage_codec.encode_json(insights)
+        payload["insights_blob"] = blob
+        if blob:
+            payload["insights"] = {}
+    client.table(INSIGHTS_TABLE).upsert(payload, on_conflict="cache_key", returning="minimal").execute()
+    payload.pop("insights_blob", None)
+    payload["insights"] = insights
+    return payload
+
+
+def list_cached_insight_keys(mode: str, transcript_hash: str, limit: int = 200) -> List[Dict[str, Any]]:
+    """List (cache_key, sections_key) for cached insights of one mode and transcript hash."""
+    client = _get_client()
     response = (
         client.table(INSIGHTS_TABLE)
-        .upsert(payload, on_conflict="cache_key")
+        .select("cache_key,sections_key")
+        .eq("mode", mode)
+        .eq("transcript_hash", transcript_hash)
+        .order("updated_at", desc=True)
+        .limit(limit)
         .execute()
     )
-    return response.data[0] if response.data else payload
+    return response.data or []
 
 
-def save_smart_watch_analysis(
+def build_smart_watch_record(
     session_id: str,
     video_id: str,
     video_url: str,
@@ -201,8 +411,7 @@ def save_smart_watch_analysis(
     stage1_ms: Optional[int] = None,
     stage2_ms: Optional[int] = None,
 ) -> Dict[str, Any]:
-    """Insert a Smart Watch analysis row with explicit typed fields."""
-    client = _get_client()
+    """Build a Smart Watch analysis row with explicit typed fields."""
     record: Dict[str, Any] = {
         "session_id": session_id,
         "video_id": video_id,
@@ -220,20 +429,27 @@ def save_smart_watch_analysis(
     }
     record = {k: v for k, v in record.items() if v is not None}
     record["created_at"] = datetime.now(timezone.utc).isoformat()
+    return record
+
+
+def save_smart_watch_analysis(**fields: Any) -> Dict[str, Any]:
+    """Insert a Smart Watch analysis row (see build_smart_watch_record for fields)."""
+    client = _get_client()
+    record = build_smart_watch_record(**fields)
     response = client.table(SMART_WATCH_TABLE).insert(record).execute()
     return response.data[0] if response.data else record
 
 
-def track_analytics_event(
+def build_analytics_event(
     session_id: str,
     event_name: str,
     user_id: Optional[str] = None,
     payload: Optional[Dict[str, Any]] = None,
 ) -> Dict[str, Any]:
-    """Track lightweight product analytics in the shared insight cache table."""
-    client = _get_client()
-    event_payload = {
-        "cache_key": f"event::{event_name}::{datetime.now(timezone.utc).timestamp()}::{session_id}",
+    """Build an analytics event row for the shared insight cache table."""
+    now = datetime.now(timezone.utc)
+    return {
+        "cache_key": f"event::{event_name}::{now.timestamp()}::{session_id}::{uuid.uuid4().hex[:8]}",
         "mode": "analytics",
         "transcript_hash": session_id,
         "sections_key": event_name,
@@ -242,15 +458,43 @@ def track_analytics_event(
             "session_id": session_id,
             "user_id": user_id,
             "payload": payload or {},
-            "created_at": datetime.now(timezone.utc).isoformat(),
+            "created_at": now.isoformat(),
         },
         "word_count": 0,
-        "updated_at": datetime.now(timezone.utc).isoformat(),
+        "updated_at": now.isoformat(),
     }
+
+
+def track_analytics_event(
+    session_id: str,
+    event_name: str,
+    user_id: Optional[str] = None,
+    payload: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """Track lightweight product analytics in the shared insight cache table."""
+    client = _get_client()
+    event_payload = build_analytics_event(session_id, event_name, user_id=user_id, payload=payload)
     response = client.table(INSIGHTS_TABLE).insert(event_payload).execute()
     return response.data[0] if response.data else event_payload
 
 
+def bulk_insert(table: str, rows: List[Dict[str, Any]]) -> int:
+    """
+    Insert many rows with one request per distinct column set.
+    PostgREST bulk inserts take their columns from the first row, so rows
+    with optional fields omitted are grouped rather than null-padded.
+    """
+    if not rows:
+        return 0
+    client = _get_client()
+    groups: Dict[tuple, List[Dict[str, Any]]] = {}
+    for row in rows:
+        groups.setdefault(tuple(sorted(row)), []).append(row)
+    for group in groups.values():
+        client.table(table).insert(group).execute()
+    return len(rows)
+
+
 def list_smart_watch_analyses(
     session_id: str,
     user_id: Optional[str] = None,
@@ -261,7 +505,7 @@ def list_smart_watch_analyses(
     safe_limit = max(1, min(int(limit), 100))
     query = (
         client.table(SMART_WATCH_TABLE)
-        .select("*")
+        .select(SMART_WATCH_COLUMNS)
         .order("created_at", desc=True)
         .limit(safe_limit)
     )
@@ -273,6 +517,25 @@ def list_smart_watch_analyses(
     return response.data or []
 
 
+def increment_smart_watch_rollup(scope: str, delta: Dict[str, Any]) -> None:
+    """Atomically add delta counters to one rollup row (increment_smart_watch_rollup RPC)."""
+    client = _get_client()
+    client.rpc("increment_smart_watch_rollup", {"p_scope": scope, "p_delta": delta}).execute()
+
+
+def get_smart_watch_rollup(scope: str) -> Optional[Dict[str, Any]]:
+    """Fetch one Smart Watch rollup row by scope ('user:<id>' or 'session:<id>')."""
+    client = _get_client()
+    response = (
+        client.table(ROLLUPS_TABLE)
+        .select(ROLLUP_COLUMNS)
+        .eq("scope", scope)
+        .maybe_single()
+        .execute()
+    )
+    return response.data if response else None
+
+
 def list_analytics_events(
     session_id: str,
     user_id: Optional[str] = None,
@@ -283,7 +546,7 @@ def list_analytics_events(
     safe_limit = max(1, min(int(limit), 500))
     query = (
         client.table(INSIGHTS_TABLE)
-        .select("*")
+        .select(ANALYTICS_EVENT_COLUMNS)
         .eq("mode", "analytics")
         .order("updated_at", desc=True)
         .limit(safe_limit)
@@ -304,6 +567,8 @@ def create_study_session(
     sources: list
 ) -> str:
     """Creates session row, returns study_session_id."""
+    if local_store.is_enabled():
+        return local_store.create_study_session(user_id, session_id, learning_goal, student_level, sources)
     client = _get_client()
     payload = {
         "user_id": user_id,
@@ -323,10 +588,12 @@ def create_study_session(
 
 def get_study_session(study_session_id: str) -> Optional[dict]:
     """Fetches full session row. Returns None if not found."""
+    if local_store.is_enabled():
+        return local_store.get_study_session(study_session_id)
     client = _get_client()
     response = (
         client.table(STUDY_SESSIONS_TABLE)
-        .select("*")
+        .select(STUDY_SESSION_COLUMNS)
         .eq("id", study_session_id)
         .maybe_single()
         .execute()
@@ -342,6 +609,9 @@ def update_study_session(
     Partial update — only keys present in updates dict are changed.
     Always sets updated_at = now().
     """
+    if local_store.is_enabled():
+        local_store.update_study_session(study_session_id, updates)
+        return
     client = _get_client()
     payload = dict(updates)
     payload["updated_at"] = datetime.now(timezone.utc).isoformat()
@@ -353,31 +623,84 @@ def append_qa_history(
     qa_entry: dict
 ) -> None:
     """
-    Appends one entry to qa_history jsonb array.
-    Uses Supabase's jsonb concatenation:
+    Appends one entry to qa_history jsonb array server-side via the
+    append_study_qa_history RPC:
     qa_history = qa_history || '[{entry}]'::jsonb
+    Only the new entry is sent; concurrent appends cannot overwrite each other.
     """
+    if local_store.is_enabled():
+        local_store.append_qa_history(study_session_id, qa_entry)
+        return
     client = _get_client()
-    current = (
-        client.table(STUDY_SESSIONS_TABLE)
-        .select("qa_history")
-        .eq("id", study_session_id)
-        .maybe_single()
-        .execute()
-    )
-    history = (current.data or {}).get("qa_history") if current else None
-    if not isinstance(history, list):
-        history = []
-    history.append(qa_entry)
-    client.table(STUDY_SESSIONS_TABLE).update(
-        {"qa_history": history, "updated_at": datetime.now(timezone.utc).isoformat()}
-    ).eq("id", study_session_id).execute()
+    client.rpc(
+        "append_study_qa_history",
+        {"p_study_session_id": study_session_id, "p_entry": qa_entry},
+    ).execute()
+
+
+def record_study_answer(
+    study_session_id: str,
+    question_id: str,
+    question_patch: dict,
+    qa_entry: dict,
+) -> None:
+    """
+    Atomically merges question_patch into the knowledge_check question with
+    id == question_id and appends qa_entry to qa_history, in one UPDATE via
+    the record_study_answer RPC.
+    """
+    if local_store.is_enabled():
+        local_store.record_study_answer(study_session_id, question_id, question_patch, qa_entry)
+        return
+    client = _get_client()
+    client.rpc(
+        "record_study_answer",
+        {
+            "p_study_session_id": study_session_id,
+            "p_question_id": question_id,
+            "p_patch": question_patch,
+            "p_entry": qa_entry,
+        },
+    ).execute()
 
 
 # ============================================================================
 # UNIFIED LIBRARY FUNCTIONS
 # ============================================================================
 
+def build_library_item(
+    session_id: str,
+    content_type: str,
+    title: str,
+    user_id: Optional[str] = None,
+    source_url: Optional[str] = None,
+    video_id: Optional[str] = None,
+    summary: Optional[str] = None,
+    content_data: Optional[Dict[str, Any]] = None,
+    notion_page_id: Optional[str] = None,
+    tags: Optional[list[str]] = None,
+) -> Dict[str, Any]:
+    """Build a user_library row; optional columns are omitted when empty."""
+    item_data = {
+        "session_id": session_id,
+        "content_type": content_type,
+        "title": title,
+        "summary": summary or "",
+        "content_data": content_data or {},
+        "tags": tags or [],
+    }
+    
+    if user_id:
+        item_data["user_id"] = user_id
+    if source_url:
+        item_data["source_url"] = source_url
+    if video_id:
+        item_data["video_id"] = video_id
+    if notion_page_id:
+        item_data["notion_page_id"] = notion_page_id
+    return item_data
+
+
 def save_library_item(
     session_id: str,
     content_type: str,
@@ -408,26 +731,24 @@ def save_library_item(
     Returns:
         The created library item
     """
+    item_data = build_library_item(
+        session_id=session_id,
+        content_type=content_type,
+        title=title,
+        user_id=user_id,
+        source_url=source_url,
+        video_id=video_id,
+        summary=summary,
+        content_data=content_data,
+        notion_page_id=notion_page_id,
+        tags=tags,
+    )
+    if local_store.is_enabled():
+        item = local_store.save_library_item(item_data)
+        library_search.index_local_item(item)
+        return item
+
     client = _get_client()
-    
-    item_data = {
-        "session_id": session_id,
-        "content_type": content_type,
-        "title": title,
-        "summary": summary or "",
-        "content_data": content_data or {},
-        "tags": tags or [],
-    }
-    
-    if user_id:
-        item_data["user_id"] = user_id
-    if source_url:
-        item_data["source_url"] = source_url
-    if video_id:
-        item_data["video_id"] = video_id
-    if notion_page_id:
-        item_data["notion_page_id"] = notion_page_id
-    
     response = client.table(LIBRARY_TABLE).insert(item_data).execute()
     
     if not response.data:
@@ -436,55 +757,110 @@ def save_library_item(
     return response.data[0]
 
 
+def encode_library_cursor(row: Dict[str, Any]) -> Optional[str]:
+    """Opaque keyset cursor for the (created_at, id) position of a library row."""
+    created_at, item_id = row.get("created_at"), row.get("id")
+    if not created_at or not item_id:
+        return None
+    raw = json.dumps([str(created_at), str(item_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_library_cursor(cursor: str) -> tuple[str, str]:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    try:
+        created_at, item_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        item_id = str(uuid.UUID(str(item_id)))
+    except (ValueError, TypeError) as exc:
+        raise ValueError("Invalid library cursor") from exc
+    # The timestamp is interpolated into a PostgREST or= filter.
+    created_at = str(created_at)
+    if not created_at or any(ch in created_at for ch in '",()\\'):
+        raise ValueError("Invalid library cursor")
+    return created_at, item_id
+
+
+def _library_scope(query, session_id: str, user_id: Optional[str], content_type: Optional[str]):
+    # Filter by user or session
+    if user_id:
+        query = query.eq("user_id", user_id)
+    else:
+        query = query.eq("session_id", session_id)
+    if content_type:
+        query = query.eq("content_type", content_type)
+    return query
+
+
 def list_library_items(
     session_id: str,
     user_id: Optional[str] = None,
     content_type: Optional[str] = None,
     limit: int = 50,
     offset: int = 0,
+    cursor: Optional[str] = None,
+    count: Optional[str] = None,
+    include_content: bool = False,
 ) -> Dict[str, Any]:
     """
     List library items for a user/session with optional filtering.
+
+    Rows are ordered by (created_at, id) descending and use the light
+    LIBRARY_LIST_COLUMNS projection; content_data is only selected when
+    include_content is set (fetch it per item with get_library_item).
     
     Args:
         session_id: Session identifier
         user_id: Optional user ID (if authenticated)
         content_type: Optional filter by content type
         limit: Maximum items to return (default 50, max 100)
-        offset: Offset for pagination
+        offset: Offset for pagination (ignored when cursor is given)
+        cursor: Keyset cursor from a previous page's next_cursor
+        count: None (no count), "estimated", "planned" or "exact"
+        include_content: Also select the content_data jsonb
     
     Returns:
-        Dict with 'items', 'total', and 'has_more' keys
+        Dict with 'items', 'total' (None unless count is requested),
+        'has_more' and 'next_cursor' keys
     """
-    client = _get_client()
     safe_limit = max(1, min(int(limit), 100))
-    
-    # Build query
-    query = client.table(LIBRARY_TABLE).select("*", count="exact")
-    
-    # Filter by user or session
-    if user_id:
-        query = query.eq("user_id", user_id)
+    if count not in LIBRARY_COUNT_MODES:
+        raise ValueError(f"Unsupported count mode: {count}")
+    after = decode_library_cursor(cursor) if cursor else None
+
+    # Fetch one extra row: it tells us whether another page exists without counting.
+    if local_store.is_enabled():
+        rows, total = local_store.list_library_items(
+            session_id, user_id, content_type, safe_limit + 1, int(offset), after, bool(count), include_content
+        )
+        return _library_page(rows, total, safe_limit)
+
+    client = _get_client()
+    columns = LIBRARY_DETAIL_COLUMNS if include_content else LIBRARY_LIST_COLUMNS
+    query = client.table(LIBRARY_TABLE).select(columns, count=count)
+    query = _library_scope(query, session_id, user_id, content_type)
+    query = query.order("created_at", desc=True).order("id", desc=True)
+
+    if after:
+        created_at, item_id = after
+        query = query.or_(
+            f'created_at.lt."{created_at}",and(created_at.eq."{created_at}",id.lt.{item_id})'
+        ).limit(safe_limit + 1)
     else:
-        query = query.eq("session_id", session_id)
-    
-    # Filter by content type if specified
-    if content_type:
-        query = query.eq("content_type", content_type)
-    
-    # Apply ordering and pagination
-    query = query.order("created_at", desc=True).range(offset, offset + safe_limit - 1)
-    
+        start = max(0, int(offset))
+        query = query.range(start, start + safe_limit)
+
     response = query.execute()
-    
-    items = response.data or []
-    total = response.count or 0
-    has_more = (offset + safe_limit) < total
-    
+    return _library_page(response.data or [], response.count if count else None, safe_limit)
+
+
+def _library_page(rows: List[Dict[str, Any]], total: Optional[int], limit: int) -> Dict[str, Any]:
+    has_more = len(rows) > limit
+    items = rows[:limit]
     return {
         "items": items,
         "total": total,
         "has_more": has_more,
+        "next_cursor": encode_library_cursor(items[-1]) if has_more and items else None,
     }
 
 
@@ -504,9 +880,12 @@ def get_library_item(
     Returns:
         The library item or None if not found
     """
+    if local_store.is_enabled():
+        return local_store.get_library_item(item_id, session_id, user_id)
+
     client = _get_client()
     
-    query = client.table(LIBRARY_TABLE).select("*").eq("id", item_id)
+    query = client.table(LIBRARY_TABLE).select(LIBRARY_DETAIL_COLUMNS).eq("id", item_id)
     
     # Ensure user can only access their own items
     if user_id:
@@ -535,6 +914,12 @@ def delete_library_item(
     Returns:
         True if deleted, False if not found
     """
+    if local_store.is_enabled():
+        deleted = local_store.delete_library_item(item_id, session_id, user_id)
+        if deleted:
+            library_search.unindex_local_item(item_id)
+        return deleted
+
     client = _get_client()
     
     query = client.table(LIBRARY_TABLE).delete().eq("id", item_id)
@@ -556,48 +941,70 @@ def search_library_items(
     user_id: Optional[str] = None,
     content_type: Optional[str] = None,
     limit: int = 50,
+    tags: Optional[List[str]] = None,
 ) -> Dict[str, Any]:
     """
-    Search library items by text query.
+    Ranked full-text search over title, summary, tags and content_data.
     
     Args:
         session_id: Session identifier
-        query: Search query string
+        query: Search query (websearch syntax: quotes, OR, -term)
         user_id: Optional user ID (if authenticated)
         content_type: Optional filter by content type
         limit: Maximum items to return
+        tags: Optional tags every result must carry
     
     Returns:
-        Dict with 'items' and 'total' keys
+        Dict with 'items' (list rows plus 'rank' and 'highlight'), 'total'
+        and 'facets' ({'content_type': {...}, 'tags': {...}}) keys
     """
-    client = _get_client()
     safe_limit = max(1, min(int(limit), 100))
-    
-    # Use PostgreSQL full-text search
-    search_query = client.table(LIBRARY_TABLE).select("*", count="exact")
-    
-    # Filter by user or session
-    if user_id:
-        search_query = search_query.eq("user_id", user_id)
-    else:
-        search_query = search_query.eq("session_id", session_id)
-    
-    # Filter by content type if specified
-    if content_type:
-        search_query = search_query.eq("content_type", content_type)
-    
-    # Full-text search using textSearch
+    if local_store.is_enabled():
+        return library_search.local_index().search(
+            query, session_id, user_id=user_id, content_type=content_type, tags=tags, limit=safe_limit
+        )
+
+    client = _get_client()
+    try:
+        response = client.rpc(
+            "search_user_library",
+            {
+                "p_session_id": session_id,
+                "p_user_id": user_id,
+                "p_query": query,
+                "p_content_type": content_type,
+                "p_tags": tags or None,
+                "p_limit": safe_limit,
+            },
+        ).execute()
+    except APIError as exc:
+        # Function not deployed yet: fall back to the old title-only search.
+        if exc.code != "PGRST202":
+            raise
+        return _search_library_titles(client, session_id, query, user_id, content_type, safe_limit)
+
+    data = response.data or {}
+    return {
+        "items": data.get("items") or [],
+        "total": int(data.get("total") or 0),
+        "facets": data.get("facets") or {"content_type": {}, "tags": {}},
+    }
+
+
+def _search_library_titles(
+    client: Client,
+    session_id: str,
+    query: str,
+    user_id: Optional[str],
+    content_type: Optional[str],
+    limit: int,
+) -> Dict[str, Any]:
+    search_query = client.table(LIBRARY_TABLE).select(LIBRARY_LIST_COLUMNS, count="exact")
+    search_query = _library_scope(search_query, session_id, user_id, content_type)
     search_query = search_query.text_search("title", query, config="english")
-    
-    # Apply ordering and limit
-    search_query = search_query.order("created_at", desc=True).limit(safe_limit)
-    
-    response = search_query.execute()
-    
-    items = response.data or []
-    total = response.count or 0
-    
+    response = search_query.order("created_at", desc=True).limit(limit).execute()
     return {
-        "items": items,
-        "total": total,
+        "items": response.data or [],
+        "total": response.count or 0,
+        "facets": {"content_type": {}, "tags": {}},
     }
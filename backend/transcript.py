@@ -0,0 +1,228 @@
+"""
+Transcript text with its derived views computed once.
+
+Extraction, Q&A, verdicts and Smart Watch all need the same things from a
+transcript: the word list, its hash, whether it carries [MM:SS] markers,
+chunkings of various sizes. ``Transcript`` computes each of these on first
+use and keeps it, so one request (or one cached transcript shared by many
+requests) never re-splits or re-hashes multi-MB text. Functions that take a
+transcript accept either a str or a Transcript (``Transcript.of``).
+
+Recently seen transcripts are kept in a registry keyed by sha256, so clients
+can send ``transcript_ref`` instead of re-uploading the text on every turn and
+get back the same object, with its chunkings and indexes already built. The
+registry is bounded by estimated memory (text plus those derived views), not
+just entry count, so a few textbook-sized PDFs cannot fill a worker; a text too
+large for the budget is simply not registered and its ref resolves to 409.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import threading
+from itertools import islice
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar, Union
+
+from backend.memory_cache import TTLCache
+
+T = TypeVar("T")
+
+TIMESTAMP_RE = re.compile(r"\[\d{2}:\d{2}\]")
+CONTENT_HASH_RE = re.compile(r"[0-9a-f]{64}", re.IGNORECASE)
+_WORD_RE = re.compile(r"\S+")
+
+TRANSCRIPT_REGISTRY_SIZE = int(os.getenv("TRANSCRIPT_REGISTRY_SIZE", "128"))
+TRANSCRIPT_REGISTRY_TTL_SECONDS = int(os.getenv("TRANSCRIPT_REGISTRY_TTL_SECONDS", str(6 * 3600)))
+TRANSCRIPT_REGISTRY_MAX_BYTES = int(os.getenv("TRANSCRIPT_REGISTRY_MAX_BYTES", str(64 * 1024 * 1024)))
+# Word list, offsets, chunkings and BM25 indexes come to roughly this many
+# times the size of the text once a transcript has been used for Q&A/Smart Watch.
+_MEMORY_PER_TEXT_BYTE = 16
+
+
+# ─── Length Scaling ──────────────────────────────────────────────────────────
+#
+# This is the core fix for the "2-hour video gets 5 points" problem.
+# Output depth scales with content length. No artificial caps.
+
+def length_profile(word_count: int) -> dict:
+    """
+    Returns expected output depth based on transcript word count.
+    ~130 words/minute of speech, so:
+      2000 words  ≈ 15 min
+      6000 words  ≈ 45 min
+      10000 words ≈ 75 min
+      16000 words ≈ 2 hours
+    """
+    if word_count < 2000:
+        return {
+            "category":      "short",
+            "label":         "short (~15 min)",
+            "key_facts":     "5 to 10",
+            "self_test":     "3 to 4",
+            "key_points":    "4 to 7",
+        }
+    elif word_count < 6000:
+        return {
+            "category":      "medium",
+            "label":         "medium (~45 min)",
+            "key_facts":     "12 to 20",
+            "self_test":     "5 to 7",
+            "key_points":    "8 to 14",
+        }
+    elif word_count < 10000:
+        return {
+            "category":      "long",
+            "label":         "long (~75 min)",
+            "key_facts":     "20 to 32",
+            "self_test":     "7 to 10",
+            "key_points":    "12 to 20",
+        }
+    else:
+        return {
+            "category":      "very_long",
+            "label":         "very long (2h+)",
+            "key_facts":     "30 to 50",
+            "self_test":     "10 to 14",
+            "key_points":    "18 to 28",
+        }
+
+
+class Transcript:
+    """Immutable transcript text; every derived value is computed lazily, once."""
+
+    def __init__(self, text: str):
+        self.text = text
+        self._memo: Dict[Any, Any] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def of(cls, value: Union[str, "Transcript", None]) -> "Transcript":
+        return value if isinstance(value, Transcript) else cls(value or "")
+
+    def __str__(self) -> str:
+        return self.text
+
+    def __bool__(self) -> bool:
+        return bool(self.text)
+
+    def __repr__(self) -> str:
+        return f"Transcript({len(self.text)} chars)"
+
+    def cached(self, key: Any, build: Callable[["Transcript"], T]) -> T:
+        """Memoize ``build(self)`` under ``key``; for indexes owned by other modules."""
+        try:
+            return self._memo[key]
+        except KeyError:
+            pass
+        value = build(self)
+        with self._lock:
+            return self._memo.setdefault(key, value)
+
+    @property
+    def words(self) -> List[str]:
+        """Whitespace-split words (shared; do not mutate)."""
+        return self.cached("words", lambda t: t.text.split())
+
+    @property
+    def word_offsets(self) -> List[int]:
+        """Character offset of each word in ``text``."""
+        return self.cached("word_offsets", lambda t: [m.start() for m in _WORD_RE.finditer(t.text)])
+
+    @property
+    def word_count(self) -> int:
+        return len(self.words)
+
+    @property
+    def sha256(self) -> str:
+        return self.cached("sha256", lambda t: hashlib.sha256(t.text.encode("utf-8")).hexdigest())
+
+    @property
+    def has_timestamps(self) -> bool:
+        """Whether real [MM:SS] markers are embedded."""
+        return self.cached("has_timestamps", lambda t: bool(TIMESTAMP_RE.search(t.text)))
+
+    @property
+    def length_profile(self) -> dict:
+        return length_profile(self.word_count)
+
+    @property
+    def duration_estimate_minutes(self) -> float:
+        """Rough spoken duration (~130 words/min) when no real duration is known."""
+        return self.word_count / 130
+
+    def opening(self, n_words: int) -> str:
+        """The first ``n_words`` words joined by single spaces, without splitting the whole text."""
+        if "words" in self._memo:
+            return " ".join(self.words[:n_words])
+        return " ".join(m.group() for m in islice(_WORD_RE.finditer(self.text), n_words))
+
+    def span(self, start_word: int, end_word: int) -> str:
+        """Original text (whitespace kept) from word ``start_word`` up to, not including, ``end_word``."""
+        offsets, words = self.word_offsets, self.words
+        end_word = min(end_word, len(words))
+        if start_word >= end_word:
+            return ""
+        return self.text[offsets[start_word]:offsets[end_word - 1] + len(words[end_word - 1])]
+
+    def chunks(self, chunk_words: int, overlap: int) -> List[str]:
+        """Overlapping word-window chunks, memoized per (chunk_words, overlap)."""
+        return self.cached(("chunks", chunk_words, overlap), lambda t: _word_chunks(t.words, chunk_words, overlap))
+
+
+def _chunk_bounds(total: int, chunk_words: int, overlap: int) -> List[Tuple[int, int]]:
+    bounds = []
+    start = 0
+    while start < total:
+        end = min(start + chunk_words, total)
+        bounds.append((start, end))
+        if end == total:
+            break
+        start = end - overlap  # overlap
+    return bounds
+
+
+def _word_chunks(words: List[str], chunk_words: int, overlap: int) -> List[str]:
+    return [" ".join(words[start:end]) for start, end in _chunk_bounds(len(words), chunk_words, overlap)]
+
+
+TranscriptLike = Union[str, Transcript]
+
+def estimated_memory_bytes(transcript: Transcript) -> int:
+    """Rough footprint of a transcript with its derived views built."""
+    return len(transcript.text) * _MEMORY_PER_TEXT_BYTE
+
+
+# sha256 -> Transcript
+TRANSCRIPT_REGISTRY: TTLCache[Transcript] = TTLCache(
+    max_entries=TRANSCRIPT_REGISTRY_SIZE,
+    ttl_seconds=TRANSCRIPT_REGISTRY_TTL_SECONDS,
+    max_weight=TRANSCRIPT_REGISTRY_MAX_BYTES,
+    weigh=estimated_memory_bytes,
+)
+
+
+def is_content_hash(ref: str) -> bool:
+    return bool(CONTENT_HASH_RE.fullmatch(ref or ""))
+
+
+def remember_transcript(transcript: TranscriptLike) -> Transcript:
+    """
+    Register a transcript under its sha256 and return the registered object:
+    if the same text is already known, that instance (with whatever it has
+    already computed) is returned instead. Texts over the registry's memory
+    budget are returned without being registered.
+    """
+    transcript = Transcript.of(transcript)
+    if not transcript:
+        return transcript
+    known = TRANSCRIPT_REGISTRY.get(transcript.sha256)
+    if known is not None:
+        return known
+    TRANSCRIPT_REGISTRY.set(transcript.sha256, transcript)
+    return transcript
+
+
+def lookup_transcript(content_hash: str) -> Optional[Transcript]:
+    return TRANSCRIPT_REGISTRY.get(content_hash.lower())
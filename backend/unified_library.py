@@ -34,14 +34,28 @@ FOR ALL USING (
 );
 
 -- Indexes for performance
-CREATE INDEX idx_user_library_user_created ON user_library(user_id, created_at DESC);
-CREATE INDEX idx_user_library_session_created ON user_library(session_id, created_at DESC);
+-- Keyset pagination walks (created_at, id) descending within a user/session
+CREATE INDEX idx_user_library_user_created ON user_library(user_id, created_at DESC, id DESC);
+CREATE INDEX idx_user_library_session_created ON user_library(session_id, created_at DESC, id DESC);
 CREATE INDEX idx_user_library_content_type ON user_library(content_type);
 CREATE INDEX idx_user_library_video_id ON user_library(video_id);
 
--- Full-text search index on title and summary
-CREATE INDEX idx_user_library_search ON user_library 
-USING GIN (to_tsvector('english', title || ' ' || COALESCE(summary, '')));
+-- Full-text search over title, summary, tags and content_data
+-- (search_user_library RPC: see backend/library_search.py)
+ALTER TABLE user_library ADD COLUMN search_vector tsvector
+GENERATED ALWAYS AS (
+  setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+  setweight(to_tsvector('english', coalesce(summary, '')), 'B') ||
+  setweight(jsonb_to_tsvector('english', coalesce(tags, '[]'::jsonb), '["string"]'), 'B') ||
+  setweight(jsonb_to_tsvector('english', coalesce(content_data, '{}'::jsonb), '["string"]'), 'C')
+) STORED;
+CREATE INDEX idx_user_library_search_vector ON user_library USING GIN (search_vector);
+CREATE INDEX idx_user_library_tags ON user_library USING GIN (tags jsonb_path_ops);
+
+-- Existing deployments: rebuild the list indexes with the id tiebreaker
+-- DROP INDEX IF EXISTS idx_user_library_user_created;
+-- DROP INDEX IF EXISTS idx_user_library_session_created;
+-- (then re-run the two CREATE INDEX statements above)
 
 -- Function to update updated_at timestamp
 CREATE OR REPLACE FUNCTION update_user_library_updated_at()
@@ -60,7 +74,7 @@ EXECUTE FUNCTION update_user_library_updated_at();
 
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Literal, Optional
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 
@@ -90,7 +104,7 @@ class LibraryItemResponse(BaseModel):
     source_url: Optional[str]
     video_id: Optional[str]
     summary: Optional[str]
-    content_data: Dict[str, Any]
+    content_data: Optional[Dict[str, Any]] = None  # omitted from list/search results
     notion_page_id: Optional[str]
     tags: List[str]
     created_at: str
@@ -103,12 +117,16 @@ class ListLibraryRequest(BaseModel):
     content_type: Optional[str] = None  # Filter by type
     limit: int = 50
     offset: int = 0
+    cursor: Optional[str] = None  # next_cursor of the previous page; takes precedence over offset
+    count: Optional[Literal["exact", "planned", "estimated"]] = None
+    include_content: bool = False
 
 
 class ListLibraryResponse(BaseModel):
     items: List[LibraryItemResponse]
-    total: int
+    total: Optional[int] = None
     has_more: bool
+    next_cursor: Optional[str] = None
 
 
 class SearchLibraryRequest(BaseModel):
@@ -116,9 +134,20 @@ class SearchLibraryRequest(BaseModel):
     user_id: Optional[str] = None
     query: str
     content_type: Optional[str] = None
+    tags: List[str] = []  # results must carry every tag
     limit: int = 50
 
 
+class LibrarySearchHit(LibraryItemResponse):
+    rank: Optional[float] = None
+    highlight: Optional[str] = None  # matched terms wrapped in <mark>
+
+
+class SearchLibraryResponse(ListLibraryResponse):
+    items: List[LibrarySearchHit]
+    facets: Dict[str, Dict[str, int]] = {}  # {"content_type": {...}, "tags": {...}}
+
+
 class DeleteLibraryItemRequest(BaseModel):
     item_id: str
     session_id: str
@@ -151,7 +180,7 @@ async def add_library_item(req: AddLibraryItemRequest) -> LibraryItemResponse:
 
 @router.post("/list")
 async def list_library(req: ListLibraryRequest) -> ListLibraryResponse:
-    """List library items with optional filtering"""
+    """List library items (without content_data) with optional filtering"""
     from backend.supabase_client import list_library_items
     
     try:
@@ -161,6 +190,9 @@ async def list_library(req: ListLibraryRequest) -> ListLibraryResponse:
             content_type=req.content_type,
             limit=req.limit,
             offset=req.offset,
+            cursor=req.cursor,
+            count=req.count,
+            include_content=req.include_content,
         )
         
         items = [LibraryItemResponse(**item) for item in result["items"]]
@@ -169,7 +201,10 @@ async def list_library(req: ListLibraryRequest) -> ListLibraryResponse:
             items=items,
             total=result["total"],
             has_more=result["has_more"],
+            next_cursor=result["next_cursor"],
         )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to list library: {str(e)}")
 
@@ -180,7 +215,7 @@ async def get_library_item(
     session_id: str,
     user_id: Optional[str] = None,
 ) -> LibraryItemResponse:
-    """Get a single library item by ID"""
+    """Get a single library item by ID, including its content_data"""
     from backend.supabase_client import get_library_item
     
     try:
@@ -195,8 +230,8 @@ async def get_library_item(
 
 
 @router.post("/search")
-async def search_library(req: SearchLibraryRequest) -> ListLibraryResponse:
-    """Search library items by query"""
+async def search_library(req: SearchLibraryRequest) -> SearchLibraryResponse:
+    """Ranked full-text search with highlights and content_type/tag facets"""
     from backend.supabase_client import search_library_items
     
     try:
@@ -206,14 +241,16 @@ async def search_library(req: SearchLibraryRequest) -> ListLibraryResponse:
             query=req.query,
             content_type=req.content_type,
             limit=req.limit,
+            tags=req.tags,
         )
         
-        items = [LibraryItemResponse(**item) for item in result["items"]]
+        items = [LibrarySearchHit(**item) for item in result["items"]]
         
-        return ListLibraryResponse(
+        return SearchLibraryResponse(
             items=items,
             total=result["total"],
-            has_more=False,  # Search doesn't paginate
+            has_more=result["total"] > len(items),
+            facets=result["facets"],
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to search library: {str(e)}")
@@ -0,0 +1,164 @@
+"""
+Size-capped, streaming handling of file uploads.
+
+Two layers keep large uploads out of memory:
+
+- ``UploadSizeLimitMiddleware`` rejects requests to upload routes before
+  the multipart body is parsed: a declared Content-Length over the limit
+  gets an immediate 413, and chunked bodies are counted as they arrive and
+  cut off with a 413 as soon as they cross it.
+- ``spooled_upload`` copies an UploadFile to a temp file in fixed-size
+  chunks, hashing and size-checking as it goes, so handlers get a path
+  (which PyMuPDF reads through a memory map) plus the sha256 without ever
+  holding the whole file as bytes.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import tempfile
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional, Pattern, Tuple
+
+from fastapi import HTTPException, UploadFile
+
+MAX_PDF_BYTES = int(os.getenv("MAX_PDF_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+# Room for multipart boundaries and the small form fields sent next to the file.
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+
+PDF_TOO_LARGE = {"error": "file_too_large", "message": f"PDF must be under {MAX_PDF_BYTES // (1024 * 1024)}MB"}
+
+
+class _BodyTooLarge(Exception):
+    pass
+
+
+class UploadSizeLimitMiddleware:
+    """ASGI middleware enforcing per-route request body limits.
+
+    ``limits`` is a list of (path regex, max file bytes, error detail).
+    """
+
+    def __init__(self, app, limits: List[Tuple[str, int, Dict[str, str]]]):
+        self.app = app
+        self.limits: List[Tuple[Pattern[str], int, Dict[str, str]]] = [
+            (re.compile(pattern), max_bytes + MULTIPART_OVERHEAD_BYTES, detail)
+            for pattern, max_bytes, detail in limits
+        ]
+
+    def _limit_for(self, path: str) -> Optional[Tuple[int, Dict[str, str]]]:
+        for pattern, max_bytes, detail in self.limits:
+            if pattern.fullmatch(path):
+                return max_bytes, detail
+        return None
+
+    async def __call__(self, scope, receive, send):
+        limit = self._limit_for(scope.get("path", "")) if scope["type"] == "http" else None
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+        max_bytes, detail = limit
+
+        for name, value in scope.get("headers") or []:
+            if name == b"content-length":
+                try:
+                    declared = int(value)
+                except ValueError:
+                    declared = 0
+                if declared > max_bytes:
+                    await _send_413(send, detail)
+                    return
+
+        received = 0
+        too_large = False
+        replaced = False
+
+        async def limited_receive():
+            nonlocal received, too_large
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > max_bytes:
+                    # The framework turns body-parsing errors into a 400, so remember
+                    # the overflow and swap whatever response follows for a 413.
+                    too_large = True
+                    raise _BodyTooLarge()
+            return message
+
+        async def limited_send(message):
+            nonlocal replaced
+            if too_large:
+                if message["type"] == "http.response.start" and not replaced:
+                    replaced = True
+                    await _send_413(send, detail)
+                return
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, limited_send)
+        except _BodyTooLarge:
+            if not replaced:
+                await _send_413(send, detail)
+
+
+async def _send_413(send, detail: Dict[str, str]) -> None:
+    body = json.dumps({"detail": detail}).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": 413,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+class SpooledUpload:
+    """A temp-file copy of an upload with its sha256 and size."""
+
+    def __init__(self, path: str, sha256: str, size: int):
+        self.path = path
+        self.sha256 = sha256
+        self.size = size
+
+
+@asynccontextmanager
+async def spooled_upload(
+    file: UploadFile,
+    max_bytes: int = MAX_PDF_BYTES,
+    too_large_detail: Optional[Dict[str, str]] = None,
+    suffix: str = ".pdf",
+    keep: bool = False,
+) -> AsyncIterator[SpooledUpload]:
+    """
+    Stream ``file`` to a temp file, hashing as it goes; raises HTTPException(413)
+    as soon as more than ``max_bytes`` have been read. The temp file is removed
+    when the block exits, unless ``keep`` is set and the block succeeded (the
+    caller then owns the file).
+    """
+    fd, path = tempfile.mkstemp(prefix="notionclips-upload-", suffix=suffix)
+    succeeded = False
+    try:
+        digest = hashlib.sha256()
+        size = 0
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = await file.read(UPLOAD_CHUNK_BYTES)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise HTTPException(status_code=413, detail=too_large_detail or PDF_TOO_LARGE)
+                digest.update(chunk)
+                await asyncio.to_thread(out.write, chunk)
+        yield SpooledUpload(path=path, sha256=digest.hexdigest(), size=size)
+        succeeded = True
+    finally:
+        if not (keep and succeeded):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
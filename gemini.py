@@ -4,16 +4,17 @@ import logging
 import requests
 import streamlit as st
 from dotenv import load_dotenv
-from typing import Union, List, Optional
+from typing import Union, List, Optional, Tuple
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_openai import ChatOpenAI
 from models import (
-    ActionItemList, MeetingSummary, VideoInsights,
-    StudyNotes, WorkBrief, PreWatchVerdict, _ChunkExtract, SynthesisAnalysis
+    ActionItem, ActionItemList, MeetingSummary, MeetingAnalysis, VideoInsights,
+    StudyNotes, WorkBrief, PreWatchVerdict, _ChunkExtract, _MeetingChunkExtract, SynthesisAnalysis
 )
 from backend.supabase_client import get_session
+from backend.transcript import Transcript, TranscriptLike
 
 load_dotenv()
 
@@ -163,57 +164,10 @@ def get_model():
     )
 
 
-# ─── Video Length Scaling ─────────────────────────────────────────────────────
-#
-# This is the core fix for the "2-hour video gets 5 points" problem.
-# Output depth scales with content length. No artificial caps.
-
-def _get_length_profile(word_count: int) -> dict:
-    """
-    Returns expected output depth based on transcript word count.
-    ~130 words/minute of speech, so:
-      2000 words  ≈ 15 min
-      6000 words  ≈ 45 min
-      10000 words ≈ 75 min
-      16000 words ≈ 2 hours
-    """
-    if word_count < 2000:
-        return {
-            "category":      "short",
-            "label":         "short (~15 min)",
-            "key_facts":     "5 to 10",
-            "self_test":     "3 to 4",
-            "key_points":    "4 to 7",
-        }
-    elif word_count < 6000:
-        return {
-            "category":      "medium",
-            "label":         "medium (~45 min)",
-            "key_facts":     "12 to 20",
-            "self_test":     "5 to 7",
-            "key_points":    "8 to 14",
-        }
-    elif word_count < 10000:
-        return {
-            "category":      "long",
-            "label":         "long (~75 min)",
-            "key_facts":     "20 to 32",
-            "self_test":     "7 to 10",
-            "key_points":    "12 to 20",
-        }
-    else:
-        return {
-            "category":      "very_long",
-            "label":         "very long (2h+)",
-            "key_facts":     "30 to 50",
-            "self_test":     "10 to 14",
-            "key_points":    "18 to 28",
-        }
-
-
 CHUNK_SIZE_WORDS = 4000    # words per chunk for long video processing
 CHUNK_OVERLAP    = 200     # overlap between chunks to avoid missing context
 CHUNKING_THRESHOLD = 8000  # word count above which chunking is used
+MAX_EXTRACT_CHUNKS = int(os.getenv("MAX_EXTRACT_CHUNKS", "24"))  # LLM calls per document, at most
 QA_CHUNK_WORDS = 260
 QA_CHUNK_OVERLAP = 40
 QA_TOP_K = 5
@@ -251,35 +205,63 @@ def _source_context(source_type: str) -> str:
     }
     return guidance.get(source, guidance["video"])
 
-def _split_into_chunks(transcript: str) -> List[str]:
+def _split_into_chunks(
+    transcript: TranscriptLike,
+    chunk_words: int = CHUNK_SIZE_WORDS,
+    overlap: int = CHUNK_OVERLAP,
+) -> List[str]:
     """Split a long transcript into overlapping chunks."""
-    words = transcript.split()
-    chunks = []
-    start = 0
-    while start < len(words):
-        end = min(start + CHUNK_SIZE_WORDS, len(words))
-        chunk = " ".join(words[start:end])
-        chunks.append(chunk)
-        if end == len(words):
-            break
-        start = end - CHUNK_OVERLAP  # overlap
-    return chunks
-
-
-def _split_for_qa(transcript: str) -> List[str]:
+    return list(Transcript.of(transcript).chunks(chunk_words, overlap))
+
+
+_PAGE_MARKER_RE = re.compile(r"^\[Page (\d+)\]", re.MULTILINE)
+
+
+def _plan_page_chunks(content: str) -> Optional[Tuple[List[str], List[str]]]:
+    """
+    Pack whole "[Page N]" blocks (PDF text) into chunks of up to CHUNK_SIZE_WORDS,
+    so chunks break at page boundaries and can be labelled "Pages a-b".
+    Returns (chunks, labels), or None when the content has no page markers.
+    """
+    markers = list(_PAGE_MARKER_RE.finditer(content))
+    if not markers:
+        return None
+    chunks: List[str] = []
+    labels: List[str] = []
+    current: List[str] = []
+    current_words = 0
+    pages: List[int] = []
+
+    def flush() -> None:
+        nonlocal current, current_words, pages
+        if current:
+            chunks.append("\n\n".join(current))
+            labels.append(f"Page {pages[0]}" if pages[0] == pages[-1] else f"Pages {pages[0]}-{pages[-1]}")
+        current, current_words, pages = [], 0, []
+
+    for i, match in enumerate(markers):
+        end = markers[i + 1].start() if i + 1 < len(markers) else len(content)
+        block = content[match.start():end].strip()
+        page = int(match.group(1))
+        words = len(block.split())
+        if words > CHUNK_SIZE_WORDS:
+            flush()
+            for part in _split_into_chunks(block):
+                chunks.append(part)
+                labels.append(f"Page {page}")
+            continue
+        if current and current_words + words > CHUNK_SIZE_WORDS:
+            flush()
+        current.append(block)
+        current_words += words
+        pages.append(page)
+    flush()
+    return chunks, labels
+
+
+def _split_for_qa(transcript: TranscriptLike) -> List[str]:
     """Smaller chunking for Q&A retrieval."""
-    words = transcript.split()
-    if not words:
-        return []
-    chunks = []
-    start = 0
-    while start < len(words):
-        end = min(start + QA_CHUNK_WORDS, len(words))
-        chunks.append(" ".join(words[start:end]))
-        if end == len(words):
-            break
-        start = end - QA_CHUNK_OVERLAP
-    return chunks
+    return Transcript.of(transcript).chunks(QA_CHUNK_WORDS, QA_CHUNK_OVERLAP)
 
 
 def _tokenize_query(text: str) -> List[str]:
@@ -297,7 +279,7 @@ def _score_qa_chunk(chunk: str, query_tokens: List[str]) -> float:
 
 
 def _select_relevant_qa_chunks(
-    transcript: str,
+    transcript: TranscriptLike,
     question: str,
     chat_history: List[dict],
     top_k: int = QA_TOP_K
@@ -393,7 +375,12 @@ TRANSCRIPT SECTION:
     return llm.invoke(prompt)
 
 
-def _extract_chunks_parallel(chunks: List[str], mode: str, source_type: str = "video") -> List[_ChunkExtract]:
+def _extract_chunks_parallel(
+    chunks: List[str],
+    mode: str,
+    source_type: str = "video",
+    labels: Optional[List[str]] = None,
+) -> List[_ChunkExtract]:
     """Extract chunk insights concurrently while preserving order."""
     if not chunks:
         return []
@@ -404,7 +391,13 @@ def _extract_chunks_parallel(chunks: List[str], mode: str, source_type: str = "v
 
     with ThreadPoolExecutor(max_workers=workers) as executor:
         futures = {
-            executor.submit(_extract_chunk, chunk, f"Section {i + 1} of {total}", mode, source_type): i
+            executor.submit(
+                _extract_chunk,
+                chunk,
+                labels[i] if labels else f"Section {i + 1} of {total}",
+                mode,
+                source_type,
+            ): i
             for i, chunk in enumerate(chunks)
         }
         for future in as_completed(futures):
@@ -723,7 +716,7 @@ VIDEO TRANSCRIPT:
 # ─── Main Entry Point ─────────────────────────────────────────────────────────
 
 def extract_insights(
-    content: str,
+    content: TranscriptLike,
     mode: str = "study",
     sections: dict = None,
     duration_minutes: float = 0,
@@ -738,7 +731,7 @@ def extract_insights(
     truncation and hallucination.
 
     Args:
-        content:           full content text to analyze
+        content:           full content text (str or Transcript) to analyze
         mode:              "study" | "work" | "quick"
         sections:          dict of which sections to include (used for quick mode only)
         duration_minutes:  video duration in minutes (for metadata, not used in logic)
@@ -757,15 +750,16 @@ def extract_insights(
         }
 
     source_type = (source_type or "video").strip().lower()
-    transcript = content
-    word_count = len(transcript.split())
-    profile    = _get_length_profile(word_count)
+    source = Transcript.of(content)
+    transcript = source.text
+    word_count = source.word_count
+    profile    = source.length_profile
 
     # Detect whether real [MM:SS] timestamp markers are embedded.
     # These are only present when the scraping method succeeded.
     # This flag is passed into prompts — if False, AI is explicitly told
     # NOT to add timestamps, preventing hallucinated (≈12:30) on every fact.
-    has_timestamps = source_type == "video" and bool(re.search(r'\[\d{2}:\d{2}\]', transcript))
+    has_timestamps = source_type == "video" and source.has_timestamps
 
     # Short/medium videos — single pass (fast, sufficient)
     if word_count <= CHUNKING_THRESHOLD:
@@ -778,11 +772,20 @@ def extract_insights(
 
     # Long videos — chunked extraction then synthesis
     # This prevents hallucination from transcript compression
-    chunks = _split_into_chunks(transcript)
-    chunk_results = _extract_chunks_parallel(chunks, mode, source_type)
+    # PDFs are planned page-aligned so chunk labels double as page citations.
+    planned = _plan_page_chunks(transcript) if source_type == "pdf" else None
+    chunks, labels = planned if planned else (_split_into_chunks(source), None)
+    truncation_note = ""
+    if len(chunks) > MAX_EXTRACT_CHUNKS:
+        logger.warning("Content has %s chunks; extracting the first %s", len(chunks), MAX_EXTRACT_CHUNKS)
+        covered = f"up to {labels[MAX_EXTRACT_CHUNKS - 1]}" if labels else f"{MAX_EXTRACT_CHUNKS} of {len(chunks)} sections"
+        truncation_note = f"[Content truncated: notes cover {covered} only]\n\n"
+        chunks = chunks[:MAX_EXTRACT_CHUNKS]
+        labels = labels[:MAX_EXTRACT_CHUNKS] if labels else None
+    chunk_results = _extract_chunks_parallel(chunks, mode, source_type, labels)
 
     # Use first ~500 words as opening context for title generation
-    transcript_opening = " ".join(transcript.split()[:500])
+    transcript_opening = truncation_note + source.opening(500)
 
     if mode == "study":
         return _synthesize_study_notes(chunk_results, profile, transcript_opening, has_timestamps, source_type)
@@ -815,7 +818,16 @@ def extract_video_insights(
     )
 
 
-# ─── Meeting Mode (unchanged) ─────────────────────────────────────────────────
+# ─── Meeting Mode ─────────────────────────────────────────────────────────────
+#
+# analyze_meeting is the entry point: short meetings get one combined call for
+# summary + tasks; long ones are chunked, each chunk is extracted concurrently
+# (map), then tasks are deduplicated across chunks and one small call writes
+# the summary from the chunk notes (reduce).
+
+MEETING_CHUNK_WORDS = 3000
+MEETING_CHUNK_OVERLAP = 150
+MEETING_CHUNKING_THRESHOLD = 6000  # ≈45 min of speech
 
 def extract_tasks(transcript: str) -> ActionItemList:
     structured_llm = get_model().with_structured_output(ActionItemList)
@@ -848,12 +860,126 @@ TRANSCRIPT:
     return structured_llm.invoke(prompt)
 
 
-def get_pre_watch_verdict(transcript: str, mode: str = "quick") -> PreWatchVerdict:
+def _analyze_meeting_combined(transcript: str) -> MeetingAnalysis:
+    structured_llm = get_model().with_structured_output(MeetingAnalysis)
+    prompt = f"""
+You are an expert meeting analyst.
+Analyze this meeting transcript and provide, in one response:
+- summary:
+  - A concise meeting title (max 8 words)
+  - An executive summary (3-4 sentences: what was discussed and decided)
+  - Key decisions made (up to 5)
+  - Clear next steps agreed upon (up to 5)
+- items: ALL action items and tasks. For each task identify:
+  - The specific task to be done
+  - Who is responsible (use "Team" if unclear)
+  - Due date in YYYY-MM-DD format, or "TBD"
+  - Priority: High (urgent), Medium (important), Low (nice to have)
+TRANSCRIPT:
+{transcript}
+"""
+    return structured_llm.invoke(prompt)
+
+
+def _extract_meeting_chunk(chunk_text: str, chunk_label: str) -> _MeetingChunkExtract:
+    structured_llm = get_model().with_structured_output(_MeetingChunkExtract)
+    prompt = f"""
+You are an expert meeting analyst reading section "{chunk_label}" of a longer meeting transcript.
+Only include what is explicitly said in this section.
+
+Extract:
+- items: Every action item or task assigned here. For each: the specific task, who is responsible
+  ("Team" if unclear), due date as YYYY-MM-DD or "TBD", priority High/Medium/Low.
+- discussion: The main topics discussed, one sentence each.
+- decisions: Decisions explicitly made.
+- next_steps: Next steps explicitly agreed.
+
+TRANSCRIPT SECTION:
+{chunk_text}
+"""
+    return structured_llm.invoke(prompt)
+
+
+def _synthesize_meeting_summary(chunk_results: List[_MeetingChunkExtract]) -> MeetingSummary:
+    structured_llm = get_model().with_structured_output(MeetingSummary)
+    total = len(chunk_results)
+    notes = []
+    for i, chunk in enumerate(chunk_results, start=1):
+        notes.append(f"--- Section {i} of {total} ---")
+        notes.extend(f"Discussed: {line}" for line in chunk.discussion)
+        notes.extend(f"Decision: {line}" for line in chunk.decisions)
+        notes.extend(f"Next step: {line}" for line in chunk.next_steps)
+    notes_text = "\n".join(notes)
+    prompt = f"""
+You are an expert meeting analyst.
+Below are notes taken section by section from one long meeting, in order.
+Write the meeting report from these notes only:
+- A concise meeting title (max 8 words)
+- An executive summary (3-4 sentences: what was discussed and decided)
+- Key decisions made (up to 5, merge repeats across sections)
+- Clear next steps agreed upon (up to 5, merge repeats across sections)
+NOTES:
+{notes_text}
+"""
+    return structured_llm.invoke(prompt)
+
+
+def _extract_meeting_chunks_parallel(chunks: List[str]) -> List[_MeetingChunkExtract]:
+    """Extract meeting chunks concurrently while preserving order."""
+    total = len(chunks)
+    results: List[Optional[_MeetingChunkExtract]] = [None] * total
+    with ThreadPoolExecutor(max_workers=min(MAX_PARALLEL_CHUNKS, total)) as executor:
+        futures = {
+            executor.submit(_extract_meeting_chunk, chunk, f"Section {i + 1} of {total}"): i
+            for i, chunk in enumerate(chunks)
+        }
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+    return [result for result in results if result is not None]
+
+
+def analyze_meeting(
+    transcript: TranscriptLike,
+    include_tasks: bool = True,
+    include_summary: bool = True,
+) -> Tuple[Optional[ActionItemList], Optional[MeetingSummary]]:
+    """
+    Extract action items and the meeting summary.
+    Returns (deduplicated tasks or None, summary or None).
+    """
+    if not include_tasks and not include_summary:
+        return None, None
+
+    source = Transcript.of(transcript)
+    transcript = source.text
+    word_count = source.word_count
+    if word_count <= MEETING_CHUNKING_THRESHOLD:
+        if include_tasks and include_summary:
+            analysis = _analyze_meeting_combined(transcript)
+            return deduplicate_tasks(ActionItemList(items=analysis.items)), analysis.summary
+        if include_tasks:
+            return deduplicate_tasks(extract_tasks(transcript)), None
+        return None, extract_meeting_summary(transcript)
+
+    chunks = _split_into_chunks(source, MEETING_CHUNK_WORDS, MEETING_CHUNK_OVERLAP)
+    logger.info("Meeting analysis: %s words in %s chunks", word_count, len(chunks))
+    chunk_results = _extract_meeting_chunks_parallel(chunks)
+
+    tasks = None
+    if include_tasks:
+        # Chunks overlap, so the same task can come back from neighbouring chunks.
+        tasks = deduplicate_tasks(ActionItemList(items=[item for chunk in chunk_results for item in chunk.items]))
+    summary = _synthesize_meeting_summary(chunk_results) if include_summary else None
+    return tasks, summary
+
+
+def get_pre_watch_verdict(transcript: TranscriptLike, mode: str = "quick") -> PreWatchVerdict:
     """Generate a pre-watch Watch/Skim/Skip decision from transcript evidence."""
     structured_llm = get_model().with_structured_output(PreWatchVerdict)
     mode_label = {"study": "student/study", "work": "professional/work", "quick": "time-constrained"}.get(mode, "general")
-    has_timestamps = bool(re.search(r"\[\d{2}:\d{2}\]", transcript))
-    context = transcript[:12000]
+    source = Transcript.of(transcript)
+    has_timestamps = source.has_timestamps
+    context = source.text[:12000]
 
     prompt = f"""
 You are deciding whether someone should watch this video based on transcript evidence.
@@ -925,7 +1051,7 @@ MODE_CHAT_STYLE = {
 
 def answer_question(
     question: str,
-    transcript: str,
+    transcript: TranscriptLike,
     mode: str,
     chat_history: list,
     notion_page_id: str = None,
@@ -945,7 +1071,7 @@ def answer_question(
             f"[Retrieved chunk {i + 1}]\n{chunk}" for i, chunk in enumerate(relevant_chunks)
         )
     else:
-        retrieval_context = transcript[:6000]
+        retrieval_context = Transcript.of(transcript).text[:6000]
 
     style = MODE_CHAT_STYLE.get(mode, MODE_CHAT_STYLE["quick"])
     system_content = f"""{persona}
@@ -1014,14 +1140,51 @@ When you detect an edit request, perform the edit via the Notion API and prefix
 
 # ─── Utilities ────────────────────────────────────────────────────────────────
 
+_TASK_WORD_RE = re.compile(r"[a-z0-9]+")
+_TASK_STOPWORDS = {"the", "a", "an", "to", "and", "of", "for", "on", "in", "with", "by"}
+_PRIORITY_RANK = {"High": 3, "Medium": 2, "Low": 1}
+TASK_DUPLICATE_SIMILARITY = 0.8
+
+
+def _task_words(task: str) -> frozenset:
+    return frozenset(w for w in _TASK_WORD_RE.findall(task.lower()) if w not in _TASK_STOPWORDS)
+
+
+def _same_owner(a: ActionItem, b: ActionItem) -> bool:
+    owner_a, owner_b = a.assignee.lower().strip(), b.assignee.lower().strip()
+    return owner_a == owner_b or "team" in (owner_a, owner_b)
+
+
+def _merge_tasks(kept: ActionItem, dup: ActionItem) -> None:
+    """Keep the most specific details from two copies of the same task."""
+    if kept.assignee == "Team" and dup.assignee != "Team":
+        kept.assignee = dup.assignee
+    if kept.due_date == "TBD" and dup.due_date != "TBD":
+        kept.due_date = dup.due_date
+    if _PRIORITY_RANK.get(dup.priority, 0) > _PRIORITY_RANK.get(kept.priority, 0):
+        kept.priority = dup.priority
+
+
 def deduplicate_tasks(task_data: ActionItemList) -> ActionItemList:
-    seen = set()
-    unique = []
+    """
+    Drop repeated tasks, including reworded copies from overlapping chunks:
+    same owner (or one side "Team") and mostly the same words count as one
+    task, keeping the first wording and the most specific owner/date/priority.
+    """
+    unique: List[ActionItem] = []
+    unique_words: List[frozenset] = []
     for item in task_data.items:
-        fingerprint = (item.task.lower().strip(), item.assignee.lower().strip())
-        if fingerprint not in seen:
-            seen.add(fingerprint)
+        words = _task_words(item.task)
+        for kept, kept_words in zip(unique, unique_words):
+            if not _same_owner(kept, item):
+                continue
+            overlap = len(words & kept_words) / max(1, len(words | kept_words))
+            if words == kept_words or overlap >= TASK_DUPLICATE_SIMILARITY:
+                _merge_tasks(kept, item)
+                break
+        else:
             unique.append(item)
+            unique_words.append(words)
     task_data.items = unique
     return task_data
 
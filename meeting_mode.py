@@ -1,7 +1,7 @@
 import os
 import time
-from transcriber import record_audio, transcribe_audio
-from gemini import extract_tasks, extract_meeting_summary, deduplicate_tasks, calculate_accuracy
+from transcriber import record_and_transcribe, transcribe_audio
+from gemini import analyze_meeting, calculate_accuracy
 from push_to_notion import push_meeting
 
 
@@ -54,8 +54,11 @@ def run_meeting_mode():
             minutes = int(input("  Max recording duration in minutes (default 5): ").strip() or "5")
         except ValueError:
             minutes = 5
-        audio_path = record_audio(duration_seconds=minutes * 60)
-        transcript, duration = transcribe_audio(audio_path)
+        # Transcribes while recording, printing the transcript as it grows
+        audio_path, transcript, duration = record_and_transcribe(
+            duration_seconds=minutes * 60,
+            on_segment=lambda seg: print(f"  [{int(seg['start']) // 60:02d}:{int(seg['start']) % 60:02d}] {seg['text']}"),
+        )
 
     elif choice == "2":
         # Existing file
@@ -89,10 +92,7 @@ def run_meeting_mode():
     start_time = time.time()
 
     print("\n🤖 Running Gemini AI extraction...")
-    raw_tasks = extract_tasks(transcript)
-    summary   = extract_meeting_summary(transcript)
-
-    clean_tasks      = deduplicate_tasks(raw_tasks)
+    clean_tasks, summary = analyze_meeting(transcript)
     accuracy         = calculate_accuracy(clean_tasks)
     processing_time  = time.time() - start_time
 
@@ -76,6 +76,12 @@ class MeetingSummary(BaseModel):
         return [item.strip() for item in v if item.strip()]
 
 
+class MeetingAnalysis(BaseModel):
+    """Summary and action items from one structured call over a meeting transcript."""
+    summary: MeetingSummary = Field(description="Meeting title, executive summary, decisions and next steps")
+    items: List[ActionItem] = Field(description="Every action item or task assigned in the meeting", default_factory=list)
+
+
 # ─── YouTube Quick Mode (unchanged) ──────────────────────────────────────────
 
 class VideoInsights(BaseModel):
@@ -683,3 +689,19 @@ class _ChunkExtract(BaseModel):
     key_insights: List[str] = Field(
         description="For work mode: insights that change how a professional works"
     )
+
+
+class _MeetingChunkExtract(BaseModel):
+    """Raw extraction from one chunk of a long meeting transcript."""
+    items: List[ActionItem] = Field(
+        description="Action items or tasks assigned in this section. Empty list if none.", default_factory=list
+    )
+    discussion: List[str] = Field(
+        description="Main topics discussed in this section, one sentence each", default_factory=list
+    )
+    decisions: List[str] = Field(
+        description="Decisions explicitly made in this section. Empty list if none.", default_factory=list
+    )
+    next_steps: List[str] = Field(
+        description="Next steps explicitly agreed in this section. Empty list if none.", default_factory=list
+    )
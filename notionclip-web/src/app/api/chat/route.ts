@@ -9,7 +9,8 @@ export async function POST(req: Request) {
       headers: { 'Content-Type': 'application/json' },
       body: JSON.stringify({
         question: body.question,
-        transcript: body.transcript,
+        transcript: body.transcript || null,
+        transcript_ref: body.transcript_ref || null,
         mode: body.mode,
         chat_history: body.chat_history || [],
         notion_page_id: body.notion_page_id || null,
@@ -3,7 +3,7 @@
 import { useEffect, useMemo, useState } from "react"
 import { Navbar } from "@/components/layout/Navbar"
 import { useAppStore } from "@/lib/store"
-import { getLibrary } from "@/lib/api"
+import { getLibrary, getLibraryItem } from "@/lib/api"
 import { UnifiedLibraryItem, LibraryContentType } from "@/lib/types"
 import Link from "next/link"
 
@@ -101,7 +101,7 @@ function LibraryItemCard({ item, onClick }: { item: UnifiedLibraryItem; onClick:
 
 function DetailModal({ item, onClose }: { item: UnifiedLibraryItem; onClose: () => void }) {
   const typeInfo = getContentTypeInfo(item.content_type)
-  const data = item.content_data as any
+  const data = (item.content_data || {}) as any
 
   return (
     <div 
@@ -393,6 +393,18 @@ export default function LibraryPage() {
     }
   }, [sessionId, userId, contentTypeFilter])
 
+  // List rows omit content_data; load the full item when it is opened.
+  const openItem = (item: UnifiedLibraryItem) => {
+    setSelected(item)
+    if (item.content_data || !sessionId) return
+    getLibraryItem(item.id, sessionId, userId)
+      .then((full) => {
+        setItems((prev) => prev.map((row) => (row.id === full.id ? full : row)))
+        setSelected((current) => (current?.id === full.id ? full : current))
+      })
+      .catch(() => {})
+  }
+
   const filteredSorted = useMemo(() => {
     const q = query.trim().toLowerCase()
     let filtered = items.filter((item) => {
@@ -551,7 +563,7 @@ export default function LibraryPage() {
                 <LibraryItemCard 
                   key={item.id} 
                   item={item} 
-                  onClick={() => setSelected(item)} 
+                  onClick={() => openItem(item)} 
                 />
               ))}
             </div>
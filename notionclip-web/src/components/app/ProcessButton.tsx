@@ -121,7 +121,8 @@ export function ProcessButton({ onProcessingChange, onStageChange }: ProcessButt
 
       onStageChange?.('extract')
       const extractStart = Date.now()
-      const extractRes = await api.extractInsights(contentText, mode, questions)
+      // The transcript is already on the client, so skip the source_text echo.
+      const extractRes = await api.extractInsights(contentText, mode, questions, { includeSourceText: false })
       const extractTime = Date.now() - extractStart
       setExtractMs(extractTime)
       setExtractCacheHit(typeof extractRes.cache_hit === "boolean" ? extractRes.cache_hit : null)
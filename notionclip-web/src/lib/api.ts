@@ -14,6 +14,7 @@ import {
   SynthesisResponse,
   UnifiedLibraryItem,
   ListLibraryResponse,
+  SearchLibraryResponse,
   LibraryContentType,
 } from './types'
 import { API_BASE, backendUrl } from './backendUrl'
@@ -41,6 +42,44 @@ async function parseError(res: Response): Promise<string> {
   return detail
 }
 
+const transcriptRefs = new Map<string, Promise<string | null>>()
+
+// sha256 of the trimmed transcript, the same key the backend registers it under,
+// so requests can send transcript_ref instead of the full text.
+export function transcriptRef(text: string): Promise<string | null> {
+  const trimmed = text.trim()
+  let ref = transcriptRefs.get(trimmed)
+  if (!ref) {
+    const subtle = typeof crypto !== 'undefined' ? crypto.subtle : undefined
+    ref = !trimmed || !subtle
+      ? Promise.resolve(null)
+      : subtle.digest('SHA-256', new TextEncoder().encode(trimmed)).then(
+          (buf) => Array.from(new Uint8Array(buf), (b) => b.toString(16).padStart(2, '0')).join(''),
+          () => null
+        )
+    if (transcriptRefs.size >= 16) transcriptRefs.clear()
+    transcriptRefs.set(trimmed, ref)
+  }
+  return ref
+}
+
+// POST a JSON body that needs a transcript: send only its ref, and resend the full
+// text if the backend answers 409 (transcript_ref_unknown: evicted or never seen).
+async function postWithTranscript(path: string, body: Record<string, unknown>, transcript: string): Promise<Response> {
+  const post = (payload: Record<string, unknown>) =>
+    fetch(`${API_BASE}${path}`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify(payload)
+    })
+  const ref = await transcriptRef(transcript)
+  if (ref) {
+    const res = await post({ ...body, transcript_ref: ref })
+    if (res.status !== 409) return res
+  }
+  return post({ ...body, transcript })
+}
+
 export async function exportMarkdown(
   sessionId: string,
   sourceUrl: string = ""
@@ -321,17 +360,18 @@ export const api = {
     return res.json()
   },
 
-  async extractInsights(transcript: string, mode: Mode, questions?: string[]): Promise<ExtractResponse> {
-    const res = await fetch(`${API_BASE}/extract`, {
-      method: 'POST',
-      headers: { 'Content-Type': 'application/json' },
-      body: JSON.stringify({
-        transcript,
-        mode,
-        questions: questions && questions.length > 0 ? questions : undefined,
-        sections: {}
-      })
-    })
+  async extractInsights(
+    transcript: string,
+    mode: Mode,
+    questions?: string[],
+    opts?: { includeSourceText?: boolean }
+  ): Promise<ExtractResponse> {
+    const res = await postWithTranscript('/extract', {
+      mode,
+      questions: questions && questions.length > 0 ? questions : undefined,
+      sections: {},
+      include_source_text: opts?.includeSourceText ?? true
+    }, transcript)
     if (!res.ok) throw new Error("Failed to extract insights")
     return res.json()
   },
@@ -374,11 +414,7 @@ export const api = {
   },
 
   async getPreWatchVerdict(transcript: string, mode: Mode): Promise<VerdictResponse> {
-    const res = await fetch(`${API_BASE}/verdict`, {
-      method: 'POST',
-      headers: { 'Content-Type': 'application/json' },
-      body: JSON.stringify({ transcript, mode })
-    })
+    const res = await postWithTranscript('/verdict', { mode }, transcript)
     if (!res.ok) {
       let detail = `HTTP ${res.status}`
       try {
@@ -451,19 +487,14 @@ export const api = {
       content: String(msg?.content || '')
     }))
 
-    const res = await fetch(`${API_BASE}/qa`, {
-      method: 'POST',
-      headers: { 'Content-Type': 'application/json' },
-      body: JSON.stringify({
-        question,
-        transcript,
-        mode,
-        chat_mode: chatMode,
-        chat_history: safeHistory,
-        session_id: sessionId || null,
-        notion_page_id: notionPageId || null
-      })
-    })
+    const res = await postWithTranscript('/qa', {
+      question,
+      mode,
+      chat_mode: chatMode,
+      chat_history: safeHistory,
+      session_id: sessionId || null,
+      notion_page_id: notionPageId || null
+    }, transcript)
     if (!res.ok) {
       let detail = `HTTP ${res.status}`
       try {
@@ -567,7 +598,9 @@ export async function getLibrary(
   userId?: string | null,
   contentType?: LibraryContentType | 'all',
   limit: number = 50,
-  offset: number = 0
+  offset: number = 0,
+  cursor?: string | null,
+  count?: 'exact' | 'planned' | 'estimated' | null
 ): Promise<ListLibraryResponse> {
   const res = await fetch(backendUrl('/library/list'), {
     method: 'POST',
@@ -578,6 +611,8 @@ export async function getLibrary(
       content_type: contentType === 'all' ? null : contentType,
       limit,
       offset,
+      cursor: cursor || null,
+      count: count || null,
     }),
   })
   if (!res.ok) {
@@ -592,8 +627,9 @@ export async function searchLibrary(
   query: string,
   userId?: string | null,
   contentType?: LibraryContentType | 'all',
-  limit: number = 50
-): Promise<ListLibraryResponse> {
+  limit: number = 50,
+  tags: string[] = []
+): Promise<SearchLibraryResponse> {
   const res = await fetch(backendUrl('/library/search'), {
     method: 'POST',
     headers: { 'Content-Type': 'application/json' },
@@ -602,6 +638,7 @@ export async function searchLibrary(
       user_id: userId || null,
       query,
       content_type: contentType === 'all' ? null : contentType,
+      tags,
       limit,
     }),
   })
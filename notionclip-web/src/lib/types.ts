@@ -47,6 +47,7 @@ export interface TranscriptResponse {
   duration_minutes: number
   cache_hit?: boolean
   fetch_ms?: number
+  transcript_ref?: string | null
 }
 
 export interface ExtractResponse {
@@ -56,6 +57,7 @@ export interface ExtractResponse {
   insights: Insights
   source_text?: string
   cache_hit?: boolean
+  transcript_ref?: string | null
 }
 
 export interface PushResponse {
@@ -79,6 +81,8 @@ export interface SmartWatchQuickResult {
   video_id: string
   cache_hit: boolean
   stage1_ms: number
+  verdict_cache_hit?: boolean
+  speculative_deep_started?: boolean
   prompt_version?: string
 }
 
@@ -95,6 +99,7 @@ export interface SmartWatchDeepResult {
   total_relevant_moments: number
   analysis_complete: boolean
   stage2_ms: number
+  cache_hit?: boolean
   skipped?: boolean
   reason?: string
   prompt_version?: string
@@ -338,7 +343,7 @@ export interface UnifiedLibraryItem {
   source_url?: string | null
   video_id?: string | null
   summary?: string | null
-  content_data: LibraryContentData
+  content_data?: LibraryContentData | null // only on GET /library/{id} (or include_content)
   notion_page_id?: string | null
   tags: string[]
   created_at: string
@@ -353,8 +358,22 @@ export interface LibraryFilters {
 
 export interface ListLibraryResponse {
   items: UnifiedLibraryItem[]
-  total: number
+  total?: number | null
   has_more: boolean
+  next_cursor?: string | null
+}
+
+export interface LibrarySearchHit extends UnifiedLibraryItem {
+  rank?: number | null
+  highlight?: string | null // matched terms wrapped in <mark>
+}
+
+export interface SearchLibraryResponse extends ListLibraryResponse {
+  items: LibrarySearchHit[]
+  facets: {
+    content_type?: Record<string, number>
+    tags?: Record<string, number>
+  }
 }
 
 export interface AddLibraryItemRequest {
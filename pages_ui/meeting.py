@@ -5,6 +5,16 @@ import streamlit as st
 from pages_ui.components import page_header, render_meeting_result, save_to_history
 
 
+def _show_engine_metrics(metrics: dict):
+    parts = []
+    if metrics.get("load_seconds") is not None:
+        parts.append(f"model load {metrics['load_seconds']:.1f}s (once per process)")
+    if metrics.get("last_real_time_factor") is not None:
+        parts.append(f"real-time factor {metrics['last_real_time_factor']:.2f}")
+    if parts:
+        st.caption("Whisper: " + " | ".join(parts))
+
+
 def render():
     page_header("🎙️", "Meeting Mode", "Record, upload, or paste a meeting transcript")
 
@@ -39,10 +49,12 @@ def render():
                         tmp.write(uploaded.read())
                         tmp.close()
 
-                        st.write("Loading Whisper model...")
-                        from transcriber import transcribe_audio
+                        from transcriber import get_engine, transcribe_audio
+                        if not get_engine().loaded:
+                            st.write("Loading Whisper model...")
                         transcript, duration = transcribe_audio(tmp.path if hasattr(tmp, 'path') else tmp.name)
                         os.unlink(tmp.name)
+                        _show_engine_metrics(get_engine().metrics())
 
                         st.session_state["meeting_transcript"] = transcript
                         st.session_state["meeting_duration"]   = duration
@@ -79,11 +91,11 @@ def render():
             if st.button("🔴 Start Recording", use_container_width=True):
                 with st.status("🎙️ Recording... (press Stop or wait for timeout)", expanded=True) as status:
                     try:
-                        from transcriber import record_audio, transcribe_audio
-                        audio_path = record_audio(duration_seconds=duration_input * 60)
-                        st.write("Transcribing with Whisper...")
-                        transcript, duration = transcribe_audio(audio_path)
+                        from transcriber import get_engine, record_and_transcribe
+                        st.write("Transcribing with Whisper while recording...")
+                        audio_path, transcript, duration = record_and_transcribe(duration_seconds=duration_input * 60)
                         os.unlink(audio_path)
+                        _show_engine_metrics(get_engine().metrics())
                         st.session_state["meeting_transcript"] = transcript
                         st.session_state["meeting_duration"]   = duration
                         status.update(label="✅ Recording and transcription done!", state="complete")
@@ -116,20 +128,17 @@ def render():
                     import time as t
                     start = t.time()
 
-                    from gemini import (extract_tasks, extract_meeting_summary,
-                                        deduplicate_tasks, calculate_accuracy)
-
-                    tasks_obj = None
-                    summary   = None
-
-                    if extract_tasks_cb:
-                        st.write("Extracting tasks and action items...")
-                        raw_tasks = extract_tasks(transcript)
-                        tasks_obj = deduplicate_tasks(raw_tasks)
-
-                    if extract_summary_cb:
-                        st.write("Generating meeting summary...")
-                        summary = extract_meeting_summary(transcript)
+                    from gemini import analyze_meeting, calculate_accuracy
+
+                    steps = [label for label, wanted in (("tasks and action items", extract_tasks_cb),
+                                                         ("meeting summary", extract_summary_cb)) if wanted]
+                    if steps:
+                        st.write(f"Extracting {' and '.join(steps)}...")
+                    tasks_obj, summary = analyze_meeting(
+                        transcript,
+                        include_tasks=extract_tasks_cb,
+                        include_summary=extract_summary_cb,
+                    )
 
                     proc_time = t.time() - start
                     accuracy  = calculate_accuracy(tasks_obj) if tasks_obj else 0
@@ -0,0 +1,25 @@
+"""Checks that metadata-only scores never let a weak match skip the LLM."""
+from backend.search_scorer import score_videos
+from backend.smart_watch import SEARCH_FAST_PATH_CONFIDENCE as FAST_PATH_CONFIDENCE
+
+
+def test_empty_token_query_never_clears_fast_path():
+    (item,) = score_videos("AI", [{"video_id": "a", "title": "AI explained in 10 minutes"}])
+    assert item["verdict"] == "skim"
+    assert item["confidence"] < FAST_PATH_CONFIDENCE
+
+
+def test_zero_overlap_skip_never_clears_fast_path():
+    (item,) = score_videos("C++ tutorial", [{"video_id": "a", "title": "C++ Full Course for Beginners"}])
+    assert item["score"] == 0
+    assert item["verdict"] == "skip"
+    assert item["confidence"] <= 0.6 < FAST_PATH_CONFIDENCE
+
+
+def test_strong_match_can_clear_fast_path():
+    (item,) = score_videos(
+        "neural network backpropagation",
+        [{"video_id": "a", "title": "Neural Network Backpropagation", "channel_name": "Neural Network Lab"}],
+    )
+    assert item["verdict"] == "watch"
+    assert item["confidence"] >= FAST_PATH_CONFIDENCE
@@ -1,57 +1,649 @@
 import os
+import queue
+import threading
+import time
 import wave
 import tempfile
-import whisper
-import sounddevice as sd
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Optional, Union
 import numpy as np
-from scipy.io.wavfile import write as write_wav
+
+try:
+    import sounddevice as sd
+except (ImportError, OSError):  # optional: only live recording needs it (and PortAudio)
+    sd = None
+
+# Either backend is enough; install the one you select with TRANSCRIBE_BACKEND.
+try:
+    import whisper
+except ImportError:  # optional dependency
+    whisper = None
+
+try:
+    from faster_whisper import WhisperModel, decode_audio
+except ImportError:  # optional dependency
+    WhisperModel = None
+    decode_audio = None
 
 
 # Load Whisper model once (using 'base' — fast and good enough for meetings)
 # Options: tiny, base, small, medium, large  (larger = more accurate but slower)
 WHISPER_MODEL = "base"
 
+# "whisper" (openai-whisper) or "faster-whisper" (CTranslate2, int8-quantized on CPU)
+TRANSCRIBE_BACKEND = os.getenv("TRANSCRIBE_BACKEND", "whisper").strip().lower()
+# Worker processes for long recordings; each one holds its own copy of the model.
+TRANSCRIBE_WORKERS = int(os.getenv("TRANSCRIBE_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+SAMPLE_RATE = 16000           # Whisper works at 16kHz mono
+PARALLEL_MIN_SECONDS = 10 * 60  # shorter audio goes to the model in one call
+MAX_CHUNK_SECONDS = 180       # upper bound for one transcription task
+CHUNK_CUT_SEARCH_SECONDS = 10.0  # a region over the bound is cut at the quietest frame in this span
+
+# Energy VAD: 30 ms frames, a threshold between the noise floor and speech level,
+# pauses shorter than VAD_MIN_SILENCE_MS kept inside speech, VAD_PAD_MS around it.
+VAD_FRAME_MS = 30
+VAD_MIN_SILENCE_MS = 700
+VAD_PAD_MS = 200
+VAD_MIN_SPEECH_MS = 250
+
+# Live recording: each window goes to the engine while the next one records.
+LIVE_WINDOW_SECONDS = 30
+LIVE_CUT_SEARCH_SECONDS = 2.0  # windows end at the quietest frame in this tail
+
+
+def load_audio(audio_path: str) -> np.ndarray:
+    """Decodes any ffmpeg-readable file to 16kHz mono float32."""
+    if whisper is not None:
+        return whisper.load_audio(audio_path, sr=SAMPLE_RATE)
+    if decode_audio is not None:
+        return decode_audio(audio_path, sampling_rate=SAMPLE_RATE)
+    raise RuntimeError("No transcription backend installed (pip install openai-whisper or faster-whisper)")
+
+
+def detect_speech(audio: np.ndarray, sample_rate: int = SAMPLE_RATE) -> list[tuple[int, int]]:
+    """
+    Energy-based voice activity detection.
+    Returns [(start_sample, end_sample)] speech regions, with short pauses
+    merged in and a little padding so word edges are not clipped.
+    """
+    frame = sample_rate * VAD_FRAME_MS // 1000
+    n_frames = len(audio) // frame
+    if n_frames == 0:
+        return [(0, len(audio))] if len(audio) else []
+
+    frames = audio[:n_frames * frame].astype(np.float32).reshape(n_frames, frame)
+    energy_db = 10 * np.log10(np.mean(frames ** 2, axis=1) + 1e-10)
+    noise_floor = np.percentile(energy_db, 2)
+    speech_level = np.percentile(energy_db, 90)
+    if speech_level - noise_floor < 6:
+        # No clear quiet/loud split: all speech or all silence, decided by level.
+        return [(0, len(audio))] if speech_level > -50 else []
+    is_speech = energy_db > noise_floor + 0.35 * (speech_level - noise_floor)
+
+    # Runs of speech frames as [start_frame, end_frame)
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], is_speech.astype(np.int8), [0]))))
+    runs = [(int(start), int(end)) for start, end in zip(edges[::2], edges[1::2])]
+
+    min_gap = VAD_MIN_SILENCE_MS // VAD_FRAME_MS
+    merged: list[list[int]] = []
+    for start, end in runs:
+        if merged and start - merged[-1][1] < min_gap:
+            merged[-1][1] = end
+        else:
+            merged.append([start, end])
+
+    min_speech = max(1, VAD_MIN_SPEECH_MS // VAD_FRAME_MS)
+    pad = sample_rate * VAD_PAD_MS // 1000
+    regions: list[tuple[int, int]] = []
+    for start, end in merged:
+        if end - start < min_speech:
+            continue
+        s = max(0, start * frame - pad)
+        e = min(len(audio), end * frame + pad)
+        if regions and s <= regions[-1][1]:
+            regions[-1] = (regions[-1][0], e)
+        else:
+            regions.append((s, e))
+    return regions
+
+
+def _quietest_sample(audio: np.ndarray, lo: int, hi: int, sample_rate: int = SAMPLE_RATE) -> int:
+    """Middle sample of the lowest-energy frame in audio[lo:hi] (hi when the span is too short)."""
+    frame = sample_rate * VAD_FRAME_MS // 1000
+    n_frames = (hi - lo) // frame
+    if n_frames < 2:
+        return hi
+    frames = audio[lo:lo + n_frames * frame].astype(np.float32).reshape(n_frames, frame)
+    quietest = int(np.argmin(np.mean(frames ** 2, axis=1)))
+    return lo + quietest * frame + frame // 2
+
+
+def plan_chunks(
+    regions: list[tuple[int, int]],
+    audio: np.ndarray,
+    max_samples: int = SAMPLE_RATE * MAX_CHUNK_SECONDS,
+    sample_rate: int = SAMPLE_RATE,
+) -> list[tuple[int, int]]:
+    """
+    Packs consecutive speech regions into spans of at most max_samples,
+    cutting only in silence. A region longer than that is cut at the
+    quietest frame in the last CHUNK_CUT_SEARCH_SECONDS before each limit
+    (a breath or pause), not at a fixed point that may land mid-word.
+    Long silences between spans are never transcribed.
+    """
+    search = min(int(CHUNK_CUT_SEARCH_SECONDS * sample_rate), max_samples // 2)
+    chunks: list[tuple[int, int]] = []
+    for start, end in regions:
+        if chunks and end - chunks[-1][0] <= max_samples:
+            chunks[-1] = (chunks[-1][0], end)
+            continue
+        while end - start > max_samples:
+            limit = start + max_samples
+            cut = _quietest_sample(audio, limit - search, limit, sample_rate)
+            chunks.append((start, cut))
+            start = cut
+        chunks.append((start, end))
+    return chunks
+
+
+class _WhisperBackend:
+    name = "whisper"
+
+    def __init__(self, model_name: str):
+        if whisper is None:
+            raise RuntimeError("openai-whisper is not installed (pip install openai-whisper)")
+        self.model = whisper.load_model(model_name)
+
+    def transcribe(self, audio: np.ndarray, language: str) -> list[dict]:
+        result = self.model.transcribe(audio, language=language, verbose=False)
+        return [
+            {"start": float(seg["start"]), "end": float(seg["end"]), "text": seg["text"].strip()}
+            for seg in result.get("segments") or []
+        ]
+
+
+class _FasterWhisperBackend:
+    name = "faster-whisper"
+
+    def __init__(self, model_name: str, cpu_threads: int = 0):
+        if WhisperModel is None:
+            raise RuntimeError("faster-whisper is not installed (pip install faster-whisper)")
+        self.model = WhisperModel(model_name, device="cpu", compute_type="int8", cpu_threads=cpu_threads)
+
+    def transcribe(self, audio: np.ndarray, language: str) -> list[dict]:
+        segments, _info = self.model.transcribe(audio, language=language)
+        return [{"start": float(seg.start), "end": float(seg.end), "text": seg.text.strip()} for seg in segments]
+
+
+def _load_backend(backend: str, model_name: str, cpu_threads: int = 0):
+    if backend == "faster-whisper":
+        return _FasterWhisperBackend(model_name, cpu_threads=cpu_threads)
+    if backend == "whisper":
+        return _WhisperBackend(model_name)
+    raise ValueError(f"Unknown TRANSCRIBE_BACKEND: {backend!r} (use 'whisper' or 'faster-whisper')")
+
+
+# ── Process-pool workers (one model per worker process) ──────────────────────
+
+_worker_backend = None
+
+
+def _init_pool_worker(backend: str, model_name: str, cpu_threads: int) -> None:
+    global _worker_backend  # pylint: disable=global-statement
+    if backend == "whisper":
+        # Split the cores between workers instead of every worker using all of them.
+        import torch
+        torch.set_num_threads(cpu_threads)
+    _worker_backend = _load_backend(backend, model_name, cpu_threads=cpu_threads)
+
+
+def _pool_worker_ready() -> bool:
+    return _worker_backend is not None
+
+
+def _transcribe_chunk(audio: np.ndarray, language: str) -> list[dict]:
+    return _worker_backend.transcribe(audio, language)
+
+
+def stitch_segments(chunks: list[tuple[int, int]], chunk_segments: list[list[dict]], sample_rate: int = SAMPLE_RATE) -> list[dict]:
+    """Shifts each chunk's segment times by the chunk's offset into the recording."""
+    stitched = []
+    for (start, end), segments in zip(chunks, chunk_segments):
+        offset = start / sample_rate
+        limit = end / sample_rate
+        for seg in segments:
+            if not seg["text"]:
+                continue
+            stitched.append({
+                "start": round(offset + seg["start"], 2),
+                "end": round(min(limit, offset + seg["end"]), 2),
+                "text": seg["text"],
+            })
+    return stitched
+
+
+class TranscriptionEngine:
+    """
+    One transcription model per process, loaded lazily on first use.
+    Jobs go through a queue and run one at a time on a worker thread
+    (a Whisper model is not safe to run concurrently), so callers can
+    submit several files and wait on the returned futures.
+
+    Recordings longer than PARALLEL_MIN_SECONDS are split on silence and
+    the chunks are transcribed across a process pool (each worker loads
+    its own model once), then stitched back with recording-wide timestamps.
+    Shorter recordings run on the in-process model, unless the engine is
+    created with in_process=False (servers): then every job, whatever its
+    length or the worker count, runs in the pool and the model is never
+    loaded into this process.
+    """
+
+    def __init__(
+        self,
+        model_name: str = WHISPER_MODEL,
+        backend: str = TRANSCRIBE_BACKEND,
+        workers: int = TRANSCRIBE_WORKERS,
+        in_process: bool = True,
+    ):
+        self.model_name = model_name
+        self.backend = backend
+        self.workers = max(1, workers)
+        self.in_process = in_process
+        self._model = None
+        self._load_lock = threading.Lock()
+        self._worker_lock = threading.Lock()
+        self._jobs: queue.Queue = queue.Queue()
+        self._waiting: list[Future] = []  # submitted, not yet started; guarded by _worker_lock
+        self._worker = None
+        self._pool = None
+        self._metrics_lock = threading.Lock()
+        self._metrics = {
+            "backend": backend,
+            "load_seconds": None,
+            "jobs_completed": 0,
+            "jobs_failed": 0,
+            "audio_seconds": 0.0,
+            "transcribe_seconds": 0.0,
+            "last_real_time_factor": None,
+            "last_chunks": 0,
+        }
+
+    @property
+    def loaded(self) -> bool:
+        return self._model is not None or self._pool is not None
+
+    def load(self):
+        """Returns the in-process backend, loading it on the first call only."""
+        if self._model is None:
+            with self._load_lock:
+                if self._model is None:
+                    print(f"  🔄 Loading {self.backend} model '{self.model_name}' (first run downloads it ~150MB)...")
+                    started = time.perf_counter()
+                    model = _load_backend(self.backend, self.model_name)
+                    load_seconds = time.perf_counter() - started
+                    with self._metrics_lock:
+                        self._metrics["load_seconds"] = load_seconds
+                    self._model = model
+                    print(f"  ✅ {self.backend} ready ({load_seconds:.1f}s)")
+        return self._model
+
+    def submit(
+        self,
+        audio: Union[str, np.ndarray],
+        language: str = "en",
+        on_progress: Optional[Callable[[float], None]] = None,
+    ) -> Future:
+        """
+        Queues a file path, or 16kHz mono float32 samples, for transcription;
+        the future resolves to
+        {"text", "segments": [{"start", "end", "text"}], "duration_seconds"}.
+        on_progress is called with the fraction of chunks done (0.0 to 1.0).
+        """
+        future: Future = Future()
+        self._ensure_worker()
+        with self._worker_lock:
+            self._waiting.append(future)
+        self._jobs.put((audio, language, on_progress, future))
+        return future
+
+    def transcribe(self, audio_path: str, language: str = "en") -> tuple[str, float]:
+        """Returns (transcript_text, duration_in_minutes)."""
+        result = self.submit(audio_path, language=language).result()
+        return result["text"], result["duration_seconds"] / 60
+
+    def pending_jobs(self) -> int:
+        return self._jobs.qsize()
+
+    def queue_position(self, future: Future) -> Optional[int]:
+        """1-based position of a submitted job among those not started yet; None once it runs."""
+        with self._worker_lock:
+            try:
+                return self._waiting.index(future) + 1
+            except ValueError:
+                return None
+
+    def metrics(self) -> dict:
+        """
+        load_seconds, jobs_completed, jobs_failed, audio_seconds,
+        transcribe_seconds, last_real_time_factor and overall
+        real_time_factor (processing time / audio time; below 1 is
+        faster than real time), plus pending_jobs.
+        """
+        with self._metrics_lock:
+            stats = dict(self._metrics)
+        audio_seconds = stats["audio_seconds"]
+        stats["real_time_factor"] = stats["transcribe_seconds"] / audio_seconds if audio_seconds else None
+        stats["pending_jobs"] = self.pending_jobs()
+        return stats
+
+    def shutdown(self) -> None:
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def _ensure_worker(self) -> None:
+        with self._worker_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="whisper-transcriber", daemon=True)
+                self._worker.start()
+
+    def _process_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            threads = max(1, (os.cpu_count() or 1) // self.workers)
+            print(f"  🔄 Starting {self.workers} transcription workers ({self.backend} '{self.model_name}')...")
+            started = time.perf_counter()
+            # spawn: the engine runs on a thread, and forking a threaded process is unsafe.
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_pool_worker,
+                initargs=(self.backend, self.model_name, threads),
+            )
+            # A task only runs after its worker's initializer, so this times the first model load.
+            self._pool.submit(_pool_worker_ready).result()
+            load_seconds = time.perf_counter() - started
+            with self._metrics_lock:
+                self._metrics["load_seconds"] = load_seconds
+            print(f"  ✅ {self.backend} ready ({load_seconds:.1f}s)")
+        return self._pool
+
+    def _run(self) -> None:
+        while True:
+            audio, language, on_progress, future = self._jobs.get()
+            with self._worker_lock:
+                self._waiting.remove(future)
+            try:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                try:
+                    future.set_result(self._transcribe(audio, language, on_progress))
+                except BaseException as exc:  # pylint: disable=broad-except
+                    with self._metrics_lock:
+                        self._metrics["jobs_failed"] += 1
+                    future.set_exception(exc)
+            finally:
+                self._jobs.task_done()
+
+    def _transcribe(
+        self,
+        audio: Union[str, np.ndarray],
+        language: str,
+        on_progress: Optional[Callable[[float], None]] = None,
+    ) -> dict:
+        report = on_progress or (lambda fraction: None)
+        from_file = isinstance(audio, str)
+        started = time.perf_counter()
+        if from_file:
+            print(f"  🔊 Transcribing: {os.path.basename(audio)}")
+            audio = load_audio(audio)
+        audio_seconds = len(audio) / SAMPLE_RATE
+
+        if audio_seconds < PARALLEL_MIN_SECONDS:
+            chunks = [(0, len(audio))] if len(audio) else []
+        else:
+            chunks = plan_chunks(detect_speech(audio), audio)
+            print(f"  ✂️  {len(chunks)} speech chunks from {audio_seconds / 60:.1f} min of audio")
+
+        if not chunks:
+            chunk_segments = []
+        elif not self.in_process or (self.workers > 1 and len(chunks) > 1):
+            try:
+                pool = self._process_pool()
+                futures = [pool.submit(_transcribe_chunk, audio[start:end], language) for start, end in chunks]
+                chunk_segments = []
+                for future in futures:
+                    chunk_segments.append(future.result())
+                    report(len(chunk_segments) / len(chunks))
+            except BrokenProcessPool:
+                # A worker died; fail this job only and let the next one start a fresh pool.
+                self.shutdown()
+                raise
+        else:
+            model = self.load()
+            chunk_segments = []
+            for start, end in chunks:
+                chunk_segments.append(model.transcribe(audio[start:end], language))
+                report(len(chunk_segments) / len(chunks))
+
+        segments = stitch_segments(chunks, chunk_segments)
+        text = " ".join(seg["text"] for seg in segments)
+        elapsed = time.perf_counter() - started
+        real_time_factor = elapsed / audio_seconds if audio_seconds else None
+        with self._metrics_lock:
+            self._metrics["jobs_completed"] += 1
+            self._metrics["audio_seconds"] += audio_seconds
+            self._metrics["transcribe_seconds"] += elapsed
+            self._metrics["last_real_time_factor"] = real_time_factor
+            self._metrics["last_chunks"] = len(chunks)
+
+        if from_file:
+            word_count = len(text.split())
+            rtf_note = f" | RTF {real_time_factor:.2f}" if real_time_factor is not None else ""
+            print(f"  📝 Transcribed: {word_count:,} words | ~{audio_seconds / 60:.1f} min audio{rtf_note}")
+        return {"text": text, "segments": segments, "duration_seconds": audio_seconds}
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine() -> TranscriptionEngine:
+    """The process-wide engine (survives Streamlit reruns, since modules are cached)."""
+    global _engine  # pylint: disable=global-statement
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = TranscriptionEngine()
+    return _engine
+
+
 def load_whisper():
-    print("  🔄 Loading Whisper model (first run downloads it ~150MB)...")
-    model = whisper.load_model(WHISPER_MODEL)
-    print("  ✅ Whisper ready")
-    return model
+    return get_engine().load()
 
 
-def record_audio(duration_seconds: int = 300) -> str:
+def _quiet_cut(audio: np.ndarray, sample_rate: int = SAMPLE_RATE) -> int:
+    """Sample index of the quietest frame near the end of a window, so words are not split."""
+    tail_start = max(0, len(audio) - int(LIVE_CUT_SEARCH_SECONDS * sample_rate))
+    return _quietest_sample(audio, tail_start, len(audio), sample_rate)
+
+
+class StreamingRecorder:
     """
-    Records audio from the microphone.
-    Default max: 5 minutes. User can press Ctrl+C to stop early.
-    Returns path to the saved .wav file.
+    Records the microphone straight into a WAV file and, while recording,
+    hands each ~LIVE_WINDOW_SECONDS window to the transcription engine, so
+    the transcript grows during the meeting and only the last window is
+    left to transcribe after stop(). Memory holds one window, not the
+    whole recording. Windows that fail to transcribe are listed in
+    failed_windows, so callers know the rolling transcript has gaps.
     """
-    SAMPLE_RATE = 16000  # Whisper works best at 16kHz
-    CHANNELS    = 1      # Mono is fine for speech
 
-    print(f"\n🎙️  Recording started (max {duration_seconds // 60} min)")
-    print("    Press Ctrl+C to stop recording early\n")
+    def __init__(
+        self,
+        engine: Optional[TranscriptionEngine] = None,
+        transcribe: bool = True,
+        language: str = "en",
+        window_seconds: int = LIVE_WINDOW_SECONDS,
+        on_segment: Optional[Callable[[dict], None]] = None,
+    ):
+        fd, self.path = tempfile.mkstemp(prefix="notionclips-meeting-", suffix=".wav")
+        os.close(fd)
+        self.engine = (engine or get_engine()) if transcribe else None
+        self.language = language
+        self.window_samples = int(window_seconds * SAMPLE_RATE)
+        self.on_segment = on_segment
+        self.samples = 0
+        self._chunks: queue.Queue = queue.Queue()
+        self._window: list[np.ndarray] = []
+        self._window_len = 0
+        self._window_start = 0
+        self._pending: list[Future] = []
+        self._segments: list[dict] = []
+        self._segments_lock = threading.Lock()
+        self.failed_windows: list[dict] = []  # {"start", "error"} per window that failed
+        self._wav = None
+        self._stream = None
+        self._writer = None
 
-    frames = []
+    def start(self) -> None:
+        if sd is None:
+            raise RuntimeError("Live recording needs sounddevice (pip install sounddevice)")
+        self._wav = wave.open(self.path, "wb")
+        self._wav.setnchannels(1)
+        self._wav.setsampwidth(2)  # int16
+        self._wav.setframerate(SAMPLE_RATE)
+        self._writer = threading.Thread(target=self._drain, name="meeting-recorder", daemon=True)
+        self._writer.start()
+        self._stream = sd.InputStream(
+            samplerate=SAMPLE_RATE, channels=1, dtype="int16", blocksize=1024, callback=self._on_audio,
+        )
+        self._stream.start()
 
-    try:
-        # Stream audio in chunks so we can stop with Ctrl+C
-        with sd.InputStream(samplerate=SAMPLE_RATE, channels=CHANNELS, dtype="int16") as stream:
-            for _ in range(0, int(SAMPLE_RATE * duration_seconds / 1024)):
-                chunk, _ = stream.read(1024)
-                frames.append(chunk)
+    def stop(self) -> dict:
+        """
+        Stops recording, transcribes what is left and waits for the
+        outstanding windows. Returns {"path", "text", "segments",
+        "duration_seconds", "failed_windows"}; text is incomplete when
+        failed_windows is non-empty.
+        """
+        if self._stream is not None:
+            self._stream.stop()
+            self._stream.close()
+        self._chunks.put(None)
+        if self._writer is not None:
+            self._writer.join()
+        wait(self._pending)
+        return {
+            "path": self.path,
+            "text": self.transcript(),
+            "segments": self.segments(),
+            "duration_seconds": self.samples / SAMPLE_RATE,
+            "failed_windows": list(self.failed_windows),
+        }
+
+    def segments(self) -> list[dict]:
+        with self._segments_lock:
+            return list(self._segments)
+
+    def transcript(self) -> str:
+        """The rolling transcript so far."""
+        return " ".join(seg["text"] for seg in self.segments())
+
+    def _on_audio(self, indata, frames, time_info, status) -> None:
+        # Runs on the audio thread: hand off and return immediately.
+        self._chunks.put(indata.copy())
+
+    def _drain(self) -> None:
+        try:
+            while True:
+                chunk = self._chunks.get()
+                if chunk is None:
+                    break
+                self._wav.writeframes(chunk.tobytes())
+                self.samples += len(chunk)
+                if self.engine is not None:
+                    self._window.append(chunk[:, 0].astype(np.float32) / 32768.0)
+                    self._window_len += len(chunk)
+                    if self._window_len >= self.window_samples:
+                        self._flush_window(final=False)
+            if self.engine is not None:
+                self._flush_window(final=True)
+        finally:
+            self._wav.close()
+
+    def _flush_window(self, final: bool) -> None:
+        if not self._window_len:
+            return
+        audio = np.concatenate(self._window)
+        cut = len(audio) if final else _quiet_cut(audio)
+        offset = self._window_start / SAMPLE_RATE
+        future = self.engine.submit(audio[:cut], language=self.language)
+        future.add_done_callback(lambda done, offset=offset: self._collect(done, offset))
+        self._pending.append(future)
 
+        rest = audio[cut:]
+        self._window = [rest] if len(rest) else []
+        self._window_len = len(rest)
+        self._window_start += cut
+
+    def _collect(self, future: Future, offset: float) -> None:
+        # The engine runs jobs in submission order, so windows arrive in order.
+        if future.exception() is not None:
+            with self._segments_lock:
+                self.failed_windows.append({"start": offset, "error": str(future.exception())})
+            print(f"  ⚠️  Live transcription of window at {offset:.0f}s failed: {future.exception()}")
+            return
+        for seg in future.result()["segments"]:
+            seg = {**seg, "start": round(seg["start"] + offset, 2), "end": round(seg["end"] + offset, 2)}
+            with self._segments_lock:
+                self._segments.append(seg)
+            if self.on_segment is not None:
+                self.on_segment(seg)
+
+
+def _record(recorder: StreamingRecorder, duration_seconds: int) -> dict:
+    print(f"\n🎙️  Recording started (max {duration_seconds // 60} min)")
+    print("    Press Ctrl+C to stop recording early\n")
+    recorder.start()
+    try:
+        deadline = time.monotonic() + duration_seconds
+        while time.monotonic() < deadline:
+            time.sleep(0.25)
     except KeyboardInterrupt:
         print("\n  ⏹️  Recording stopped by user")
+    result = recorder.stop()
+    print(f"  💾 Saved {result['duration_seconds']:.1f}s of audio")
+    return result
 
-    # Combine all chunks into one array
-    audio_data = np.concatenate(frames, axis=0)
 
-    # Save to a temp .wav file
-    temp_path = tempfile.mktemp(suffix=".wav")
-    write_wav(temp_path, SAMPLE_RATE, audio_data)
+def record_audio(duration_seconds: int = 300) -> str:
+    """
+    Records audio from the microphone.
+    Default max: 5 minutes. User can press Ctrl+C to stop early.
+    Audio is written to the .wav file as it arrives.
+    Returns path to the saved .wav file.
+    """
+    return _record(StreamingRecorder(transcribe=False), duration_seconds)["path"]
 
-    duration_recorded = len(audio_data) / SAMPLE_RATE
-    print(f"  💾 Saved {duration_recorded:.1f}s of audio")
-    return temp_path
+
+def record_and_transcribe(duration_seconds: int = 300, on_segment: Optional[Callable[[dict], None]] = None) -> tuple[str, str, float]:
+    """
+    Records audio and transcribes it while recording (rolling transcript).
+    on_segment is called with each {"start", "end", "text"} as it is ready.
+    If any live window failed, the saved recording is transcribed again in
+    full, so the returned transcript never has silent gaps.
+    Returns (audio_path, transcript_text, duration_in_minutes).
+    """
+    recorder = StreamingRecorder(on_segment=on_segment)
+    result = _record(recorder, duration_seconds)
+    text = result["text"]
+    if result["failed_windows"]:
+        print(f"  🔁 {len(result['failed_windows'])} live window(s) failed; transcribing the full recording again")
+        text, _minutes = recorder.engine.transcribe(result["path"])
+    print(f"  📝 Transcribed: {len(text.split()):,} words | ~{result['duration_seconds'] / 60:.1f} min audio")
+    return result["path"], text, result["duration_seconds"] / 60
 
 
 def transcribe_audio(audio_path: str) -> tuple[str, float]:
@@ -60,15 +652,4 @@ def transcribe_audio(audio_path: str) -> tuple[str, float]:
     Works with .wav, .mp3, .m4a, .mp4, etc.
     Returns (transcript_text, duration_in_minutes).
     """
-    print(f"  🔊 Transcribing: {os.path.basename(audio_path)}")
-
-    model = load_whisper()
-    result = model.transcribe(audio_path, language="en", verbose=False)
-
-    text = result["text"].strip()
-    duration_minutes = result.get("segments", [{}])[-1].get("end", 0) / 60 if result.get("segments") else 0.0
-
-    word_count = len(text.split())
-    print(f"  📝 Transcribed: {word_count:,} words | ~{duration_minutes:.1f} min audio")
-
-    return text, duration_minutes
\ No newline at end of file
+    return get_engine().transcribe(audio_path)